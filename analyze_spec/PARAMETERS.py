@@ -105,9 +105,29 @@ leg_1_font_weight='bold'
 dashed_lines_width=1
 dashed_lines_style=':'
 
+# saved plots (output=png or output=pdf): size (in inches) and resolution (dots per inch)
+plot_size=(19.2,10.8)
+plot_dpi=100
+
+# automated identification of species (python analyze_spec.py score=True)
+# grid of velocities in km/s [min, max, step] (positive velocity means redshift)
+score_velocities=[-30000,10000,250]
+# max number of the strongest lines (by relative intensity) of every species that are used
+score_max_lines=50
+# width of window (in Ang) for continuum of spectrum (running mean of flux)
+score_window=100
+# min number of lines of species within spectrum (species with less lines are not ranked)
+score_min_lines=3
+# number of the best species that are printed
+score_top=20
+
 # lightspeed (km/s)
 c=3e5
 
+# relativistic Doppler formula for velocities of line list files: l*sqrt((1+v/c)/(1-v/c))
+# (if not specified default is relativistic=False, i.e. l/(1-v/c))
+relativistic=False
+
 # delimeters (for spectrum files)
 delimeters='\s+|\t+'
 
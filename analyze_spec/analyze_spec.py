@@ -12,17 +12,28 @@ Developed and tested on:
 
 
 import os
-import re
+import sys
 from collections import OrderedDict
 import time as TIME
+import datetime
+from concurrent.futures import ProcessPoolExecutor,as_completed
+import numpy as np
 import matplotlib.pyplot as plt
-from scipy import interpolate
+# package shared by all scripts (/nist_lines/ folder)
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nist_lines.spectrum import ColumnsError,read_spectrum_columns
+from nist_lines.parallel import call_captured
+from nist_lines.shift import rest_wavelengths,shift_element_lines
+from nist_lines.library import load_library
+from nist_lines.score import spectrum_signal,score_species,ranked_species,ranked_table_lines,\
+open_worker_store,worker_score
 from PARAMETERS import TIME_SLEEP,spectra_files,redshift,legend,line_list_files,\
 velocities,spec_shift,space_btw_el_lines,space_btw_files,plt_colormap,\
 plot_title_font_size,plot_title_font_weight,size_spec_leg_fonts,\
 leg_0_back_col,leg_0_edge_col,leg_0_font_weight,size_el_li_leg_fonts,\
 leg_1_back_col,leg_1_edge_col,leg_1_font_weight,dashed_lines_width,\
-dashed_lines_style,c,delimeters,header,num_of_tabs,dashed_lines
+dashed_lines_style,c,relativistic,delimeters,header,num_of_tabs,dashed_lines,plot_size,plot_dpi,\
+score_velocities,score_max_lines,score_window,score_min_lines,score_top
 
 
 ############################################### FUNCTIONS #####################################################
@@ -32,33 +43,28 @@ def read_spectrum(spectrum_file,z):
     try:
         print ("Reading data from spectrum file: "+spectrum_file+"...")
         TIME.sleep(TIME_SLEEP)
-        # get spectrum data
-        f=open(os.path.join(spectra_dir,spectrum_file),'r')
-        spectrum_data=f.read().splitlines()
-        f.close()
-        # rearrange spectrum data
-        spectrum_data=[re.split(delimeters,d) for d in spectrum_data]
-        spectrum_data=[[d[i] for i in range(len(d)) if d[i]!=''] for d in spectrum_data]
-        spectrum_data=[d for d in spectrum_data if d!=[]]
-        if not all(len(d)==len(spectrum_data[0]) for d in spectrum_data):
+        # get spectrum data (wavelength and flux columns as float64 arrays)
+        try:
+            spectrum_data=read_spectrum_columns(os.path.join(spectra_dir,spectrum_file),(0,1),delimeters)
+        except ColumnsError:
             print ("\nError reading spectrum file: "+spectrum_file)
             print ("Some rows in spectrum have different number of columns.")
             print ("Please check this and correct.\n")
             TIME.sleep(TIME_SLEEP)
             return [],[]
-        if spectrum_data==[]:
+        if len(spectrum_data)==0:
             print ("Spectrum file is empty!\n")
             TIME.sleep(TIME_SLEEP)
             return [],[]
         # observed wavelength
-        wl_observed=[float(e[0]) for e in spectrum_data]
+        wl_observed=spectrum_data[:,0]
         # rest wavelength
-        wl_rest=[wl/(1+z) for wl in wl_observed]
+        wl_rest=rest_wavelengths(wl_observed,z)
         # flux
-        flux=[float(e[1]) for e in spectrum_data]
+        flux=spectrum_data[:,1]
         # normalized flux
-        max_flux=max(flux)
-        normalized_flux=[(e/max_flux) for e in flux]
+        max_flux=flux.max()
+        normalized_flux=flux/max_flux
         print ("...OK\n")
         TIME.sleep(TIME_SLEEP)
         # return
@@ -121,7 +127,8 @@ def read_el_lines(filename):
         return [],[]
 
 # function for plotting spectra
-def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES):
+# (plot is shown in a window, or saved to output_file e.g. plot.png / plot.pdf if it is specified)
+def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES,output_file=None):
     try:        
         # spectra num
         spec_num=len(SPEC)
@@ -136,13 +143,13 @@ def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES):
         MAX_FLUX=[]        
         for i in range(len(SPEC)):
            wl_rest,normalized_flux=read_spectrum(SPEC[i],Z[i])          
-           if wl_rest!=[]:
-               normalized_flux=[e+spec_shift*i for e in normalized_flux]
+           if len(wl_rest)>0:
+               normalized_flux=normalized_flux+spec_shift*i
                WL_REST.append(wl_rest)
                NORMALIZED_FLUX.append(normalized_flux)
-               MIN_WL.append(min(wl_rest))
-               MAX_WL.append(max(wl_rest))
-               MAX_FLUX.append(max(normalized_flux))
+               MIN_WL.append(wl_rest.min())
+               MAX_WL.append(wl_rest.max())
+               MAX_FLUX.append(normalized_flux.max())
            else:
                spec_num=spec_num-1
                remove_ind.append(i)
@@ -167,9 +174,8 @@ def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES):
             for i in range(len(EL_LIN)):            
                 elements_unique,wavelengths=read_el_lines(EL_LIN[i])            
                 if elements_unique!=[]:                           
-                    wavelengths=[[l[j]/(1-V[i]/c) for j in range(len(l)) 
-                                 if l[j]/(1-V[i]/c)>=min_wl and l[j]/(1-V[i]/c)<=max_wl] 
-                                 for l in wavelengths]          
+                    # shift lines of all elements by velocity at once (only lines within spectra are kept)
+                    wavelengths=shift_element_lines(wavelengths,V[i],min_wl,max_wl,c,relativistic)
                     # check for [] in wavelengths and remove it
                     empty_el_ind=[]   
                     for j in range(len(elements_unique)):
@@ -196,7 +202,7 @@ def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES):
             else:
                 dashed=True
             # build colormap
-            cm=plt.cm.get_cmap(plt_colormap)
+            cm=plt.get_cmap(plt_colormap)
             colormap=list(cm.colors)
             all_elements=list(set(sum(ELEMENTS_UNIQUE,[])))
             colors=[colormap[i] for i in range(len(all_elements))]
@@ -273,11 +279,19 @@ def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES):
                 frame_1.set_edgecolor(leg_1_edge_col)            
             # PLOT DASHED LINES (only if there are spectra, elements and lines)
             if dashed==True:               
-                # calculate functions
-                FUNCTIONS=[]
+                # wavelengths of spectra (sorted) and their bounds
+                SPECTRA_WL=[]
+                SPECTRA_FLUX=[]
+                BOUNDS=[]
                 for i in range(len(F)):
-                    f=interpolate.interp1d(F[i][0],F[i][1])
-                    FUNCTIONS.append(f)
+                    order=np.argsort(F[i][0],kind='stable')
+                    SPECTRA_WL.append(F[i][0][order])
+                    SPECTRA_FLUX.append(F[i][1][order])
+                    BOUNDS.append((SPECTRA_WL[i][0],SPECTRA_WL[i][-1]))
+                # [element, file] ---> [wavelengths, flux, color]
+                el_and_lines_val={}
+                for i in range(len(EL_AND_LINES)):
+                    el_and_lines_val.setdefault(tuple(EL_AND_LINES[i]),EL_AND_LINES_VAL[i])
                 # go trough dashed list and plott
                 for i in range(len(DASHED_LINES)):
                     # take file
@@ -290,23 +304,21 @@ def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES):
                            e_spectrum+"'...")
                     TIME.sleep(TIME_SLEEP)
                     # check if spectrum, element and file exists
-                    if (e_spectrum in LEG) and ([e_name,e_filename] in EL_AND_LINES):
+                    if (e_spectrum in LEG) and ((e_name,e_filename) in el_and_lines_val):
                         # legend index
                         leg_ind=LEG.index(e_spectrum)
-                        # function for given spectrum
-                        func=FUNCTIONS[leg_ind]
-                        # WL-s of element
-                        e_WL=EL_AND_LINES_VAL[EL_AND_LINES.index([e_name,e_filename])][0]
-                        # FLUX of element
-                        e_FLUX=EL_AND_LINES_VAL[EL_AND_LINES.index([e_name,e_filename])][1]
-                        # COLOR of element
-                        e_COLOR=EL_AND_LINES_VAL[EL_AND_LINES.index([e_name,e_filename])][2]
-                        # plot dashed lines
-                        for k in range(len(e_WL)):
-                            if (e_WL[k]>=min(F[leg_ind][0])) and (e_WL[k]<=max(F[leg_ind][0])):
-                                plt.vlines(x=e_WL[k],ymin=func(e_WL[k]),ymax=e_FLUX[k],
-                                           linewidth=dashed_lines_width,color=e_COLOR,
-                                           linestyle=dashed_lines_style)
+                        # WL-s, FLUX and COLOR of element
+                        e_WL,e_FLUX,e_COLOR=el_and_lines_val[(e_name,e_filename)]
+                        e_WL=np.asarray(e_WL,dtype=np.float64)
+                        e_FLUX=np.asarray(e_FLUX,dtype=np.float64)
+                        # only lines within spectrum
+                        inside=(e_WL>=BOUNDS[leg_ind][0])&(e_WL<=BOUNDS[leg_ind][1])
+                        # plot dashed lines (all lines of element at once, as one LineCollection)
+                        if inside.any():
+                            plt.vlines(x=e_WL[inside],ymin=np.interp(e_WL[inside],SPECTRA_WL[leg_ind],
+                                                                     SPECTRA_FLUX[leg_ind]),
+                                       ymax=e_FLUX[inside],linewidth=dashed_lines_width,color=e_COLOR,
+                                       linestyle=dashed_lines_style)
                         print("...OK\n")
                         TIME.sleep(TIME_SLEEP)
                     else:
@@ -314,7 +326,7 @@ def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES):
                             print ("\nSpecified spectrum '"+e_spectrum+"' is not on the graph - "+title_plot)
                             print ("Please provide correct spectrum name.\n")
                             TIME.sleep(TIME_SLEEP)
-                        if [e_name,e_filename] not in EL_AND_LINES:
+                        if (e_name,e_filename) not in el_and_lines_val:
                                 print ("\nSpecified ['"+e_name+"', '"+e_filename+"'] is not on the graph - "+
                                        title_plot)
                                 print ("Please provide existing combination of element name and file name.\n")
@@ -325,16 +337,76 @@ def plot_spectra(SPEC,Z,LEG,EL_LIN,V,DASHED_LINES):
             axes.add_artist(legend_spectra)
             if ELEMENTS_UNIQUE!=[]:
                 axes.add_artist(legend_elem_lines)    
-            figManager = plt.get_current_fig_manager()
-            figManager.window.showMaximized()    
             plt.title(title_plot,fontsize=plot_title_font_size,
                       fontweight=plot_title_font_weight)
-            plt.show()
+            if output_file is None:
+                figManager = plt.get_current_fig_manager()
+                figManager.window.showMaximized()    
+                plt.show()
+            else:
+                # save plot (without window)
+                fig.set_size_inches(plot_size)
+                fig.savefig(output_file,dpi=plot_dpi)
+                plt.close(fig)
+                print ("Plot was saved to file: "+output_file+"\n")
+                TIME.sleep(TIME_SLEEP)
     except Exception as e:     
         print ("Something went wrong while trying to plot and analyze spectra.")
         print ("Error message:\n"+str(e))
         print ("Please check this and correct.\n")
         TIME.sleep(TIME_SLEEP)
+        if output_file is not None:
+            plt.close('all')
+
+# use Agg backend (rendering to files without display) in worker process
+def headless_worker():
+    plt.switch_backend('Agg')
+
+# score all species of NIST library against spectrum for every velocity of the grid (see
+# nist_lines/score.py) and save ranked table of species (with the best velocity of every species)
+# to output_file (species are scored in separate processes if executor is given)
+def score_spectrum(spectrum_file,z,library,executor,WORKERS,output_file):
+    try:
+        wl_rest,normalized_flux=read_spectrum(spectrum_file,z)
+        if len(wl_rest)==0:
+            return []
+        print ("Scoring species of NIST library against spectrum: "+spectrum_file+"...")
+        TIME.sleep(TIME_SLEEP)
+        start_time=TIME.time()
+        spectrum_wavelength,signal=spectrum_signal(wl_rest,normalized_flux,score_window)
+        # grid of velocities e.g. [-30000, -29750, ..., 10000]
+        grid=np.arange(score_velocities[0],score_velocities[1]+score_velocities[2]/2.0,
+                       score_velocities[2])
+        # species with lines (taken from species manifest of the library, if it exists)
+        species_names=library.species_names()
+        if executor is not None:
+            chunks=[list(e) for e in np.array_split(species_names,WORKERS) if len(e)>0]
+            tasks=[executor.submit(worker_score,chunk,spectrum_wavelength,signal,grid,
+                                   score_max_lines,c,relativistic) for chunk in chunks]
+            results=[task.result() for task in tasks]
+        else:
+            results=[score_species(library.packed,species_names,spectrum_wavelength,signal,grid,
+                                   score_max_lines,c,relativistic)]
+        species=sum([list(r[0]) for r in results],[])
+        scores=np.concatenate([r[1] for r in results])
+        lines=np.concatenate([r[2] for r in results])
+        table=ranked_species(species,grid,scores,lines,score_min_lines)
+        table_lines=ranked_table_lines(table)
+        f=open(output_file,'w')
+        f.write('\n'.join(table_lines)+'\n')
+        f.close()
+        print ("...OK ("+str(len(species))+" species x "+str(len(grid))+" velocities in "
+               +'%.2f' % (TIME.time()-start_time)+" s)\n")
+        print ('\n'.join(table_lines[:score_top+1])+'\n')
+        print ("Ranked table of species was saved to file: "+output_file+"\n")
+        TIME.sleep(TIME_SLEEP)
+        return table
+    except Exception as e:
+        print ("\nSomething went wrong while trying to score species against spectrum: "+spectrum_file)
+        print ("Error message:\n"+str(e))
+        print ("Please check this and correct.\n")
+        TIME.sleep(TIME_SLEEP)
+        return []
 
 ###############################################################################################################
 
@@ -348,20 +420,105 @@ cwd=os.getcwd()
 spectra_dir=os.path.join(cwd,'spectra_files')
 # line lists directory
 line_list_dir=os.path.join(cwd,'line_list_files')
+# directory for saved plots
+plots_dir=os.path.join(cwd,'plots')
+# directory for ranked tables of species
+scores_dir=os.path.join(cwd,'scores')
+
+# plot and analyze all spectra files given in PARAMETERS.py
+def main(param):
+    # READ PARAMETERS
+    # flag for output of plots [show, png, pdf] (if not specified output==show):
+    # - show - every plot is shown in a window (one by one)
+    # - png, pdf - plots are saved under /analyze_spec/plots/ folder without display (Agg backend)
+    output='show'
+    # number of plots that are created at the same time in separate processes, when plots are
+    # saved to files, or number of processes that score species (if not specified workers==4)
+    WORKERS=4
+    # flag for automated identification of species [True, False] (if not specified score==False):
+    # all species of NIST library are scored against every spectrum for a grid of velocities and
+    # ranked tables of species are saved under /analyze_spec/scores/ folder (instead of plotting)
+    score=False
+    # NIST library (if not specified /create_line_list/NIST_ELEMENTS/, packed library
+    # NIST_ELEMENTS_lines.bin next to the folder is used if it exists)
+    library_folder=os.path.join(os.path.dirname(cwd),'create_line_list','NIST_ELEMENTS')
+    # check parameters
+    for i in range(len(param)):
+        if 'output=' in param[i]:
+            output=param[i].replace('output=','')
+            if output not in ['show','png','pdf']:
+                output='show'
+        if 'workers=' in param[i]:
+            WORKERS=max(1,int(param[i].replace('workers=','')))
+        if 'score=' in param[i]:
+            score=param[i].replace('score=','').lower()=='true'
+        if 'library=' in param[i]:
+            library_folder=param[i].replace('library=','')
+    if score==True:
+        # score species against every spectrum e.g. /scores/score_SN2018cmt_2018_06_18_20181204_102030.txt
+        library=load_library(library_folder)
+        if library.manifest=={} and library.store is None and not os.path.isdir(library_folder):
+            print ("NIST library "+library_folder+" doesn't exist (species can't be scored).\n")
+            TIME.sleep(TIME_SLEEP)
+            return
+        if not os.path.isdir(scores_dir):
+            os.makedirs(scores_dir)
+        date_time=datetime.datetime.now().strftime('_%Y%m%d_%H%M%S')
+        # species are scored in separate processes (each process opens packed library once)
+        executor=None
+        if WORKERS>1 and library.store is not None:
+            executor=ProcessPoolExecutor(max_workers=WORKERS,initializer=open_worker_store,
+                                         initargs=(library.store_path,))
+        try:
+            for i in range(len(spectra_files)):
+                for j in range(len(spectra_files[i])):
+                    print ("------------------------------------------------------------\n")
+                    score_spectrum(spectra_files[i][j],redshift[i][j],library,executor,WORKERS,
+                                   os.path.join(scores_dir,'score_'+os.path.splitext(spectra_files[i][j])[0]
+                                                +date_time+'.txt'))
+                    print ("------------------------------------------------------------\n\n\n")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return
+    # plots of all spectra files
+    plots=[[spectra_files[i],redshift[i],legend[i],line_list_files[i],velocities[i],dashed_lines[i]]
+           for i in range(len(spectra_files))]
+    if output=='show':
+        # go trough every spectra file
+        for i in range(len(plots)):
+            # plot and analyze spectra
+            print ("------------------------------------------------------------\n")
+            plot_spectra(*plots[i])
+            print ("------------------------------------------------------------\n\n\n")
+        return
+    # save plots to files e.g. /plots/analyze_spec_20181204_102030_1.png
+    plt.switch_backend('Agg')
+    if not os.path.isdir(plots_dir):
+        os.makedirs(plots_dir)
+    date_time=datetime.datetime.now().strftime('_%Y%m%d_%H%M%S')
+    output_files=[os.path.join(plots_dir,'analyze_spec'+date_time+'_'+str(i+1)+'.'+output)
+                  for i in range(len(plots))]
+    if WORKERS==1 or len(plots)<2:
+        for i in range(len(plots)):
+            print ("------------------------------------------------------------\n")
+            plot_spectra(*(plots[i]+[output_files[i]]))
+            print ("------------------------------------------------------------\n\n\n")
+        return
+    # plots are created in separate processes and messages of every plot are printed as soon as
+    # the plot is finished
+    with ProcessPoolExecutor(max_workers=WORKERS,initializer=headless_worker) as executor:
+        tasks=dict((executor.submit(call_captured,plot_spectra,*(plots[i]+[output_files[i]])),i)
+                   for i in range(len(plots)))
+        for num,task in enumerate(as_completed(tasks)):
+            result,messages=task.result()
+            print ("------------------------------------------------------------\n")
+            sys.stdout.write(messages)
+            print ("Finished plot "+str(tasks[task]+1)+" ("+str(num+1)+"/"+str(len(plots))+" plots).\n")
+            print ("------------------------------------------------------------\n\n\n")
 
-# go trough every spectra file
-for i in range(len(spectra_files)):
-    # plot and analyze spectra
-    print ("------------------------------------------------------------\n")
-    plot_spectra(
-                 spectra_files[i],
-                 redshift[i],
-                 legend[i],
-                 line_list_files[i],
-                 velocities[i],
-                 dashed_lines[i]
-                )
-    print ("------------------------------------------------------------\n\n\n")
+if __name__=='__main__':
+    main(sys.argv)
 
 ###############################################################################################################
 
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import re
+import sys
+import glob
+import gzip
+import warnings
+import time as TIME
+from bs4 import BeautifulSoup
+# package shared by all scripts (/nist_lines/ folder)
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+from nist_lines.asd import error_messages,pre_block,parse_pre_table
+
+
+############################################# PARAMETERS ###############################################
+
+# saved NIST responses (pages with <pre> table of lines of species e.g. Fe_II.html.gz), generated from
+# the shipped .dat files with the same layout as NIST ASD pages (with duplicates, lines without
+# observed wavelength or with zero rel. int. and separators between rows)
+FIXTURES=os.path.join(os.path.dirname(os.path.abspath(__file__)),'fixtures')
+
+# list of possible error messages from NIST
+nist_errors=['Error Message:','No lines are available in ASD with the parameters selected',
+             'UD is not a valid element symbol.','Unrecognized token.']
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# the original parsing of download_nist_el (BeautifulSoup tree of the whole page, then re.findall for
+# every row) ---> (errors, wavelengths, relative intensities, references)
+def original_parse(html):
+    soup=BeautifulSoup(html,'lxml')
+    error=soup.findAll(text=nist_errors)
+    if error!=[]:
+        return [str(er) for er in error],[],[],[]
+    table=soup.findAll('pre')
+    res=(str(table[0])).splitlines()
+    data=[row.split('|') for row in res]
+    header_row=[d.strip() for d in data[2]]
+    data_row=data[6]
+    wave_ind=header_row.index('Observed')
+    rel_int_ind=header_row.index('Rel.')
+    ref_ind=len(data_row)-2
+    l=['' for i in range(len(res))]
+    ri=['' for i in range(len(res))]
+    for i in range(len(res)):
+        if len(data[i])>1:
+            l[i]=data[i][wave_ind].strip()
+            ri[i]=data[i][rel_int_ind].strip()
+    wavelength=[]
+    relativeIntensity=[]
+    reference=[]
+    for i in range(len(res)):
+        x=re.findall('\\d+\\.\\d+',l[i])
+        y=re.findall('\\d+',ri[i])
+        if x!=[] and y!=[] and float(y[0])!=0.0:
+            wavelength.append(float(x[0]))
+            relativeIntensity.append(float(y[0]))
+            pom=re.findall('>[A-Za-z\\d]+</a>',data[i][ref_ind].strip())
+            if pom!=[]:
+                ref=re.sub('>|</a>','',pom[0])
+            else:
+                ref=''
+            reference.append(ref)
+    return [],wavelength,relativeIntensity,reference
+
+# single-pass parsing (nist_lines/asd.py) ---> (errors, wavelengths, relative intensities, references)
+def single_pass_parse(html):
+    error=error_messages(html,nist_errors)
+    if error!=[]:
+        return error,[],[],[]
+    wavelength,relativeIntensity,reference=parse_pre_table(pre_block(html))
+    return [],wavelength,relativeIntensity,reference
+
+# the best time of function in ms (and its result)
+def best_time(function,runs):
+    times=[]
+    for i in range(runs):
+        start=TIME.perf_counter()
+        result=function()
+        times.append(TIME.perf_counter()-start)
+    return 1000*min(times),result
+
+########################################################################################################
+
+
+############################################### PROGRAM ################################################
+
+# e.g. python benchmarks/bench_asd.py runs=5
+# (optional argument: runs=5 (the best of runs is taken))
+def main(param):
+    runs=5
+    for i in range(len(param)):
+        if 'runs=' in param[i]:
+            runs=max(1,int(param[i].replace('runs=','')))
+    # findAll(text=...) of the original parsing is deprecated in new versions of BeautifulSoup
+    warnings.simplefilter('ignore',DeprecationWarning)
+    print ('Saved NIST responses '+FIXTURES+' (best of '+str(runs)+' runs):\n')
+    print ('%-8s %8s %7s %12s %12s %8s' % ('species','KB','lines','original','single-pass','speedup'))
+    for filename in sorted(glob.glob(os.path.join(FIXTURES,'*.html.gz'))):
+        with gzip.open(filename,'rt',encoding='utf-8') as f:
+            html=f.read()
+        t_old,old=best_time(lambda: original_parse(html),runs)
+        t_new,new=best_time(lambda: single_pass_parse(html),runs)
+        species=os.path.basename(filename).replace('.html.gz','').replace('_',' ')
+        if old!=new:
+            raise ValueError('Different lines of '+species)
+        print ('%-8s %8d %7d %9.1f ms %9.1f ms %7.1fx' % (species,len(html)//1024,len(new[1]),t_old,t_new,
+                                                          t_old/t_new))
+    print ('\n')
+
+if __name__=='__main__':
+    main(sys.argv)
+
+########################################################################################################
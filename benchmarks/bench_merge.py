@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import sys
+import copy
+import random
+import time as TIME
+# package shared by all scripts (/nist_lines/ folder)
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+from nist_lines.merge import merge_lines
+
+
+############################################# PARAMETERS ###############################################
+
+# flags and references of synthetic lines (manually added lines can have more entries, in any case)
+nist_references=['L1','l1','L2;L3','','R7']
+manual_flags=['M','m','NIST;M','Man;x','M;WR']
+manual_references=['wiserep','Wiserep','L1','null','']
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# the original merge_rows of create_line_list.py
+def merge_rows(indexOfRow1,indexOfRow2,rData):
+    rt1=rData[4][indexOfRow1]
+    rt2=rData[4][indexOfRow2][0]
+    if rt2 not in rt1:
+        rData[4][indexOfRow1].append(rt2)
+        rData[5][indexOfRow1].append(rData[5][indexOfRow2][0])
+    f1=[k.lower() for k in rData[6][indexOfRow1]]
+    f2=rData[6][indexOfRow2]
+    for el in f2:
+        if el.lower() not in f1:
+            rData[6][indexOfRow1].append(el)
+    r1=[k.lower() for k in rData[7][indexOfRow1]]
+    r2=rData[7][indexOfRow2]
+    for el in r2:
+        if el.lower() not in r1:
+            rData[7][indexOfRow1].append(el)
+
+# the original check_man_flag_ref of create_line_list.py
+def check_man_flag_ref(wavelength,relativeIntensity,manuallyList):
+    if wavelength in manuallyList[3]:
+        position=manuallyList[3].index(wavelength)
+        ri=manuallyList[4][position]
+        if ri < relativeIntensity and str(ri)!='null':
+            return False
+    return True
+
+# the original put_flag_ref of create_line_list.py
+def put_flag_ref(flags,wavelength,relativeIntensity,manuallyList,flagOrRef):
+    if flagOrRef=='flag':
+        column=6
+    else:
+        column=7
+    if len(flags) > 1:
+        flags1=[]
+        res=check_man_flag_ref(wavelength,relativeIntensity,manuallyList)
+        if res==False:
+            position=manuallyList[3].index(wavelength)
+            for i in range(len(flags)):
+                flag=flags[i]
+                if flag not in manuallyList[column][position] and flag!='':
+                    flags1.append(flag)
+            if flags1!=[]:
+                return ";".join(e for e in flags1)
+            else:
+                return ''
+        else:
+            return ";".join(e for e in flags if e!='')
+    else:
+        return flags[0]
+
+# the original rearrange_data of create_line_list.py (list.count() for duplicates, nested
+# enumerates and list membership of removed rows)
+def rearrange_data(Data,manuall_data,m):
+    rearrangedData=Data
+    rearrangedData[4]=[[rearrangedData[4][i]] for i in range((len(rearrangedData[4])))]
+    rearrangedData[5]=[[rearrangedData[5][i]] for i in range((len(rearrangedData[5])))]
+    rearrangedData[6]=[(rearrangedData[6][i]).split(';') for i in range((len(rearrangedData[6])))]
+    rearrangedData[7]=[(rearrangedData[7][i]).split(';') for i in range((len(rearrangedData[7])))]
+    waveDuplicates=list(set([x for x in rearrangedData[3] if rearrangedData[3].count(x) > 1]))
+    waveDuplicatesIndices = [[i for i, x in enumerate(rearrangedData[3]) if x == k]
+                             for k in waveDuplicates]
+    removeRows=[]
+    for i in range(len(waveDuplicatesIndices)):
+        throw=[]
+        for j in range(len(waveDuplicatesIndices[i])-1):
+            if j not in throw:
+                for k in range(j+1,len(waveDuplicatesIndices[i])):
+                    if k not in throw:
+                        if (rearrangedData[0][waveDuplicatesIndices[i][j]]==
+                            rearrangedData[0][waveDuplicatesIndices[i][k]]):
+                            merge_rows(waveDuplicatesIndices[i][j],waveDuplicatesIndices[i][k],
+                                      rearrangedData)
+                            throw.append(k)
+                            removeRows.append(waveDuplicatesIndices[i][k])
+    rearrangedData=[[rearrangedData[k][i] for i in range(len(rearrangedData[k])) if i not in removeRows]
+                    for k in range(len(rearrangedData))]
+    rearrangedData[4]=[max([e for e in rearrangedData[4][i] if e!='null'])
+                       if len(rearrangedData[4][i])>1 else rearrangedData[4][i][0]
+                       for i in range(len(rearrangedData[4]))]
+    rearrangedData[5]=[max([e for e in rearrangedData[5][i] if e!='null'])
+                       if len(rearrangedData[5][i])>1 else rearrangedData[5][i][0]
+                       for i in range(len(rearrangedData[5]))]
+    if m==True:
+        rearrangedData[6]=[put_flag_ref(rearrangedData[6][i],rearrangedData[3][i],rearrangedData[4][i],
+                           manuall_data,'flag') for i in range(len(rearrangedData[6]))]
+        rearrangedData[7]=[put_flag_ref(rearrangedData[7][i],rearrangedData[3][i],rearrangedData[4][i],
+                           manuall_data,'reference') for i in range(len(rearrangedData[7]))]
+    else:
+        rearrangedData[6]=[";".join(e for e in rearrangedData[6][i] if e!='')
+                           for i in range((len(rearrangedData[6])))]
+        rearrangedData[7]=[";".join(e for e in rearrangedData[7][i] if e!='')
+                           for i in range((len(rearrangedData[7])))]
+    wavelengths=rearrangedData[3]
+    rearrangedData=[[y for (x,y) in sorted(zip(wavelengths,rearrangedData[k]), key=lambda
+                     pair: pair[0], reverse=False)] for k in range(len(rearrangedData))]
+    return rearrangedData
+
+# synthetic lines (columns [atomic_num.ion_num, name, ionization, wavelength, relative_intensity,
+# frac_of_max_rel_int, flags, reference]) of num_of_species species, wavelengths are taken from
+# num_of_wavelengths values, so many lines have the same wavelength (of the same or other species)
+# manually added lines have rel. int. (the original check_man_flag_ref compares 'null' with numbers)
+# and some of their fractions are 'null'
+def synthetic_lines(rnd,num_of_lines,num_of_species,num_of_wavelengths,manual=False):
+    columns=[[] for k in range(8)]
+    for i in range(num_of_lines):
+        z=rnd.randint(1,num_of_species)
+        columns[0].append(('0' if z<10 else '')+str(z)+'.0'+str(rnd.randint(0,1)))
+        columns[1].append('X')
+        columns[2].append('I')
+        columns[3].append(float(rnd.randint(1,num_of_wavelengths))+0.25)
+        ri=rnd.choice([1.0,2.0,5.0,10.0,100.0])
+        columns[4].append(ri)
+        columns[5].append(rnd.choice([ri/100.0,'null']) if manual else ri/100.0)
+        columns[6].append(rnd.choice(manual_flags) if manual else 'NIST')
+        columns[7].append(rnd.choice(manual_references if manual else nist_references))
+    return columns
+
+# merge NIST lines and manually added lines as create_line_list.py does (manually added lines are
+# merged first, then added to NIST lines and everything is merged) with the original rearrange_data
+def original_merge(nist_data,manual):
+    manual_data=rearrange_data(manual,'No',False)
+    data=[nist_data[k]+manual_data[k] for k in range(8)]
+    return rearrange_data(data,manual_data,True)
+
+# the same with merge_lines (nist_lines/merge.py, see LineLibrary.merge_manual)
+def hash_merge(nist_data,manual):
+    manual_data=merge_lines(manual)
+    data=[nist_data[k]+manual_data[k] for k in range(8)]
+    return merge_lines(data,manual_data)
+
+# time of function in s (and its result), arguments are copied (the original merge changes them)
+def timed(function,nist_data,manual):
+    nist_data=copy.deepcopy(nist_data)
+    manual=copy.deepcopy(manual)
+    start=TIME.perf_counter()
+    result=function(nist_data,manual)
+    return TIME.perf_counter()-start,result
+
+########################################################################################################
+
+
+############################################### PROGRAM ################################################
+
+# e.g. python benchmarks/bench_merge.py rows=100000 manual=1000
+# (optional arguments: rows=100000 (synthetic NIST lines), manual=1000 (synthetic manually added
+# lines), species=30 (number of species), original=True (original=False means that only merge_lines
+# is timed))
+# NOTE: the original merge of 100000 lines takes minutes (list.count() for every line is O(n^2))
+def main(param):
+    num_of_rows=100000
+    num_of_manual=1000
+    num_of_species=30
+    original=True
+    for i in range(len(param)):
+        if 'rows=' in param[i]:
+            num_of_rows=int(param[i].replace('rows=',''))
+        if 'manual=' in param[i]:
+            num_of_manual=int(param[i].replace('manual=',''))
+        if 'species=' in param[i]:
+            num_of_species=max(1,int(param[i].replace('species=','')))
+        if 'original=' in param[i]:
+            original=param[i].replace('original=','').lower()=='true'
+    num_of_wavelengths=max(1,num_of_rows//2)
+    nist_data=synthetic_lines(random.Random(1),num_of_rows,num_of_species,num_of_wavelengths)
+    manual=synthetic_lines(random.Random(2),num_of_manual,num_of_species,num_of_wavelengths,True)
+    print ('Synthetic input: '+str(num_of_rows)+' NIST lines and '+str(num_of_manual)+' manually added '
+           'lines of '+str(num_of_species)+' species\n')
+    t_new,new=timed(hash_merge,nist_data,manual)
+    print ('merge_lines      %10.3f s (%d merged lines)' % (t_new,len(new[0])))
+    if original:
+        t_old,old=timed(original_merge,nist_data,manual)
+        print ('rearrange_data   %10.3f s (%d merged lines)' % (t_old,len(old[0])))
+        if old!=new:
+            raise ValueError('Merged lines are different.')
+        print ('speedup          %10.1fx (merged lines are the same)' % (t_old/t_new))
+    print ('\n')
+
+if __name__=='__main__':
+    main(sys.argv)
+
+########################################################################################################
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time as TIME
+# package shared by all scripts (/nist_lines/ folder)
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+from nist_lines import load_library,write_store
+
+
+############################################# PARAMETERS ###############################################
+
+# shipped NIST library
+LIBRARY=os.path.join(ROOT,'create_line_list','NIST_ELEMENTS')
+
+# species of the shipped library that are selected (small and the largest tables)
+fixture_species=['He I','C IV','O I','Ca II','Fe I','Fe II']
+
+# parameters of selection [% of data, fraction of max rel int, min rel int, lower wavelength,
+# upper wavelength] and rel_int_flag
+fixture_parameters=[([50,0.2,0,2000,10000],'all'),([50,0.2,0,2000,10000],'range'),([0,0,0,0,0],'all'),
+                    ([20,0,0,0,0],'all'),([0,0.05,0,0,0],'all'),([0,0,100,3000,7000],'range')]
+
+# parameters of selection for synthetic species (the original selection compares every row of
+# % of data table with all lines, so % of data of all lines is small)
+synthetic_parameters=[([0.1,0,0,0,0],'all'),([50,0.2,0,2000,10000],'range'),([0,0,0,0,0],'all'),
+                      ([0,0.05,0,0,0],'all'),([0,0,100,3000,7000],'range')]
+
+# header of .dat file
+dat_header='atomic_num.ion_num\tname\tionization\twavelength(Ang)\trelative_intensity\t'\
+           'frac_of_max_rel_int\tflags\treference'
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# read .dat file (as read_nist_data in the original create_line_list.py)
+def read_nist_data(full_path):
+    f=open(full_path,'r')
+    list_data=f.read().splitlines()
+    f.close()
+    list_data=[e.split('\t') for e in list_data]
+    return list_data
+
+# the original selection of search_nist_library (rows of .dat file as strings, list comprehensions
+# and list membership), without messages ---> (nistTable, indication)
+def original_select(list_data,parameters,ri_flag):
+    anio_ind=list_data[0].index('atomic_num.ion_num')
+    name_ind=list_data[0].index('name')
+    ion_ind=list_data[0].index('ionization')
+    wl_ind=list_data[0].index('wavelength(Ang)')
+    ri_ind=list_data[0].index('relative_intensity')
+    fmri_ind=list_data[0].index('frac_of_max_rel_int')
+    flag_ind=list_data[0].index('flags')
+    ref_ind=list_data[0].index('reference')
+    list_data=list_data[1:]
+    list_data_all=list_data[1:]
+    atomic_num_ion_num=[e[anio_ind] for e in list_data_all]
+    name=[e[name_ind] for e in list_data_all]
+    ionization=[e[ion_ind] for e in list_data_all]
+    wavelength=[float(e[wl_ind]) for e in list_data_all]
+    relativeIntensity=[float(e[ri_ind]) for e in list_data_all]
+    fracOfMaxRelInt=[float(e[fmri_ind]) for e in list_data_all]
+    flags=[e[flag_ind] for e in list_data_all]
+    reference=[e[ref_ind] for e in list_data_all]
+    list_data_all=[[c,d,e,b,a,f,g,h] for (a,b,c,d,e,f,g,h) in
+                   sorted(zip(relativeIntensity,wavelength,atomic_num_ion_num,name,
+                              ionization,fracOfMaxRelInt,flags,reference),
+                   key=lambda pair: pair[0], reverse=True)]
+    total_num=len(list_data_all)
+    lower=parameters[3]
+    upper=parameters[4]
+    low_range=lower!=0.0
+    upp_range=upper!=0.0
+    if low_range==False and upp_range==False and ri_flag=='range':
+        ri_flag='all'
+    keep_rows=[]
+    num_list_data_old=len(list_data)
+    for i in range(len(list_data)):
+        if low_range==True and upp_range==True:
+            if float(list_data[i][wl_ind])>=lower and float(list_data[i][wl_ind])<=upper:
+                keep_rows.append(i)
+        elif low_range==True:
+            if float(list_data[i][wl_ind])>=lower:
+               keep_rows.append(i)
+        elif upp_range==True:
+            if float(list_data[i][wl_ind])<=upper:
+               keep_rows.append(i)
+        else:
+            keep_rows.append(i)
+    list_data=[list_data[i] for i in range(len(list_data)) if i in keep_rows]
+    if list_data==[]:
+        return [],'null'
+    atomic_num_ion_num=[e[anio_ind] for e in list_data]
+    name=[e[name_ind] for e in list_data]
+    ionization=[e[ion_ind] for e in list_data]
+    wavelength=[float(e[wl_ind]) for e in list_data]
+    relativeIntensity=[float(e[ri_ind]) for e in list_data]
+    if num_list_data_old!=len(keep_rows) and ri_flag=='range':
+        ri_max_val=max(relativeIntensity)
+        fracOfMaxRelInt=[round(((100.0*e)/ri_max_val)/100.0,4) for e in relativeIntensity]
+    else:
+        fracOfMaxRelInt=[float(e[fmri_ind]) for e in list_data]
+    flags=[e[flag_ind] for e in list_data]
+    reference=[e[ref_ind] for e in list_data]
+    list_data=[[c,d,e,b,a,f,g,h] for (a,b,c,d,e,f,g,h) in
+               sorted(zip(relativeIntensity,wavelength,atomic_num_ion_num,name,
+                          ionization,fracOfMaxRelInt,flags,reference),
+               key=lambda pair: pair[0], reverse=True)]
+    num_of_elements=len(list_data)
+    percent_of_data=parameters[0]
+    if percent_of_data > 0.0:
+        if ri_flag=='range':
+            num_of_data_after_percent=int(round((num_of_elements*percent_of_data)/100.0+0.5))
+            if num_of_data_after_percent==0:
+                num_of_data_after_percent=1
+            percent_table=[list_data[i] for i in range(num_of_data_after_percent)]
+        else:
+            num_of_data_after_percent=int(round((total_num*percent_of_data)/100.0+0.5))
+            if num_of_data_after_percent==0:
+                num_of_data_after_percent=1
+            percent_table_all=[list_data_all[i] for i in range(num_of_data_after_percent)]
+            percent_table=[e for e in list_data if e in percent_table_all]
+        el_num_percent_table=len(percent_table)
+    else:
+        percent_table=[]
+        el_num_percent_table=0
+    fraction_of_max_rel_int=parameters[1]
+    if fraction_of_max_rel_int > 0.0:
+        fraction_table=[list_data[i] for i in range(num_of_elements)
+                        if list_data[i][fmri_ind] >= fraction_of_max_rel_int]
+        el_num_fraction_table=len(fraction_table)
+    else:
+        fraction_table=[]
+        el_num_fraction_table=0
+    min_rel_int_value=parameters[2]
+    if min_rel_int_value > 0.0:
+        minimum_table=[list_data[i] for i in range(num_of_elements)
+                       if list_data[i][ri_ind] >= min_rel_int_value]
+        el_num_minimum_table=len(minimum_table)
+    else:
+        minimum_table=[]
+        el_num_minimum_table=0
+    if percent_of_data==0.0 and fraction_of_max_rel_int==0.0 and min_rel_int_value==0.0:
+        if lower==0.0 and upper==0.0:
+            indication='all'
+        else:
+            indication='all_within_range'
+        return list_data,indication
+    tables=[percent_table,fraction_table,minimum_table]
+    len_tables=[el_num_percent_table,el_num_fraction_table,el_num_minimum_table]
+    max_len=max(len_tables)
+    if max_len==0:
+        return [],'null'
+    ind_of_max_len=len_tables.index(max_len)
+    if lower==0.0 and upper==0.0:
+        indications=['percent_of_data','fraction_of_max_rel_int','min_rel_int']
+    else:
+        indications=['percent_of_data_within_range','fraction_of_max_rel_int_within_range',
+                     'min_rel_int_within_range']
+    return tables[ind_of_max_len],indications[ind_of_max_len]
+
+# write synthetic species (num_of_lines random lines, sorted by wavelength) as .dat file of
+# /NIST_ELEMENTS/ folder e.g. .../Fe/Fe_II.dat
+def write_synthetic_species(elements_folder_path,nist_element,atomic_num_ion_num,num_of_lines,seed=0):
+    rnd=random.Random(seed)
+    wavelength=sorted(set(round(rnd.uniform(500.0,25000.0),3) for i in range(num_of_lines)))
+    relativeIntensity=[float(int(10**rnd.uniform(0,5))) for w in wavelength]
+    ri_max_val=max(relativeIntensity)
+    name,ionization=nist_element.split()
+    rows=[dat_header]+['\t'.join([atomic_num_ion_num,name,ionization,str(w),str(r),
+                                  str(round(((100.0*r)/ri_max_val)/100.0,4)),'NIST',
+                                  'L'+str(rnd.randint(1,500))])
+                       for w,r in zip(wavelength,relativeIntensity)]
+    os.makedirs(os.path.join(elements_folder_path,name))
+    with open(os.path.join(elements_folder_path,name,nist_element.replace(' ','_')+'.dat'),'w') as f:
+        f.write('\n'.join(rows)+'\n')
+    return len(wavelength)
+
+# the best time of function in ms (and its result)
+def best_time(function,runs):
+    times=[]
+    for i in range(runs):
+        start=TIME.perf_counter()
+        result=function()
+        times.append(TIME.perf_counter()-start)
+    return 1000*min(times),result
+
+# time the original selection (read .dat file + selection), selection of .dat file with NumPy
+# (select_lines) and selection of packed library (precomputed ranking, select_ranked) for species
+# of library, results of all three must be the same ---> rows of the table of times
+def benchmark_species(elements_folder_path,store_path,species,parameter_sets,runs):
+    dat_library=load_library(elements_folder_path,store_path+'.missing',store_path+'.missing.json')
+    packed_library=load_library(elements_folder_path,store_path,store_path+'.missing.json')
+    packed_library.store.ranking
+    table=[]
+    for nist_element in species:
+        path=dat_library.file_path(nist_element)
+        num_of_lines=len(read_nist_data(path))-1
+        for parameters,ri_flag in parameter_sets:
+            parameters=[float(e) for e in parameters]
+            t_old,old=best_time(lambda: original_select(read_nist_data(path),parameters,ri_flag),runs)
+            t_dat,dat=best_time(lambda: dat_library.select(nist_element,parameters,ri_flag),runs)
+            t_packed,packed=best_time(lambda: packed_library.select(nist_element,parameters,ri_flag),runs)
+            if not (old==dat==packed):
+                raise ValueError('Different selection of '+nist_element+' '+str(parameters)+' '+ri_flag)
+            table.append([nist_element,num_of_lines,parameters,ri_flag,len(old[0]),t_old,t_dat,t_packed])
+    return table
+
+# lines of table of times
+def table_lines(table):
+    lines=['%-8s %7s  %-34s %-6s %7s %11s %11s %11s %8s' % ('species','lines','parameters','flag',
+                                                           'selected','original','dat','packed',
+                                                           'speedup')]
+    for e in table:
+        lines.append('%-8s %7d  %-34s %-6s %7d %8.2f ms %8.2f ms %8.2f ms %7.1fx' %
+                     (e[0],e[1],str([float(k) for k in e[2]]),e[3],e[4],e[5],e[6],e[7],e[5]/e[7]))
+    return lines
+
+########################################################################################################
+
+
+############################################### PROGRAM ################################################
+
+# e.g. python benchmarks/bench_select.py runs=5 synthetic=100000
+# (optional arguments: runs=5 (the best of runs is taken), synthetic=100000 (number of lines of
+# synthetic species, synthetic=0 means that only species of shipped library are selected))
+# speedup is time of the original selection / time of selection of packed library
+# NOTE: the original selection of 100000 lines takes minutes (list membership of kept rows is O(n^2))
+def main(param):
+    runs=5
+    synthetic=100000
+    for i in range(len(param)):
+        if 'runs=' in param[i]:
+            runs=max(1,int(param[i].replace('runs=','')))
+        if 'synthetic=' in param[i]:
+            synthetic=int(param[i].replace('synthetic=',''))
+    temp_folder=tempfile.mkdtemp()
+    try:
+        # shipped library (packed library is created in temporary folder)
+        store_path=os.path.join(temp_folder,'NIST_ELEMENTS_lines.bin')
+        write_store(LIBRARY,store_path)
+        print ('Shipped library '+LIBRARY+' (best of '+str(runs)+' runs):\n')
+        for line in table_lines(benchmark_species(LIBRARY,store_path,fixture_species,fixture_parameters,
+                                                  runs)):
+            print (line)
+        print ('\n')
+        if synthetic>0:
+            elements_folder_path=os.path.join(temp_folder,'NIST_ELEMENTS')
+            num_of_lines=write_synthetic_species(elements_folder_path,'Fe II','26.01',synthetic)
+            store_path=os.path.join(temp_folder,'synthetic_lines.bin')
+            write_store(elements_folder_path,store_path)
+            print ('Synthetic species with '+str(num_of_lines)+' lines (1 run):\n')
+            for line in table_lines(benchmark_species(elements_folder_path,store_path,['Fe II'],
+                                                      synthetic_parameters,1)):
+                print (line)
+            print ('\n')
+    finally:
+        shutil.rmtree(temp_folder)
+
+if __name__=='__main__':
+    main(sys.argv)
+
+########################################################################################################
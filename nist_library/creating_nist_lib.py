@@ -11,30 +11,56 @@ Developed and tested on:
 """
 
 import os
-import time as TIME
-import requests
 from bs4 import BeautifulSoup
 import re
 import sys
 import roman
-import pandas as pd
 import shutil
 import datetime
+import json
+import hashlib
 import smtplib
 from email.mime.text import MIMEText
 from email.utils import formataddr
 from email.header import Header
+# package shared by all scripts (/nist_lines/ folder)
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nist_lines import STORE_FILENAME,load_store,write_store
+from nist_lines.manifest import MANIFEST_FILENAME,write_manifest
+from nist_lines.fetch import TokenBucket,Fetcher,FetchError
+from nist_lines.asd import error_messages,pre_block,parse_pre_table
+from nist_lines.merge import unique_wavelengths
+from concurrent.futures import ThreadPoolExecutor
 
 
 ##############################################################################################
 ######################################### PARAMETERS #########################################
 
-# NIST Atomic Spectra Database URL-s
-URL_TABLE='https://physics.nist.gov/cgi-bin/ASD/lines_pt.pl'
-URL_ELEMENT='https://physics.nist.gov/cgi-bin/ASD/lines_hold.pl?el='
+# NIST Atomic Spectra Database (default value, it can be changed with argument url=..., 
+# e.g. url=http://localhost:8000 for local server that imitates NIST)
+NIST_URL='https://physics.nist.gov'
 
-# url of element's table (GENERAL)
-ELEMENTS_TABLE_URL='http://physics.nist.gov/cgi-bin/ASD/lines1.pl?spectra='\
+# max number of element tables downloaded at the same time 
+# (default value, it can be changed with argument workers=...)
+WORKERS=4
+
+# max number of requests per second sent to NIST
+# (default value, it can be changed with argument rate=..., rate=0 means no limit)
+RATE_LIMIT=2
+
+# flag for resuming previous build [True, False] (default value, it can be changed with
+# argument resume=...)
+# if resume==True, /NIST_ELEMENTS/ folder is not deleted, species already downloaded by 
+# unfinished (crashed) build are not downloaded again and other species are downloaded 
+# only if they were changed in NIST
+RESUME=False
+
+# NIST Atomic Spectra Database URL-s (without NIST_URL)
+URL_TABLE='/cgi-bin/ASD/lines_pt.pl'
+URL_ELEMENT='/cgi-bin/ASD/lines_hold.pl?el='
+
+# url of element's table (GENERAL, without NIST_URL)
+ELEMENTS_TABLE_URL='/cgi-bin/ASD/lines1.pl?spectra='\
                    '&low_w=&upp_wn=&upp_w=&low_wn=&unit=0&submit=Retrieve+Data'\
                    '&de=0&java_window=3&java_mult=&format=1&line_out=0&en_unit=0'\
                    '&output=0&bibrefs=1&page_size=15&show_obs_wl=1&show_calc_wl=1&'\
@@ -42,7 +68,7 @@ ELEMENTS_TABLE_URL='http://physics.nist.gov/cgi-bin/ASD/lines1.pl?spectra='\
                    'A_out=0&intens_out=on&max_str=&allowed_out=1&forbid_out=1&min_accur=&'\
                    'min_intens=&conf_out=on&term_out=on&enrg_out=on&J_out=on'
 
-# wait time (in sec)
+# wait time before the second attempt (in sec), it is doubled for every next attempt
 TIME_SLEEP=2
 
 # the number of attempts
@@ -55,6 +81,9 @@ nist_filename='NIST_all_el_and_their_ion.txt'
 # folder containing elements
 elements_folder='NIST_ELEMENTS'
 
+# file with completed species of the build (checkpoints for resuming the build)
+checkpoint_filename='NIST_ELEMENTS_checkpoint.json'
+
 # list of possible error messages from NIST
 nist_errors=['Error Message:','No lines are available in ASD with the parameters selected',
              'UD is not a valid element symbol.','Unrecognized token.']
@@ -132,9 +161,7 @@ def send_email(fromEmail,fromPrefix,password,toEmail,ccEmail,subject,body):
 def exit_program():
     # send email
     send_email(mail_from,from_prefix,email_pass,mail_to,mail_cc,subject,email_body)
-    TIME.sleep(TIME_SLEEP)
     print ("\nExiting program...\n")
-    TIME.sleep(TIME_SLEEP)
     endTime=datetime.datetime.now()
     executionTime=endTime-startTime
     print ('######################## Total execution time of the script ---> '
@@ -142,8 +169,34 @@ def exit_program():
     print ('\n\n')
     sys.exit()
 
+# elements and their atomic numbers from NIST table of elements (response)
+def read_elements_table(r):
+    soup=BeautifulSoup(r.text,'lxml')
+    tables=soup.findAll('table')
+    table=tables[1].findAll('td')
+    table_el=[re.findall('id="[A-Za-z]+"',str(t))[0] 
+              for t in table if re.findall('id="[A-Za-z]+"',str(t))!=[]]
+    table_el=[re.sub('"|id=','',t) for t in table_el]
+    table_a=[re.findall('<sup>\d+</sup>',str(t))[0] 
+             for t in table if re.findall('id="[A-Za-z]+"',str(t))!=[]]
+    table_a=[re.sub('</?sup>','',t) for t in table_a]
+    table_a=[t if int(t)>9 else '0'+t for t in table_a]
+    return table_el,table_a
+
+# levels of ionization of element from NIST page of element (response)
+def read_element_ions(r):
+    soup1=BeautifulSoup(r.text,'lxml')
+    tables1=soup1.findAll('table')
+    table1=tables1[1].findAll('b')
+    table1=[re.findall('>[A-Za-z\s]+</a>',str(x))[0] 
+            for x in table1 
+            if re.findall('>[A-Za-z\s]+</a>',str(x))!=[]]
+    table1=[re.sub('>|</a>','',x) for x in table1]
+    return table1
+
 # function that retrieves all elements (with their levels of ionization) from NIST database
-def retrive_elem_and_ions():
+# (fetcher ---> shared connection pool for requests sent to NIST, nist_url ---> NIST_URL)
+def retrive_elem_and_ions(fetcher,nist_url):
     # all elements
     elements=[]
     # atomic numbers of elements
@@ -154,82 +207,28 @@ def retrive_elem_and_ions():
     elements_all=[]
     print ('Obtaining table of elements (with their levels of ionization) '\
            'that exist in NIST...\n')
-    TIME.sleep(TIME_SLEEP)
-    # flags
-    network=False
-    loop_num=0    
-    while (network==False) and (loop_num<LOOP_NUM):        
-        try: 
-            with requests.Session() as s:
-                r=s.get(URL_TABLE)
-                soup=BeautifulSoup(r.text,'lxml')
-                tables=soup.findAll('table')
-                table=tables[1].findAll('td')
-                table_el=[re.findall('id="[A-Za-z]+"',str(t))[0] 
-                          for t in table if re.findall('id="[A-Za-z]+"',str(t))!=[]]
-                table_el=[re.sub('"|id=','',t) for t in table_el]
-                elements=table_el
-                table_a=[re.findall('<sup>\d+</sup>',str(t))[0] 
-                         for t in table if re.findall('id="[A-Za-z]+"',str(t))!=[]]
-                table_a=[re.sub('</?sup>','',t) for t in table_a]
-                table_a=[t if int(t)>9 else '0'+t for t in table_a]
-                atomic_num_of_el=table_a
-                network=True
-                #--------------------------------------------------------------------------
-                #--------------------------------------------------------------------------
-                # go trough every element and check for ionization
-                for i in range(len(table_el)):
-                    url_el=URL_ELEMENT+table_el[i]               
-                    # flags
-                    network1=False
-                    loop_num1=0                   
-                    while (network1==False) and (loop_num1<LOOP_NUM):                    
-                        try:
-                           with requests.Session() as s1:
-                               r1=s1.get(url_el)
-                               soup1=BeautifulSoup(r1.text,'lxml')
-                               tables1=soup1.findAll('table')
-                               table1=tables1[1].findAll('b')
-                               table1=[re.findall('>[A-Za-z\s]+</a>',str(x))[0] 
-                                       for x in table1 
-                                       if re.findall('>[A-Za-z\s]+</a>',str(x))!=[]]
-                               table1=[re.sub('>|</a>','',x) for x in table1]
-                               elements_with_ion.append(table1)
-                               elements_all=elements_all+table1
-                               network1=True
-                        except Exception as e1:
-                            print ('Something went wrong while trying to find levels of '\
-                                   'ionization that exist in NIST for element : '
-                                   +table_el[i])
-                            print ('Error message:\n'+str(e1))
-                            print ('Trying again ('+str(loop_num+1)+' out of '
-                                    +str(LOOP_NUM)+')...\n')
-                            TIME.sleep(TIME_SLEEP)
-                            network1=False
-                            loop_num1=loop_num1+1   
-                    # check if there is stil no levels of ionization for given element
-                    if loop_num1==LOOP_NUM:
-                        print ('Unable to obtain levels of ionization for element '
-                               +table_el[i]+'\n')
-                        TIME.sleep(TIME_SLEEP)
-                        # exit program
-                        exit_program()
-                #--------------------------------------------------------------------------
-                #--------------------------------------------------------------------------
-        except Exception as e:
-            print ('Something went wrong while trying to obtain table of elements '\
-                   'that exist in NIST.')
-            print ('Error message:\n'+str(e))
-            print ('Trying again ('+str(loop_num+1)+' out of '+str(LOOP_NUM)+')...\n')
-            TIME.sleep(TIME_SLEEP)
-            network=False
-            loop_num=loop_num+1
-    # check if there is stil no table of elements from NIST
-    if loop_num==LOOP_NUM:
+    try:
+        elements,atomic_num_of_el=fetcher.get(nist_url+URL_TABLE,read_elements_table,
+                                              description='obtain table of elements '\
+                                                          'that exist in NIST')
+    except FetchError:
         print ('Unable to obtain table of elements that exist in NIST.\n')
-        TIME.sleep(TIME_SLEEP)
         # exit program
         exit_program()
+    # go trough every element and check for ionization
+    for i in range(len(elements)):
+        url_el=nist_url+URL_ELEMENT+elements[i]
+        try:
+            table1=fetcher.get(url_el,read_element_ions,
+                               description='find levels of ionization that exist in NIST '\
+                                           'for element : '+elements[i])
+        except FetchError:
+            print ('Unable to obtain levels of ionization for element '
+                   +elements[i]+'\n')
+            # exit program
+            exit_program()
+        elements_with_ion.append(table1)
+        elements_all=elements_all+table1
     # if everything went well, return data
     return elements,atomic_num_of_el,elements_with_ion,elements_all    
 
@@ -254,90 +253,70 @@ def write_el_to_file(filename,list_name,list_el):
     f.write('\n\n')
     f.close()
 
+# NIST response for element's table ---> (status, lines, response headers) where status is:
+# 'not_modified' (no lines), 'no_lines' (lines are error messages) or 'ok' (lines of <pre> table)
+def read_nist_response(r):
+    if r.status_code==304:
+        return 'not_modified',[],r.headers
+    r.raise_for_status()
+    html=r.text
+    error=error_messages(html,nist_errors)
+    if error!=[]:
+        err=[er for er in error if er!='Error Message:']
+        return 'no_lines',err,r.headers
+    res=pre_block(html)
+    return 'ok',res,r.headers
+
 # download element table from NIST database
-def download_nist_el(nist_element):
+# info (dict) ---> 'etag' and 'last_modified' of the previous download (if known) are sent to NIST
+#                  and 'status' ('ok', 'no_lines', 'not_modified' or 'failed'), 'etag' and 
+#                  'last_modified' of this download are returned in it
+def download_nist_el(fetcher,nist_url,nist_element,info):
+    info['status']='failed'
+    # ask NIST to send table only if it was changed after previous download
+    conditional_headers={}
+    if info.get('etag'):
+        conditional_headers['If-None-Match']=info['etag']
+    if info.get('last_modified'):
+        conditional_headers['If-Modified-Since']=info['last_modified']
     nist_element_plus=nist_element.replace(' ','+')
     print ('Downloading table for element '+nist_element+' from NIST database...\n')
-    TIME.sleep(TIME_SLEEP)   
-    # flags
-    network=False
-    loop_num=0
-    while (network==False) and (loop_num<LOOP_NUM):
-        try:
-            with requests.Session() as s:
-                # url of element's table for SPECIFIED element
-                url=ELEMENTS_TABLE_URL.replace('http://physics.nist.gov/cgi-bin/ASD/'\
-                                               'lines1.pl?spectra=','http://physics.'\
-                                               'nist.gov/cgi-bin/ASD/lines1.pl?'\
-                                               'spectra='+nist_element_plus)
-                r=s.get(url)
-                soup=BeautifulSoup(r.text,'lxml')
-                # check for errors
-                error=soup.findAll(text=nist_errors)
-                if error!=[]:
-                    print ('No results in NIST database for element '+nist_element)
-                    err=[str(er) for er in error if str(er)!='Error Message:']
-                    if err!=[]:
-                        print ('Error Message : '+err[0])
-                    print ('\n')
-                    TIME.sleep(TIME_SLEEP)
-                    nistTable=[]
-                    return nistTable
-                table = soup.findAll('pre')
-                res=(str(table[0])).splitlines()
-                network=True
-                print ('Table for element '+nist_element+' was successfully '\
-                       'downloaded from NIST.\n')
-                TIME.sleep(TIME_SLEEP)        
-        except Exception as e:
-            print ('Something went wrong while trying to download table for '\
-                   'element '+nist_element+' from NIST.')
-            print ('Error message:\n'+str(e))
-            print ('Trying again ('+str(loop_num+1)+' out of '+str(LOOP_NUM)+')...\n')
-            TIME.sleep(TIME_SLEEP)
-            network=False
-            loop_num=loop_num+1   
-    # check if there is stil no data from NIST
-    if loop_num==LOOP_NUM:
+    # url of element's table for SPECIFIED element
+    url=nist_url+ELEMENTS_TABLE_URL.replace('lines1.pl?spectra=',
+                                            'lines1.pl?spectra='+nist_element_plus)
+    try:
+        status,res,headers=fetcher.get(url,read_nist_response,headers=conditional_headers,
+                                       description='download table for element '
+                                                   +nist_element+' from NIST')
+    except FetchError:
         print ('Unable to download table for element '+nist_element+'\n')
-        TIME.sleep(TIME_SLEEP)
         nistTable=[]
-        return nistTable 
+        return nistTable
+    # table was not changed after previous download
+    if status=='not_modified':
+        print ('Table for element '+nist_element+' was not changed in NIST.\n')
+        info['status']='not_modified'
+        nistTable=[]
+        return nistTable
+    info['etag']=headers.get('ETag')
+    info['last_modified']=headers.get('Last-Modified')
+    # check for errors
+    if status=='no_lines':
+        print ('No results in NIST database for element '+nist_element)
+        if res!=[]:
+            print ('Error Message : '+res[0])
+        print ('\n')
+        info['status']='no_lines'
+        nistTable=[]
+        return nistTable
+    print ('Table for element '+nist_element+' was successfully '\
+           'downloaded from NIST.\n')
     # work with the downloaded data now
     try:
         print ('Extract and rearrange data from downloaded table.\n')
-        TIME.sleep(TIME_SLEEP)
-        # put data into lists
-        data=[row.split('|') for row in res]
-        # find positions of wavelength, rel. int. and ref.
-        header_row=[d.strip() for d in data[2]]
-        data_row=data[6]
-        wave_ind=header_row.index('Observed')
-        rel_int_ind=header_row.index('Rel.')
-        ref_ind=len(data_row)-2
-        # wavelength and rel. int.
-        l=['' for i in range(len(res))]
-        ri=['' for i in range(len(res))]
-        for i in range(len(res)):
-            if len(data[i])>1:
-                l[i]=data[i][wave_ind].strip()
-                ri[i]=data[i][rel_int_ind].strip()
         # take wawelength (in angstroms), relative intensity and reference
-        wavelength=[]
-        relativeIntensity=[]
-        reference=[]    
-        for i in range(len(res)):
-            x=re.findall('\d+\.\d+',l[i])
-            y=re.findall('\d+',ri[i])
-            if x!=[] and y!=[] and float(y[0])!=0.0:
-                wavelength.append(float(x[0]))
-                relativeIntensity.append(float(y[0]))
-                pom=re.findall('>[A-Za-z\d]+</a>',data[i][ref_ind].strip())
-                if pom!=[]:
-                    ref=re.sub('>|</a>','',pom[0])
-                else:
-                    ref=''
-                reference.append(ref)
+        # (<pre> table is parsed in a single pass)
+        wavelength,relativeIntensity,reference=parse_pre_table(res)
         # return relativeIntensity,wavelength,reference
         # this is sorted by relative intensity, and then by 
         # wavelength (wavelengths were sorted by default)
@@ -346,40 +325,29 @@ def download_nist_el(nist_element):
         # if table is empty
         if nistTable==[]:
             print ('Downloaded NIST table for element '+nist_element+' is empty!\n')
-            TIME.sleep(TIME_SLEEP)
+            info['status']='no_lines'
             return nistTable
         else:
-            # remove duplicates
-            df=pd.DataFrame(nistTable)
-            df=df.drop_duplicates()
-            nistTable=df.values.tolist()
-            # if there are same lines with different relative int, then take line with the
-            # highest relative intensity
-            ind=[]
-            for i in range(0,len(nistTable)-1):
-                l=nistTable[i][1]
-                if i not in ind:
-                    for j in range(i+1,len(nistTable)):
-                        l1=nistTable[j][1]
-                        if l==l1:
-                            ind.append(j)
-            nistTable=[nistTable[i] for i in range(len(nistTable)) if i not in ind]
+            # remove duplicates and if there are same lines with different relative int, 
+            # then take line with the highest relative intensity ---> table is sorted by 
+            # relative intensity, so the first line with given wavelength is kept (single pass)
+            nistTable=unique_wavelengths(nistTable)
+            info['status']='ok'
             return nistTable
     except Exception as e:
         print ('Something went wrong while trying to extract and rearrange '\
                'data from the table.')
         print ('Error message:\n'+str(e)+'\n')
-        TIME.sleep(TIME_SLEEP)
         nistTable=[]
         return nistTable
 
 # function that creates table for element in specific format
-def create_table(nist_element):
-    elTable=download_nist_el(nist_element)
+# (atomic_num_ion_num of element e.g. '26.01')
+def create_table(fetcher,nist_url,nist_element,atomic_num_ion_num,info):
+    elTable=download_nist_el(fetcher,nist_url,nist_element,info)
     if elTable!=[]:
         elementName=nist_element.split()[0]
         elementIonization=nist_element.split()[1]
-        atomic_num_ion_num=el_all_as_atom_num_ion_lev_num[elements_all.index(nist_element)]
         ri_max_val=max([elTable[i][0] for i in range(len(elTable))])        
         # this is sorted by relative intensity (because I downloaded element table like that)
         elTable=[[atomic_num_ion_num,elementName,elementIonization,elTable[i][1],
@@ -395,15 +363,45 @@ def create_table(nist_element):
                  for k in range(len(elTable[0]))]
     return elTable
 
-# write list to file
-def write_to_file(filename,listOfData):
-    with open(filename, 'w') as f:
-        for i in range(len(listOfData)):
-            if i>0:
-                item_str='\t'.join(listOfData[i])
-            else:
-                item_str=listOfData[i][0]
-            f.write(item_str+'\n')
+# content of the file (as a string) from list
+def file_content(listOfData):
+    content=[]
+    for i in range(len(listOfData)):
+        if i>0:
+            item_str='\t'.join(listOfData[i])
+        else:
+            item_str=listOfData[i][0]
+        content.append(item_str+'\n')
+    return ''.join(content)
+
+# write string to file (first to temporary file and then rename it, 
+# so that there is never half-written file)
+def write_to_file(filename,content):
+    with open(filename+'.tmp','w') as f:
+        f.write(content)
+    os.replace(filename+'.tmp',filename)
+
+# hash of file content
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+# hash of existing file (None if file doesn't exist)
+def file_hash(filename):
+    if not os.path.isfile(filename):
+        return None
+    with open(filename,'r') as f:
+        return content_hash(f.read())
+
+# read checkpoints of the build (completed species)
+def read_checkpoint(filename):
+    if os.path.isfile(filename):
+        with open(filename,'r') as f:
+            return json.load(f)
+    return {'started':None,'finished':None,'species':{}}
+
+# write checkpoints of the build (completed species)
+def write_checkpoint(filename,checkpoint):
+    write_to_file(filename,json.dumps(checkpoint,indent=1,sort_keys=True))
 
 ##############################################################################################
 ##############################################################################################
@@ -412,114 +410,226 @@ def write_to_file(filename,listOfData):
 ##############################################################################################
 ########################################## PROGRAM ###########################################
 
-print ('########################## Running script on '+currentDateTime+
-       ' ##########################\n')
-
-# obtaining table of elements with their levels of ionization
-elements,atomic_num_of_el,elements_with_ion,elements_all=retrive_elem_and_ions()
-if elements==[] or atomic_num_of_el==[] or elements_with_ion==[] or elements_all==[]:
-    print ('Obtained table is empty.')
-    print ('Please check.\n')
-    TIME.sleep(TIME_SLEEP)
-    # exit program
-    exit_program()
-
-try:
-    # element with the most ionization levels will be max ionization level
-    max_ionization=max([roman.fromRoman(e.split()[1]) for e in elements_all])    
-    # create list of ionization levels
-    ionization_levels=[roman.toRoman(i) for i in range(1,max_ionization+1)]    
-    # create list of ionization levels as numbers
-    ionization_levels_num=[str(i) if i>9 else '0'+str(i) for i in range(max_ionization)]    
-    # all elements represented as atomic number and ionization level num (list of lists)
-    el_as_atom_num_ion_lev_num=[[atomic_num_of_el[elements.index(e[i].split()[0])]+'.'
-                                 +ionization_levels_num[ionization_levels.index(e[i].split()[1])] 
-                                 for i in range(len(e))] for e in elements_with_ion]    
-    # all elements represented as atomic number and ionization level num (single list)
-    el_all_as_atom_num_ion_lev_num=[item for sublist in el_as_atom_num_ion_lev_num 
-                                    for item in sublist]    
-    # current working directory
-    cwd=os.getcwd()    
-    # nist file
-    nist_file=os.path.join(cwd,nist_filename)    
-    # if file already existed, delete and create new one
-    if os.path.isfile(nist_file):
-        os.remove(nist_file)    
-    # write to nist file
-    write_el_to_file(nist_file,'elements',elements)
-    write_el_to_file(nist_file,'atomic_num_of_el',atomic_num_of_el)
-    write_el_to_file(nist_file,'elements_with_ion',elements_with_ion)
-    write_el_to_file(nist_file,'elements_all',elements_all)
-    write_el_to_file(nist_file,'el_as_atom_num_ion_lev_num',el_as_atom_num_ion_lev_num)
-    write_el_to_file(nist_file,'el_all_as_atom_num_ion_lev_num',
-                     el_all_as_atom_num_ion_lev_num)
-    print ('File '+nist_filename+' was successfully created.\n')
-    TIME.sleep(TIME_SLEEP)    
-    # path to folder containing elements
-    elements_folder_path=os.path.join(cwd,elements_folder)    
-    # if folder already existed, delete folder
-    if os.path.isdir(elements_folder_path):
-        shutil.rmtree(elements_folder_path)    
-    # create elements folder
-    os.mkdir(elements_folder_path)
-    print ('Folder /'+elements_folder+'/ was successfully created.\n')
-    TIME.sleep(TIME_SLEEP)
-    print ('Creating relevant folders and files for NIST elements.\n')
-    TIME.sleep(TIME_SLEEP)
-    # go trough the list of elements ['H', 'He', ...]
-    for i in range(len(elements)):
-        print ('-------------------------------------------------------------------')
-        # create directory for that element
-        element_dir=os.path.join(elements_folder_path,elements[i])
-        os.mkdir(element_dir)
-        print ('Folder /'+elements[i]+'/ was successfully created inside /'
-               +elements_folder+'/ folder.\n')
-        TIME.sleep(TIME_SLEEP)
-        # go trough the list of element's ionization levels e.g. ['He I', 'He II']
-        print ('Element '+elements[i]+' has following ionization levels:')
-        print (elements_with_ion[i])
-        print ('\n')
-        TIME.sleep(TIME_SLEEP)
-        for j in range(len(elements_with_ion[i])):
-            # create table
-            elTable=create_table(elements_with_ion[i][j])
-            el_fname=elements_with_ion[i][j].replace(' ','_')
-            if elTable==[]:
-                print ('File '+el_fname+'.dat was not created.\n')
-                TIME.sleep(TIME_SLEEP)
+# build NIST library (download tables of all elements with their levels of ionization)
+# e.g. python creating_nist_lib.py workers=4 rate=2 resume=True
+def main(param):
+    # READ PARAMETERS (optional, if not specified default values are used)
+    nist_url=NIST_URL
+    workers=WORKERS
+    rate_limit=RATE_LIMIT
+    resume=RESUME
+    for i in range(len(param)):
+        if 'resume=' in param[i]:
+            resume=param[i].replace('resume=','').lower()=='true'
+        if 'url=' in param[i]:
+            nist_url=param[i].replace('url=','').rstrip('/')
+        if 'workers=' in param[i]:
+            workers=max(1,int(param[i].replace('workers=','')))
+        if 'rate=' in param[i]:
+            rate_limit=float(param[i].replace('rate=',''))
+
+    # shared connection pool (with retries and rate limiter) for all requests sent to NIST
+    fetcher=Fetcher(attempts=LOOP_NUM,backoff=TIME_SLEEP,connections=workers,
+                    rate_limiter=TokenBucket(rate_limit))
+
+    print ('########################## Running script on '+currentDateTime+
+           ' ##########################\n')
+
+    # obtaining table of elements with their levels of ionization
+    elements,atomic_num_of_el,elements_with_ion,elements_all=retrive_elem_and_ions(fetcher,nist_url)
+    if elements==[] or atomic_num_of_el==[] or elements_with_ion==[] or elements_all==[]:
+        print ('Obtained table is empty.')
+        print ('Please check.\n')
+        # exit program
+        exit_program()
+
+    # downloads of tables of all elements
+    tables=[]
+
+    try:
+        # element with the most ionization levels will be max ionization level
+        max_ionization=max([roman.fromRoman(e.split()[1]) for e in elements_all])    
+        # create list of ionization levels
+        ionization_levels=[roman.toRoman(i) for i in range(1,max_ionization+1)]    
+        # create list of ionization levels as numbers
+        ionization_levels_num=[str(i) if i>9 else '0'+str(i) for i in range(max_ionization)]    
+        # all elements represented as atomic number and ionization level num (list of lists)
+        el_as_atom_num_ion_lev_num=[[atomic_num_of_el[elements.index(e[i].split()[0])]+'.'
+                                     +ionization_levels_num[ionization_levels.index(e[i].split()[1])] 
+                                     for i in range(len(e))] for e in elements_with_ion]    
+        # all elements represented as atomic number and ionization level num (single list)
+        el_all_as_atom_num_ion_lev_num=[item for sublist in el_as_atom_num_ion_lev_num 
+                                        for item in sublist]    
+        # current working directory
+        cwd=os.getcwd()    
+        # nist file
+        nist_file=os.path.join(cwd,nist_filename)    
+        # if file already existed, delete and create new one
+        if os.path.isfile(nist_file):
+            os.remove(nist_file)    
+        # write to nist file
+        write_el_to_file(nist_file,'elements',elements)
+        write_el_to_file(nist_file,'atomic_num_of_el',atomic_num_of_el)
+        write_el_to_file(nist_file,'elements_with_ion',elements_with_ion)
+        write_el_to_file(nist_file,'elements_all',elements_all)
+        write_el_to_file(nist_file,'el_as_atom_num_ion_lev_num',el_as_atom_num_ion_lev_num)
+        write_el_to_file(nist_file,'el_all_as_atom_num_ion_lev_num',
+                         el_all_as_atom_num_ion_lev_num)
+        print ('File '+nist_filename+' was successfully created.\n')
+        # path to folder containing elements
+        elements_folder_path=os.path.join(cwd,elements_folder)    
+        # packed library (single columnar file) will be created again at the end
+        store_path=os.path.join(cwd,STORE_FILENAME)
+        if os.path.isfile(store_path):
+            os.remove(store_path)
+        # the same for species manifest
+        manifest_path=os.path.join(cwd,MANIFEST_FILENAME)
+        if os.path.isfile(manifest_path):
+            os.remove(manifest_path)
+        # checkpoints of the build
+        checkpoint_path=os.path.join(cwd,checkpoint_filename)
+        if resume and os.path.isdir(elements_folder_path):
+            checkpoint=read_checkpoint(checkpoint_path)
+            # previous build crashed ---> species it completed are not downloaded again
+            if checkpoint['started'] is not None and checkpoint['finished'] is None:
+                print ('Resuming build started at '+checkpoint['started']+'.\n')
+                build=checkpoint['started']
             else:
-                # rearrange data
-                elTable_transpose=list(map(list, zip(*elTable)))
-                # header for file
-                header=['atomic_num.ion_num\tname\tionization\twavelength(Ang)\t'\
-                        'relative_intensity\tfrac_of_max_rel_int\tflags\treference']
-                elTable_transpose.insert(0,header)
-                # write file
-                el_file_path=os.path.join(element_dir,el_fname+'.dat')
-                write_to_file(el_file_path,elTable_transpose)
-                print ('File '+el_fname+'.dat was successfully created.\n')
-                TIME.sleep(TIME_SLEEP)
-            print ('\n')
-        # check if element folder is empty
-        if os.listdir(element_dir)==[]:
-            # remove that folder
+                build=str(startTime)
+                checkpoint['started']=build
+            checkpoint['finished']=None
+        else:
+            # if folder already existed, delete folder
+            if os.path.isdir(elements_folder_path):
+                shutil.rmtree(elements_folder_path)
+            # create elements folder
+            os.mkdir(elements_folder_path)
+            print ('Folder /'+elements_folder+'/ was successfully created.\n')
+            build=str(startTime)
+            checkpoint={'started':build,'finished':None,'species':{}}
+        write_checkpoint(checkpoint_path,checkpoint)
+        print ('Creating relevant folders and files for NIST elements.\n')
+        # information about every species (from checkpoints of previous builds)
+        species_info={}
+        for el in elements_with_ion:
+            for e in el:
+                entry=checkpoint['species'].get(e)
+                if entry is None:
+                    species_info[e]={}
+                    continue
+                el_file_path=None
+                if entry['file'] is not None:
+                    el_file_path=os.path.join(elements_folder_path,e.split()[0],entry['file'])
+                # species completed by this build (file wasn't changed afterwards) is skipped
+                if entry['build']==build and (el_file_path is None or 
+                                              file_hash(el_file_path)==entry['sha256']):
+                    species_info[e]=dict(entry,status='done')
+                # species from previous build is downloaded only if it was changed in NIST
+                elif el_file_path is not None and file_hash(el_file_path)==entry['sha256']:
+                    species_info[e]={'etag':entry['etag'],'last_modified':entry['last_modified']}
+                else:
+                    species_info[e]={}
+        # download tables of all elements (with their levels of ionization) concurrently
+        # (at most workers downloads at the same time), files are written in the same order as before
+        executor=ThreadPoolExecutor(max_workers=workers)
+        tables=[[executor.submit(create_table,fetcher,nist_url,e,el_as_atom_num_ion_lev_num[i][j],
+                                 species_info[e]) 
+                 if species_info[e].get('status')!='done' else None for j,e in enumerate(el)] 
+                for i,el in enumerate(elements_with_ion)]
+        # go trough the list of elements ['H', 'He', ...]
+        for i in range(len(elements)):
+            print ('-------------------------------------------------------------------')
+            # create directory for that element
+            element_dir=os.path.join(elements_folder_path,elements[i])
+            if not os.path.isdir(element_dir):
+                os.mkdir(element_dir)
+                print ('Folder /'+elements[i]+'/ was successfully created inside /'
+                       +elements_folder+'/ folder.\n')
+            # go trough the list of element's ionization levels e.g. ['He I', 'He II']
+            print ('Element '+elements[i]+' has following ionization levels:')
+            print (elements_with_ion[i])
             print ('\n')
-            print ('Removing folder /'+elements[i]+'/ because it is empty.\n')
-            TIME.sleep(TIME_SLEEP)
-            shutil.rmtree(element_dir)
-        print ('-------------------------------------------------------------------\n\n')    
-    endTime=datetime.datetime.now()
-    executionTime=endTime-startTime
-    print ('######################## Total execution time of the script ---> '
-           +str(executionTime)+' #########################')
-    print ('\n\n')
-except Exception as e:
-    print ('Something went wrong during script execution.')
-    print ('Error message:\n'+str(e))
-    print ('Please check.\n')
-    TIME.sleep(TIME_SLEEP)
-    # exit program
-    exit_program()
+            for j in range(len(elements_with_ion[i])):
+                el_fname=elements_with_ion[i][j].replace(' ','_')
+                el_file_path=os.path.join(element_dir,el_fname+'.dat')
+                info=species_info[elements_with_ion[i][j]]
+                if info.get('status')=='done':
+                    print ('File '+el_fname+'.dat was already created by this build.\n')
+                    print ('\n')
+                    continue
+                # take table (wait until it is downloaded)
+                elTable=tables[i][j].result()
+                checkpoint_entry={'build':build,'file':None,'sha256':None,
+                                  'etag':info.get('etag'),'last_modified':info.get('last_modified')}
+                if info['status']=='not_modified':
+                    print ('File '+el_fname+'.dat was not changed.\n')
+                    checkpoint_entry['file']=el_fname+'.dat'
+                    checkpoint_entry['sha256']=file_hash(el_file_path)
+                elif elTable==[]:
+                    print ('File '+el_fname+'.dat was not created.\n')
+                    # file from previous build is not valid anymore
+                    if info['status']=='no_lines' and os.path.isfile(el_file_path):
+                        os.remove(el_file_path)
+                else:
+                    # rearrange data
+                    elTable_transpose=list(map(list, zip(*elTable)))
+                    # header for file
+                    header=['atomic_num.ion_num\tname\tionization\twavelength(Ang)\t'\
+                            'relative_intensity\tfrac_of_max_rel_int\tflags\treference']
+                    elTable_transpose.insert(0,header)
+                    content=file_content(elTable_transpose)
+                    checkpoint_entry['file']=el_fname+'.dat'
+                    checkpoint_entry['sha256']=content_hash(content)
+                    # write file (only if it is different from existing one)
+                    if file_hash(el_file_path)==checkpoint_entry['sha256']:
+                        print ('File '+el_fname+'.dat was not changed.\n')
+                    else:
+                        write_to_file(el_file_path,content)
+                        print ('File '+el_fname+'.dat was successfully created.\n')
+                # save checkpoint (failed downloads are tried again when the build is resumed)
+                if info['status']!='failed':
+                    checkpoint['species'][elements_with_ion[i][j]]=checkpoint_entry
+                    write_checkpoint(checkpoint_path,checkpoint)
+                print ('\n')
+            # check if element folder is empty
+            if os.listdir(element_dir)==[]:
+                # remove that folder
+                print ('\n')
+                print ('Removing folder /'+elements[i]+'/ because it is empty.\n')
+                shutil.rmtree(element_dir)
+            print ('-------------------------------------------------------------------\n\n')    
+        executor.shutdown()
+        fetcher.close()
+        print (fetcher.report())
+        # build is finished
+        checkpoint['finished']=str(datetime.datetime.now())
+        write_checkpoint(checkpoint_path,checkpoint)
+        # pack the whole library into a single columnar file
+        num_of_lines=write_store(elements_folder_path,store_path)
+        print ('File '+STORE_FILENAME+' was successfully created ('+str(num_of_lines)+' lines).\n')
+        # species manifest (atomic number, ion number, code, path and statistics of all NIST species,
+        # so that library is opened without scanning /NIST_ELEMENTS/ folder)
+        num_of_species=write_manifest(elements_folder_path,load_store(store_path),manifest_path,
+                                      elements_all)
+        print ('File '+MANIFEST_FILENAME+' was successfully created ('+str(num_of_species)+' species).\n')
+        endTime=datetime.datetime.now()
+        executionTime=endTime-startTime
+        print ('######################## Total execution time of the script ---> '
+               +str(executionTime)+' #########################')
+        print ('\n\n')
+    except Exception as e:
+        print ('Something went wrong during script execution.')
+        print ('Error message:\n'+str(e))
+        print ('Please check.\n')
+        # stop downloads that didn't start yet
+        for t in sum(tables,[]):
+            if t is not None:
+                t.cancel()
+        # exit program
+        exit_program()
+
+if __name__=='__main__':
+    main(sys.argv)
 
 ##############################################################################################
 ##############################################################################################
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import importlib
+
+
+############################################# PARAMETERS ###############################################
+
+# names exported by the package ---> module that defines them
+# (modules are imported only when a name is used, so that modules can also be run as scripts
+# e.g. python -m nist_lines.store create_line_list/NIST_ELEMENTS, without being imported before)
+exported_names={'STORE_FILENAME':'.store','LineStore':'.store','load_store':'.store',
+                'write_store':'.store','WavelengthIndex':'.index','LineLibrary':'.library',
+                'load_library':'.library'}
+
+__all__=list(exported_names.keys())
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# exported name e.g. load_library ---> imported from its module (when it is used for the first time)
+def __getattr__(name):
+    if name not in exported_names:
+        raise AttributeError("module 'nist_lines' has no attribute '"+name+"'")
+    value=getattr(importlib.import_module(exported_names[name],__name__),name)
+    globals()[name]=value
+    return value
+
+########################################################################################################
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import re
+
+
+############################################# PARAMETERS ###############################################
+
+# wavelength (first decimal number), relative intensity (first integer) and reference (text of link)
+wavelength_pattern=re.compile(r'\d+\.\d+')
+intensity_pattern=re.compile(r'\d+')
+reference_pattern=re.compile(r'>([A-Za-z\d]+)</a>')
+
+# start and end of <pre> block (NIST table of lines)
+pre_start_pattern=re.compile(r'<pre[\s>]',re.IGNORECASE)
+pre_end_pattern=re.compile(r'</pre\s*>',re.IGNORECASE)
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# error messages in NIST response (text of HTML elements that is equal to one of the messages)
+def error_messages(html,nist_errors):
+    pattern=re.compile('>('+'|'.join(re.escape(e) for e in nist_errors)+')<')
+    return pattern.findall(html)
+
+# lines of <pre> block of NIST response (including <pre> and </pre> tags)
+# ValueError is raised if there is no <pre> block (e.g. page is incomplete)
+def pre_block(html):
+    start=pre_start_pattern.search(html)
+    if start is None:
+        raise ValueError('There is no <pre> table in NIST response.')
+    end=pre_end_pattern.search(html,start.end())
+    if end is None:
+        raise ValueError('<pre> table in NIST response is incomplete.')
+    return html[start.start():end.end()].splitlines()
+
+# parse lines of NIST <pre> table (columns separated by |) in a single pass
+# ---> wavelengths (float, in Ang), relative intensities (float) and references
+# only lines with wavelength and non-zero relative intensity are taken
+# (positions of columns are found from the header (3rd line) and from the first row of data (7th line))
+def parse_pre_table(res):
+    header_row=[d.strip() for d in res[2].split('|')]
+    wave_ind=header_row.index('Observed')
+    rel_int_ind=header_row.index('Rel.')
+    ref_ind=res[6].count('|')-1
+    num_of_fields=max(wave_ind,rel_int_ind,ref_ind)+1
+    wl_search=wavelength_pattern.search
+    ri_search=intensity_pattern.search
+    ref_search=reference_pattern.search
+    wavelength=[]
+    relativeIntensity=[]
+    reference=[]
+    for row in res:
+        # lines without columns (e.g. separators)
+        if '|' not in row:
+            continue
+        data=row.split('|',num_of_fields)
+        x=wl_search(data[wave_ind])
+        if x is None:
+            continue
+        y=ri_search(data[rel_int_ind])
+        if y is None:
+            continue
+        y=float(y.group())
+        if y==0.0:
+            continue
+        wavelength.append(float(x.group()))
+        relativeIntensity.append(y)
+        ref=ref_search(data[ref_ind]) if len(data)>ref_ind else None
+        reference.append(ref.group(1) if ref is not None else '')
+    return wavelength,relativeIntensity,reference
+
+########################################################################################################
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import sys
+import pickle
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+
+############################################### FUNCTIONS ##############################################
+
+# key of a file (path, time of last modification, size) ---> if file is changed, key is changed
+def file_key(filename):
+    st=os.stat(filename)
+    return (os.path.abspath(filename),st.st_mtime_ns,st.st_size)
+
+# (approximate) number of bytes that parsed data takes in memory
+def data_size(data):
+    if isinstance(data,np.ndarray):
+        return data.nbytes
+    if isinstance(data,(list,tuple)):
+        return sys.getsizeof(data)+sum(data_size(e) for e in data)
+    if isinstance(data,dict):
+        return sys.getsizeof(data)+sum(data_size(k)+data_size(v) for k,v in data.items())
+    return sys.getsizeof(data)
+
+# in-process LRU cache of parsed files (with the limit for the number of bytes)
+# and optional on-disk (pickle) cache in sidecar_folder
+class FileCache(object):
+
+    def __init__(self,max_bytes=256*1024**2,sidecar_folder=None):
+        self.max_bytes=max_bytes
+        self.sidecar_folder=sidecar_folder
+        # path ---> [key, data, size]
+        self.entries=OrderedDict()
+        self.num_bytes=0
+        self.hits=0
+        self.misses=0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # remove data of given file (path)
+    def drop(self,path):
+        if path in self.entries:
+            self.num_bytes=self.num_bytes-self.entries.pop(path)[2]
+
+    # path of sidecar file for given file
+    def sidecar_path(self,path):
+        folder_hash=hashlib.md5(os.path.dirname(path).encode('utf-8')).hexdigest()[:8]
+        name=os.path.basename(path)+'.'+folder_hash+'.pkl'
+        return os.path.join(self.sidecar_folder,name)
+
+    # take data from sidecar file (only if it was created for the same key)
+    def read_sidecar(self,key):
+        try:
+            with open(self.sidecar_path(key[0]),'rb') as f:
+                sidecar=pickle.load(f)
+            if sidecar['key']==key:
+                return sidecar['data']
+        except Exception:
+            pass
+        return None
+
+    # write data to sidecar file (first to temporary file and then rename it)
+    def write_sidecar(self,key,data):
+        try:
+            if not os.path.isdir(self.sidecar_folder):
+                os.makedirs(self.sidecar_folder)
+            sidecar_file=self.sidecar_path(key[0])
+            with open(sidecar_file+'.tmp','wb') as f:
+                pickle.dump({'key':key,'data':data},f,protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(sidecar_file+'.tmp',sidecar_file)
+        except Exception as e:
+            print ('Unable to write cache file for '+key[0]+' ('+str(e)+').\n')
+
+    # parsed data of a file ---> parse_file(filename) is called only if file is not in cache
+    # (or if file was changed after it was put in cache)
+    def get(self,filename,parse_file):
+        key=file_key(filename)
+        path=key[0]
+        entry=self.entries.get(path)
+        if entry is not None and entry[0]==key:
+            self.entries.move_to_end(path)
+            self.hits=self.hits+1
+            return entry[1]
+        # file was changed (or it is not in cache)
+        self.drop(path)
+        self.misses=self.misses+1
+        data=None
+        if self.sidecar_folder is not None:
+            data=self.read_sidecar(key)
+        if data is None:
+            data=parse_file(filename)
+            if self.sidecar_folder is not None:
+                self.write_sidecar(key,data)
+        size=data_size(data)
+        # data bigger than the limit is not kept in memory
+        if size<=self.max_bytes:
+            self.entries[path]=[key,data,size]
+            self.num_bytes=self.num_bytes+size
+            # remove least recently used files
+            while self.num_bytes>self.max_bytes:
+                self.num_bytes=self.num_bytes-self.entries.popitem(last=False)[1][2]
+        return data
+
+########################################################################################################
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# generated from NIST_all_el_and_their_ion.txt by: python -m nist_lines.elements NIST_all_el_and_their_ion.txt
+
+# element ---> atomic number
+atomic_numbers={
+    'H':1,'He':2,'Li':3,'Be':4,'B':5,'C':6,'N':7,'O':8,'F':9,'Ne':10,'Na':11,'Mg':12,'Al':13,
+    'Si':14,'P':15,'S':16,'Cl':17,'Ar':18,'K':19,'Ca':20,'Sc':21,'Ti':22,'V':23,'Cr':24,'Mn':25,
+    'Fe':26,'Co':27,'Ni':28,'Cu':29,'Zn':30,'Ga':31,'Ge':32,'As':33,'Se':34,'Br':35,'Kr':36,'Rb':37,
+    'Sr':38,'Y':39,'Zr':40,'Nb':41,'Mo':42,'Tc':43,'Ru':44,'Rh':45,'Pd':46,'Ag':47,'Cd':48,'In':49,
+    'Sn':50,'Sb':51,'Te':52,'I':53,'Xe':54,'Cs':55,'Ba':56,'Hf':72,'Ta':73,'W':74,'Re':75,'Os':76,
+    'Ir':77,'Pt':78,'Au':79,'Hg':80,'Tl':81,'Pb':82,'Bi':83,'Po':84,'At':85,'Rn':86,'Fr':87,'Ra':88,
+    'La':57,'Ce':58,'Pr':59,'Nd':60,'Pm':61,'Sm':62,'Eu':63,'Gd':64,'Tb':65,'Dy':66,'Ho':67,'Er':68,
+    'Tm':69,'Yb':70,'Lu':71,'Ac':89,'Th':90,'Pa':91,'U':92,'Np':93,'Pu':94,'Am':95,'Cm':96,
+    }
+
+# ionization (roman numeral) ---> ion stage
+ion_stages={
+    'I':1,'II':2,'III':3,'IV':4,'V':5,'VI':6,'VII':7,'VIII':8,'IX':9,'X':10,'XI':11,'XII':12,
+    'XIII':13,'XIV':14,'XV':15,'XVI':16,'XVII':17,'XVIII':18,'XIX':19,'XX':20,'XXI':21,'XXII':22,
+    'XXIII':23,'XXIV':24,'XXV':25,'XXVI':26,'XXVII':27,'XXVIII':28,'XXIX':29,'XXX':30,'XXXI':31,
+    'XXXII':32,'XXXIII':33,'XXXIV':34,'XXXV':35,'XXXVI':36,'XXXVII':37,'XXXVIII':38,'XXXIX':39,
+    'XL':40,'XLI':41,'XLII':42,'XLIII':43,'XLIV':44,'XLV':45,'XLVI':46,'XLVII':47,'XLVIII':48,
+    'XLIX':49,'L':50,'LI':51,'LII':52,'LIII':53,'LIV':54,'LV':55,'LVI':56,'LVII':57,'LVIII':58,
+    'LIX':59,'LX':60,'LXI':61,'LXII':62,'LXIII':63,'LXIV':64,'LXV':65,'LXVI':66,'LXVII':67,
+    'LXVIII':68,'LXIX':69,'LXX':70,'LXXI':71,'LXXII':72,'LXXIII':73,'LXXIV':74,
+    }
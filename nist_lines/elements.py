@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import sys
+import ast
+from .element_table import atomic_numbers,ion_stages
+
+
+############################################# PARAMETERS ###############################################
+
+# file of all NIST elements and their ions (created by creating_nist_lib.py)
+NIST_FILENAME='NIST_all_el_and_their_ion.txt'
+
+# generated module with static tables of elements
+TABLE_FILENAME=os.path.join(os.path.dirname(os.path.abspath(__file__)),'element_table.py')
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# atomic number of element e.g. 'Fe' ---> 26
+# (static table, mendeleev is imported only for elements that are not in NIST list of elements)
+def atomic_number(element_name):
+    if element_name in atomic_numbers:
+        return atomic_numbers[element_name]
+    from mendeleev import element
+    atomic_numbers[element_name]=element(element_name).atomic_number
+    return atomic_numbers[element_name]
+
+# ionization (roman numeral) ---> ion stage e.g. 'II' ---> 2
+# (static table, roman is imported only for numerals that are not in NIST list of ions)
+def ion_stage(ionization):
+    if ionization in ion_stages:
+        return ion_stages[ionization]
+    import roman
+    ion_stages[ionization]=roman.fromRoman(ionization)
+    return ion_stages[ionization]
+
+# atomic_num.ion_num of species e.g. 'H I' ---> '01.00', 'Fe II' ---> '26.01'
+def species_atomic_num_ion_num(nist_element):
+    nameel=nist_element.split()
+    an=atomic_number(nameel[0])
+    ionn=ion_stage(nameel[1])-1
+    return ('0' if an<10 else '')+str(an)+'.'+('0' if ionn<10 else '')+str(ionn)
+
+# read lists of NIST_all_el_and_their_ion.txt (lines e.g. elements=["H", "He", ...]) ---> dict
+# name of list ---> list
+def read_element_lists(filename):
+    lists={}
+    with open(filename,'r') as f:
+        for line in f.read().splitlines():
+            if '=' in line:
+                name,value=line.split('=',1)
+                lists[name.strip()]=ast.literal_eval(value.strip())
+    return lists
+
+# lists of NIST_all_el_and_their_ion.txt ---> (element ---> atomic number, roman numeral ---> ion stage)
+# (ion stages are taken from atomic_num.ion_num of all species, so roman isn't needed)
+def element_tables(lists):
+    atomic_numbers=dict((el,int(an)) for el,an in zip(lists['elements'],lists['atomic_num_of_el']))
+    ion_stages={}
+    for nist_element,an_ionn in zip(lists['elements_all'],lists['el_all_as_atom_num_ion_lev_num']):
+        ion_stages[nist_element.split()[1]]=int(an_ionn.split('.')[1])+1
+    ion_stages=dict(sorted(ion_stages.items(),key=lambda e: e[1]))
+    return atomic_numbers,ion_stages
+
+# items of dict ---> lines of dict literal (several items in every line)
+def dict_lines(name,table,width=100):
+    lines=[name+'={']
+    for k,v in table.items():
+        item=repr(k)+':'+str(v)+','
+        if len(lines)==1 or len(lines[-1])+len(item)>width:
+            lines.append('    ')
+        lines[-1]=lines[-1]+item
+    return lines+['    }']
+
+# write module with static tables of elements (element_table.py) from NIST_all_el_and_their_ion.txt
+def write_element_table(nist_filename,filename=TABLE_FILENAME):
+    atomic_numbers,ion_stages=element_tables(read_element_lists(nist_filename))
+    content=['#!/usr/bin/env python3','# -*- coding: utf-8 -*-',
+             '# generated from '+os.path.basename(nist_filename)+' by: python -m nist_lines.elements '
+             +os.path.basename(nist_filename),'','# element ---> atomic number']
+    content=content+dict_lines('atomic_numbers',atomic_numbers)+['',
+                     '# ionization (roman numeral) ---> ion stage']
+    content=content+dict_lines('ion_stages',ion_stages)+['']
+    with open(filename+'.tmp','w') as f:
+        f.write('\n'.join(content))
+    os.replace(filename+'.tmp',filename)
+    return len(atomic_numbers),len(ion_stages)
+
+########################################################################################################
+
+
+############################################### PROGRAM ################################################
+
+# create static tables of elements again e.g.
+# python -m nist_lines.elements nist_library/NIST_all_el_and_their_ion.txt
+if __name__=='__main__':
+    if len(sys.argv)<2:
+        print ('Please specify path to '+NIST_FILENAME+' file.\n')
+        sys.exit()
+    num_el,num_ion=write_element_table(sys.argv[1])
+    print ('File '+TABLE_FILENAME+' was successfully created ('+str(num_el)+' elements, '
+           +str(num_ion)+' ionization levels).\n')
+
+########################################################################################################
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import json
+from collections import OrderedDict
+import numpy as np
+from .store import LineStore,exact_values,is_packed_file,read_columns,species_code,species_columns,\
+                   store_columns,write_columns
+
+
+############################################# PARAMETERS ###############################################
+
+# columnar formats of list of lines and their file extensions:
+# - packed - packed file of NIST library (memory-mapped, with wavelength index and ranking, see store.py)
+# - npz - compressed NumPy arrays
+# - parquet, arrow - Apache Parquet and Arrow IPC file (only if pyarrow is installed, otherwise
+#   npz is written)
+export_formats=OrderedDict([('packed','.bin'),('npz','.npz'),('parquet','.parquet'),('arrow','.arrow')])
+
+# columns of exported list of lines (packed file also has index and ranking columns), flags and
+# references are dictionary encoded (their values are in metadata)
+export_columns=[name for name,dtype in store_columns]
+
+# key of metadata in Parquet / Arrow schema
+META_KEY=b'nist_lines'
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# merged table (columns [[atomic_num.ion_num], [name], ..., [reference]], see LineLibrary.merge_manual)
+# ---> rows of every species e.g. [[2601, 'Fe', 'II', rows], ...] (rows stay in the same order)
+def table_species(rearrangedData):
+    species=OrderedDict()
+    for i in range(len(rearrangedData[0])):
+        row=[rearrangedData[k][i] for k in range(len(rearrangedData))]
+        code=species_code(row[0])
+        if code not in species:
+            species[code]=[code,row[1],row[2],[]]
+        species[code][3].append(row)
+    return list(species.values())
+
+# max rel. int. of selected table of species (columns, see LineLibrary.species_table), that was used
+# for fractions of max rel. int. ---> rel. int. / fraction of the line with the largest fraction
+# (None if table doesn't have rel. int.), it is exact if the strongest line is selected, otherwise
+# fractions are rounded (see LineLibrary.max_rel_int for species of NIST library)
+def selected_max_rel_int(table):
+    values=[(float(f),float(r)) for r,f in zip(table[4],table[5]) if r!='null' and f!='null' and float(f)>0]
+    if values==[]:
+        return None
+    frac,rel_int=max(values)
+    return rel_int/frac
+
+# write merged table (see table_species) with metadata (e.g. selection of every species) to file of
+# given format (see export_formats) ---> path of written file (filename is without extension)
+def write_line_table(filename,output_format,rearrangedData,meta):
+    columns,table_meta=species_columns(table_species(rearrangedData))
+    table_meta['list_of_lines']=meta
+    if output_format=='packed':
+        write_columns(filename+export_formats['packed'],columns,table_meta)
+        return filename+export_formats['packed']
+    # exact values of rel. int. and fractions (packed file keeps float32)
+    columns=dict((k,columns[k]) for k in export_columns)
+    columns['relative_intensity']=exact_values(columns['relative_intensity'])
+    columns['frac_of_max_rel_int']=exact_values(columns['frac_of_max_rel_int'])
+    if output_format in ['parquet','arrow']:
+        try:
+            import pyarrow
+        except ImportError:
+            print ('Package pyarrow is not installed, so the list of lines is written as '
+                   +export_formats['npz']+' file.\n')
+            output_format='npz'
+    if output_format=='npz':
+        np.savez_compressed(filename+export_formats['npz'],_meta=np.array(json.dumps(table_meta)),
+                            **columns)
+        return filename+export_formats['npz']
+    import pyarrow as pa
+    table=pa.table(columns).replace_schema_metadata({META_KEY:json.dumps(table_meta).encode('utf-8')})
+    if output_format=='parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table,filename+export_formats['parquet'])
+        return filename+export_formats['parquet']
+    # Arrow IPC file (uncompressed, so columns can be memory-mapped)
+    with pa.OSFile(filename+export_formats['arrow'],'wb') as sink:
+        with pa.ipc.new_file(sink,table.schema) as writer:
+            writer.write_table(table)
+    return filename+export_formats['arrow']
+
+# read exported list of lines (any format, see export_formats) ---> (columns, metadata)
+# (packed and Arrow files are memory-mapped, so columns are not copied)
+def read_line_table(filename):
+    if is_packed_file(filename):
+        return read_columns(filename)
+    if filename.endswith(export_formats['npz']):
+        with np.load(filename) as data:
+            meta=json.loads(str(data['_meta']))
+            return dict((k,data[k]) for k in data.files if k!='_meta'),meta
+    import pyarrow as pa
+    if filename.endswith(export_formats['parquet']):
+        import pyarrow.parquet as pq
+        table=pq.read_table(filename)
+    else:
+        table=pa.ipc.open_file(pa.memory_map(filename,'r')).read_all()
+    meta=json.loads(table.schema.metadata[META_KEY].decode('utf-8'))
+    return dict((k,table.column(k).to_numpy()) for k in table.column_names),meta
+
+# open exported list of lines as NIST library (LineStore, see store.py), so it can be searched and
+# its rows are in the same format as in list of lines file
+def load_line_table(filename):
+    columns,meta=read_line_table(filename)
+    return LineStore(filename if is_packed_file(filename) else None,columns,meta)
+
+########################################################################################################
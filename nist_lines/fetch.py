@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import time as TIME
+import threading
+import random
+
+
+############################################# PARAMETERS ###############################################
+
+# HTTP status codes after which request is sent again (server is busy or temporarily unavailable)
+retry_status=[429,500,502,503,504]
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# token bucket rate limiter (shared by all threads) ---> on average at most `rate` requests
+# per second, with at most `burst` requests at once (rate<=0 means no limit)
+class TokenBucket(object):
+
+    def __init__(self,rate,burst=1):
+        self.rate=float(rate)
+        self.burst=float(burst)
+        self.tokens=float(burst)
+        self.last=TIME.monotonic()
+        self.lock=threading.Lock()
+
+    # wait until request is allowed
+    def acquire(self):
+        if self.rate<=0:
+            return
+        while True:
+            with self.lock:
+                now=TIME.monotonic()
+                self.tokens=min(self.burst,self.tokens+(now-self.last)*self.rate)
+                self.last=now
+                if self.tokens>=1.0:
+                    self.tokens=self.tokens-1.0
+                    return
+                wait=(1.0-self.tokens)/self.rate
+            TIME.sleep(wait)
+
+# all attempts of the request failed
+class FetchError(Exception):
+    pass
+
+# shared HTTP layer for all requests sent to NIST:
+# - one pooled keep-alive session (connections are reused between requests and threads,
+#   at most `connections` open connections per host)
+# - gzip compressed responses
+# - requests that failed because of busy server or connection are sent again (at most `attempts`
+#   times) after exponential backoff with jitter (backoff, 2*backoff, 4*backoff, ... but not
+#   longer than max_backoff)
+# - metrics (number of requests, retries, fetched bytes and latency of every request)
+class Fetcher(object):
+
+    def __init__(self,attempts=10,backoff=2,max_backoff=60,connections=4,rate_limiter=None,timeout=120):
+        self.attempts=attempts
+        self.backoff=backoff
+        self.max_backoff=max_backoff
+        self.rate_limiter=rate_limiter
+        self.timeout=timeout
+        # requests is imported only when something is downloaded (it is slow to import, and
+        # scripts that use only NIST library don't need it)
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session=requests.Session()
+        # pool_block ---> threads wait for a free connection instead of opening new ones
+        adapter=HTTPAdapter(pool_connections=connections,pool_maxsize=connections,pool_block=True)
+        self.session.mount('http://',adapter)
+        self.session.mount('https://',adapter)
+        self.session.headers['Accept-Encoding']='gzip, deflate'
+        self.lock=threading.Lock()
+        self.requests=0
+        self.retries=0
+        self.failures=0
+        # bytes received from the server (compressed) and after decompression
+        self.bytes=0
+        self.content_bytes=0
+        # latency (in sec) of every request
+        self.latency=[]
+
+    def close(self):
+        self.session.close()
+
+    # wait time before attempt (attempt>=1) ---> exponential backoff with jitter
+    def wait_time(self,attempt,retry_after=None):
+        wait=min(self.max_backoff,self.backoff*2**(attempt-1))
+        wait=random.uniform(wait/2.0,wait)
+        # server asked to wait (e.g. 429 Too Many Requests)
+        if retry_after is not None and retry_after.isdigit():
+            wait=max(wait,min(self.max_backoff,float(retry_after)))
+        return wait
+
+    # send one request and record its metrics
+    def send(self,url,headers):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        t=TIME.monotonic()
+        try:
+            r=self.session.get(url,headers=headers,timeout=self.timeout)
+        finally:
+            latency=TIME.monotonic()-t
+            with self.lock:
+                self.requests=self.requests+1
+                self.latency.append(latency)
+        with self.lock:
+            self.bytes=self.bytes+(r.raw.tell() or len(r.content))
+            self.content_bytes=self.content_bytes+len(r.content)
+        return r
+
+    # GET request ---> returns parse_response(response) (or response if parse_response is None)
+    # request is sent again only if server is temporarily unavailable (status in retry_status)
+    # or if connection failed (connection error, timeout, incomplete transfer), 
+    # FetchError is raised if all attempts failed or at once if request can't succeed 
+    # (e.g. 404 Not Found, invalid url or parse_response raises exception)
+    # description is used in messages e.g. 'download table for element Fe II from NIST'
+    def get(self,url,parse_response=None,headers=None,description=None):
+        if description is None:
+            description='download '+url
+        import requests
+        # errors after which request is sent again
+        retry_errors=(requests.ConnectionError,requests.Timeout,
+                      requests.exceptions.ChunkedEncodingError)
+        retry_after=None
+        for attempt in range(self.attempts):
+            if attempt>0:
+                wait=self.wait_time(attempt,retry_after)
+                print ('Trying again ('+str(attempt+1)+' out of '+str(self.attempts)
+                       +') in '+str(round(wait,1))+' sec...\n')
+                with self.lock:
+                    self.retries=self.retries+1
+                TIME.sleep(wait)
+            retry_after=None
+            try:
+                r=self.send(url,headers)
+            except retry_errors as e:
+                self.message(description,e)
+                continue
+            except Exception as e:
+                self.fail(description,e)
+            if r.status_code in retry_status:
+                retry_after=r.headers.get('Retry-After')
+                self.message(description,str(r.status_code)+' '+str(r.reason)+' for url: '+url)
+                continue
+            if parse_response is None:
+                return r
+            try:
+                return parse_response(r)
+            except Exception as e:
+                self.fail(description,e)
+        with self.lock:
+            self.failures=self.failures+1
+        raise FetchError('Unable to '+description+' (after '+str(self.attempts)+' attempts).')
+
+    # print error of the request
+    def message(self,description,error):
+        print ('Something went wrong while trying to '+description+'.')
+        print ('Error message:\n'+str(error))
+
+    # request can't succeed (sending it again wouldn't help) ---> FetchError without other attempts
+    def fail(self,description,error):
+        self.message(description,error)
+        with self.lock:
+            self.failures=self.failures+1
+        raise FetchError('Unable to '+description+'.') from error
+
+    # metrics of all requests
+    def metrics(self):
+        with self.lock:
+            latency=sorted(self.latency)
+            metrics={'requests':self.requests,'retries':self.retries,'failures':self.failures,
+                     'bytes':self.bytes,'content_bytes':self.content_bytes}
+        if latency!=[]:
+            metrics['latency_mean']=sum(latency)/len(latency)
+            metrics['latency_median']=latency[len(latency)//2]
+            metrics['latency_p95']=latency[min(len(latency)-1,int(0.95*len(latency)))]
+            metrics['latency_max']=latency[-1]
+        return metrics
+
+    # metrics as text (e.g. for printing at the end of the script)
+    def report(self):
+        m=self.metrics()
+        text=('Requests sent to NIST: '+str(m['requests'])+' (retries: '+str(m['retries'])
+              +', failed downloads: '+str(m['failures'])+')\n'
+              +'Data fetched: '+str(round(m['bytes']/1024.0**2,2))+' MB ('
+              +str(round(m['content_bytes']/1024.0**2,2))+' MB uncompressed)\n')
+        if 'latency_mean' in m:
+            text=text+('Latency per request (sec): mean '+str(round(m['latency_mean'],3))
+                       +', median '+str(round(m['latency_median'],3))
+                       +', 95% '+str(round(m['latency_p95'],3))
+                       +', max '+str(round(m['latency_max'],3))+'\n')
+        return text
+
+########################################################################################################
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import numpy as np
+
+
+############################################### FUNCTIONS ##############################################
+
+# global index columns (all library lines sorted by wavelength) for columns of the store
+def index_columns(wavelength,species):
+    order=np.argsort(wavelength,kind='stable')
+    return {
+            'index_wavelength':np.asarray(wavelength,dtype='<f8')[order],
+            'index_row':order.astype('<i4'),
+            'index_species':np.asarray(species,dtype='<i2')[order]
+           }
+
+# all library lines sorted by wavelength (with species and row of the store alongside)
+class WavelengthIndex(object):
+
+    def __init__(self,wavelength,row,species):
+        self.wavelength=wavelength
+        self.row=row
+        self.species=species
+
+    def __len__(self):
+        return len(self.wavelength)
+
+    # positions (inside index) of lines within [wavelength-delta, wavelength+delta]
+    # found by bisection ---> O(log n)
+    def window(self,wavelength,delta):
+        start=int(np.searchsorted(self.wavelength,wavelength-delta,side='left'))
+        stop=int(np.searchsorted(self.wavelength,wavelength+delta,side='right'))
+        return start,stop
+
+    # the same for many lines at once (arrays of wavelengths and deltas)
+    def windows(self,wavelengths,deltas):
+        wavelengths=np.asarray(wavelengths,dtype=np.float64)
+        deltas=np.asarray(deltas,dtype=np.float64)
+        starts=np.searchsorted(self.wavelength,wavelengths-deltas,side='left')
+        stops=np.searchsorted(self.wavelength,wavelengths+deltas,side='right')
+        return starts,stops
+
+    # rows of the store (sorted by wavelength) within [wavelength-delta, wavelength+delta]
+    # ---> O(log n + k)
+    def lines(self,wavelength,delta):
+        start,stop=self.window(wavelength,delta)
+        return self.row[start:stop]
+
+    # species codes of lines within [wavelength-delta, wavelength+delta]
+    def species_codes(self,wavelength,delta):
+        start,stop=self.window(wavelength,delta)
+        return np.unique(self.species[start:stop])
+
+# index from columns of the store (if index was not saved in store, it is built now)
+def load_index(columns):
+    if 'index_wavelength' not in columns:
+        columns=index_columns(columns['wavelength'],columns['species'])
+    return WavelengthIndex(columns['index_wavelength'],columns['index_row'],
+                           columns['index_species'])
+
+########################################################################################################
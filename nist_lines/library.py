@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import numpy as np
+from .store import STORE_FILENAME,LineStore,exact_values,header,library_columns,load_store,species_anio
+from .select import select_lines,select_ranked
+from .search import search_store
+from .merge import merge_lines
+from .manifest import MANIFEST_FILENAME,read_manifest,species_info
+
+
+############################################### FUNCTIONS ##############################################
+
+# NIST library ---> /NIST_ELEMENTS/ folder (.dat files) and packed library NIST_ELEMENTS_lines.bin
+# (next to /NIST_ELEMENTS/ folder), which is used instead of .dat files if it exists
+# (nothing is read until library is used, and packed library is opened only once, so the same 
+# object can serve many searches)
+# .dat files are found from species manifest NIST_ELEMENTS_manifest.json (next to /NIST_ELEMENTS/
+# folder, see manifest.py), and folder is scanned only if manifest doesn't exist
+class LineLibrary(object):
+
+    def __init__(self,elements_folder_path,store_path=None,manifest_path=None):
+        self.elements_folder_path=elements_folder_path
+        library_folder=os.path.dirname(os.path.abspath(elements_folder_path))
+        if store_path is None:
+            store_path=os.path.join(library_folder,STORE_FILENAME)
+        if manifest_path is None:
+            manifest_path=os.path.join(library_folder,MANIFEST_FILENAME)
+        self.store_path=store_path
+        self.manifest_path=manifest_path
+        self._manifest=None
+        self._files=None
+        self._store=None
+        self._packed=None
+
+    # species manifest e.g. 'Fe II' ---> entry (see manifest.py) or {} if it doesn't exist
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            manifest={}
+            if os.path.isfile(self.manifest_path):
+                try:
+                    manifest=read_manifest(self.manifest_path)
+                except Exception as e:
+                    print ('Unable to read species manifest '+self.manifest_path+' ('+str(e)+').\n')
+            self._manifest=manifest
+        return self._manifest
+
+    # .dat files of all species e.g. 'Fe_II.dat' ---> path
+    @property
+    def files(self):
+        if self._files is None:
+            files={}
+            if self.manifest!={}:
+                for e in self.manifest.values():
+                    if e['path'] is None:
+                        continue
+                    files[os.path.basename(e['path'])]=os.path.join(self.elements_folder_path,
+                                                                    *e['path'].split('/'))
+            elif os.path.isdir(self.elements_folder_path):
+                for el in sorted(os.listdir(self.elements_folder_path)):
+                    el_path=os.path.join(self.elements_folder_path,el)
+                    if not os.path.isdir(el_path):
+                        continue
+                    for e in sorted(os.listdir(el_path)):
+                        files.setdefault(e,os.path.join(el_path,e))
+            self._files=files
+        return self._files
+
+    # packed library (None if NIST_ELEMENTS_lines.bin doesn't exist)
+    @property
+    def store(self):
+        if self._store is None and os.path.isfile(self.store_path):
+            self._store=load_store(self.store_path)
+        return self._store
+
+    # packed library or (if it doesn't exist) all .dat files packed in memory
+    # (it is needed for searching all species at once)
+    @property
+    def packed(self):
+        if self.store is not None:
+            return self.store
+        if self._packed is None:
+            columns,meta=library_columns(self.elements_folder_path)
+            self._packed=LineStore(None,columns,meta)
+        return self._packed
+
+    # path of .dat file of species e.g. 'Fe II' ---> .../Fe/Fe_II.dat (None if it doesn't exist)
+    def file_path(self,nist_element):
+        if self.manifest!={}:
+            entry=self.manifest.get(nist_element)
+            if entry is None or entry['path'] is None:
+                return None
+            return os.path.join(self.elements_folder_path,*entry['path'].split('/'))
+        return self.files.get(nist_element.replace(' ','_')+'.dat')
+
+    # check if species exists in library e.g. 'Fe II'
+    def __contains__(self,nist_element):
+        return self.file_path(nist_element) is not None
+
+    # species e.g. 'Fe II' ---> (atomic number, ion stage, code, path of .dat file (relative to
+    # /NIST_ELEMENTS/ folder), number of lines) e.g. (26, 2, 2601, 'Fe/Fe_II.dat', 11781) or None if
+    # it is not NIST species (taken from species manifest, or from packed library if manifest doesn't
+    # exist, then species without lines are not found)
+    def species_info(self,nist_element):
+        if self.manifest!={}:
+            return species_info(self.manifest,nist_element)
+        if self.store is not None and nist_element in self.store:
+            code,name,ionization,first,last=self.store.species_map[nist_element]
+            path=nist_element.split()[0]+'/'+nist_element.replace(' ','_')+'.dat'
+            return (code//100,code%100+1,code,path,last-first)
+        return None
+
+    # all species of library that have lines e.g. ['H I', 'He I', ...]
+    def species_names(self):
+        if self.manifest!={}:
+            return [e['species'] for e in self.manifest.values() if e['rows']>0]
+        return self.packed.species_names()
+
+    # rows of species .dat file (with header)
+    def read_file(self,nist_element):
+        with open(self.file_path(nist_element),'r') as f:
+            list_data=f.read().splitlines()
+        return [e.split('\t') for e in list_data]
+
+    # atomic_num.ion_num of species e.g. 'Fe II' ---> '26.01' (None if species is not in library
+    # or it doesn't have lines)
+    def atomic_num_ion_num(self,nist_element):
+        entry=self.manifest.get(nist_element)
+        if entry is not None and entry['code'] is not None:
+            return species_anio(entry['code'])
+        if self.store is not None and nist_element in self.store:
+            return species_anio(self.store.species_map[nist_element][0])
+        if nist_element not in self:
+            return None
+        list_data=self.read_file(nist_element)
+        if len(list_data)<2:
+            return None
+        return list_data[1][list_data[0].index('atomic_num.ion_num')]
+
+    # values of lines of species e.g. 'Ca II' ---> ((wavelength, relative_intensity, frac_of_max_rel_int)
+    # as float64 arrays, function that returns rows (as in .dat file) for given positions)
+    def species_values(self,nist_element):
+        # take data from packed library (if it exists)
+        if self.store is not None and nist_element in self.store:
+            first_row=self.store.species_slice(nist_element).start
+            store=self.store
+            return store.species_values(nist_element),lambda ind: store.rows(first_row+ind)
+        list_data=self.read_file(nist_element)
+        # map where are 'atomic_num.ion_num', 'name', 'ionization', 'wavelength(Ang)',
+        # 'relative_intensity', 'frac_of_max_rel_int', 'flags', 'reference'
+        ind=[list_data[0].index(h) for h in header]
+        list_data=[[e[i] for i in ind] for e in list_data[1:]]
+        values=(np.array([float(e[3]) for e in list_data],dtype=np.float64),
+                np.array([float(e[4]) for e in list_data],dtype=np.float64),
+                np.array([float(e[5]) for e in list_data],dtype=np.float64))
+        return values,lambda ind: [list_data[i] for i in ind.tolist()]
+
+    # select lines of species by parameters [% of data, fraction of max rel int, min rel int,
+    # lower wavelength, upper wavelength] (see select.py) ---> (rows, indication) where rows are
+    # [atomic_num.ion_num, name, ionization, wavelength, relative_intensity, frac_of_max_rel_int,
+    # flags, reference] (sorted by relative intensity) or ([], 'null') if nothing is selected
+    def select(self,nist_element,parameters,ri_flag='all'):
+        if nist_element not in self:
+            return [],'null'
+        # packed library has precomputed ranking of lines (nothing is sorted)
+        if self.store is not None and nist_element in self.store:
+            return self.select_ranked(nist_element,parameters,ri_flag)
+        values,rows=self.species_values(nist_element)
+        wavelength,relativeIntensity,fracOfMaxRelInt=values
+        selected,fracOfMaxRelInt,indication=select_lines(wavelength,relativeIntensity,
+                                                         fracOfMaxRelInt,parameters,ri_flag)
+        if indication=='null':
+            return [],indication
+        list_data=rows(selected)
+        wavelength=wavelength[selected].tolist()
+        relativeIntensity=relativeIntensity[selected].tolist()
+        fracOfMaxRelInt=fracOfMaxRelInt[selected].tolist()
+        nistTable=[[e[0],e[1],e[2],wavelength[i],relativeIntensity[i],fracOfMaxRelInt[i],e[6],e[7]]
+                   for i,e in enumerate(list_data)]
+        return nistTable,indication
+
+    # the same as select, but with precomputed ranking of lines of the species in packed library
+    # (only values of selected lines are taken from the library)
+    def select_ranked(self,nist_element,parameters,ri_flag='all'):
+        store=self.store
+        ind=store.species_slice(nist_element)
+        order,relativeIntensity,fracOfMaxRelInt=store.species_ranking(nist_element)
+        selected,changed_frac,indication=select_ranked(store.wavelength[ind],order,relativeIntensity,
+                                                       fracOfMaxRelInt,parameters,ri_flag)
+        if indication=='null':
+            return [],indication
+        rows=ind.start+selected
+        list_data=store.rows(rows)
+        wavelength=store.wavelength[rows].tolist()
+        relativeIntensity=exact_values(store.relative_intensity[rows]).tolist()
+        if changed_frac is None:
+            fracOfMaxRelInt=exact_values(store.frac_of_max_rel_int[rows]).tolist()
+        else:
+            fracOfMaxRelInt=changed_frac[selected].tolist()
+        nistTable=[[e[0],e[1],e[2],wavelength[i],relativeIntensity[i],fracOfMaxRelInt[i],e[6],e[7]]
+                   for i,e in enumerate(list_data)]
+        return nistTable,indication
+
+    # max rel. int. of species that fractions of max rel. int. of selected lines are relative to
+    # (max rel. int. of all lines, or of lines within wavelength range if ri_flag=='range', see
+    # select.py) or None if species doesn't have lines
+    def max_rel_int(self,nist_element,parameters,ri_flag='all'):
+        if nist_element not in self:
+            return None
+        (wavelength,relativeIntensity,fracOfMaxRelInt),rows=self.species_values(nist_element)
+        keep=np.ones(len(wavelength),dtype=bool)
+        if ri_flag=='range':
+            if parameters[3]!=0.0:
+                keep&=wavelength>=parameters[3]
+            if parameters[4]!=0.0:
+                keep&=wavelength<=parameters[4]
+        if not keep.any():
+            return None
+        return float(relativeIntensity[keep].max())
+
+    # selected lines of species (see select) as columns [[atomic_num.ion_num], [name], ...,
+    # [reference]] sorted by wavelength ---> (columns, indication) or ([], 'null')
+    def species_table(self,nist_element,parameters,ri_flag='all'):
+        nistTable,indication=self.select(nist_element,parameters,ri_flag)
+        if nistTable==[]:
+            return [],indication
+        return sorted_columns(nistTable),indication
+
+    # search all species of library for many lines at once e.g. [[4500,50],[7000,20],...] 
+    # ---> [lambda, delta], for every line [[element, [wavelengths], [rows]], ...] (see search.py)
+    def search(self,lines):
+        return search_store(self.packed,lines)
+
+    # merge tables of species (columns, see species_table) and manually added lines (columns) 
+    # into a single table (lines with the same wavelength of the same species are merged, 
+    # see merge.py) sorted by wavelength
+    def merge_manual(self,tables,manual_data=[]):
+        if manual_data==[]:
+            if tables==[]:
+                return []
+            return merge_lines(join_columns(tables))
+        manual_data=merge_lines(manual_data)
+        if tables==[]:
+            return manual_data
+        return merge_lines(join_columns(tables+[manual_data]),manual_data)
+
+# rows (sorted by relative intensity) ---> columns sorted by wavelength (stable sort)
+def sorted_columns(rows):
+    rows=sorted(rows,key=lambda row: row[3])
+    return [[row[k] for row in rows] for k in range(len(rows[0]))]
+
+# join tables (columns) into a single table
+def join_columns(tables):
+    return [[e for t in tables for e in t[k]] for k in range(len(tables[0]))]
+
+# open NIST library
+def load_library(elements_folder_path,store_path=None,manifest_path=None):
+    return LineLibrary(elements_folder_path,store_path,manifest_path)
+
+# library opened in worker process (for parallel searches of many species)
+worker_library=None
+
+# open library in worker process (initializer of process pool)
+def open_worker_library(elements_folder_path,store_path=None):
+    global worker_library
+    worker_library=LineLibrary(elements_folder_path,store_path)
+
+# select lines of species in worker process (see LineLibrary.select)
+def worker_select(nist_element,parameters,ri_flag='all'):
+    return worker_library.select(nist_element,parameters,ri_flag)
+
+########################################################################################################
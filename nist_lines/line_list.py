@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import re
+
+
+############################################# PARAMETERS ###############################################
+
+# header of list of lines
+list_header='atomic_num.ion_num\tname\tionization\twavelength(Ang)\trelative_intensity\t'\
+            'frac_of_max_rel_int\tflags\treference'
+
+# indications of selected tables and their descriptions in titles
+par=['percent_of_data','fraction_of_max_rel_int','min_rel_int']
+parr=['percent_of_data_within_range','fraction_of_max_rel_int_within_range',
+      'min_rel_int_within_range']
+par1=['% of data from maximum relative intensity',' fraction of maximum relative intensity',' of relative intensity']
+parr1=['% of data from maximum relative intensity within specified range',
+       ' fraction of maximum relative intensity within specified range',
+       ' of relative intensity within specified range']
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# read list of elements e.g. 'He I [0,0.2,0,2000,10000]' (default parameters are taken if they
+# are not specified) ---> [['He I', [0.0, 0.2, 0.0, 2000.0, 10000.0]], ...]
+def read_elements(filename,parameters_default_values):
+    with open(filename,'r') as f:
+        liOfEl=f.readlines()
+    liOfEl=[(x.rstrip()).split() for x in liOfEl if x.rstrip()!='']
+    for i in range(len(liOfEl)):
+        xx=liOfEl[i][0]+' '+liOfEl[i][1]
+        if len(liOfEl[i])<3:
+            yy=[float(x) for x in parameters_default_values]
+        else:
+            pom=(re.sub('\[|]','',liOfEl[i][2])).split(',')
+            yy=[float(pom[0]),float(pom[1]),float(pom[2]),float(pom[3]),float(pom[4])]
+        liOfEl[i]=[xx,yy]
+    return liOfEl
+
+# read manually added lines (TAB separated) ---> columns [[atomic_num.ion_num], [name], ...,
+# [reference]] or [] if there are no lines (rel. int. and fraction can be 'null')
+def read_manual_lines(filename):
+    with open(filename,'r') as f:
+        manually=f.readlines()
+    manually=[manually[i] for i in range(len(manually)) if manually[i].count('\t')==7]
+    if len(manually)<2:
+        return []
+    manually=[manually[i].split('\t') for i in range(1,len(manually))]
+    manually=[[manually[i][k].rstrip() for i in range(len(manually))]
+              for k in range(len(manually[0]))]
+    manually[3]=[float(manually[3][i]) for i in range(len(manually[3]))]
+    manually[4]=[float(manually[4][i]) if manually[4][i].lower()!='null' else 'null'
+                 for i in range(len(manually[4]))]
+    manually[5]=[float(manually[5][i]) if manually[5][i].lower()!='null' else 'null'
+                 for i in range(len(manually[5]))]
+    return manually
+
+# species of manually added lines sorted by atomic_num.ion_num ---> (melan, mtitles)
+# e.g. (['01.00', '26.01'], ['H I', 'Fe II'])
+def manual_species(manually):
+    if manually==[]:
+        return [],[]
+    melan=list(set(manually[0]))
+    mtitles=[manually[1][manually[0].index(a)]+' '+manually[2][manually[0].index(a)] for a in melan]
+    mel=[float(melan[i]) for i in range(len(melan))]
+    melan=[y for (x,y) in sorted(zip(mel,melan), key=lambda pair: pair[0], reverse=False)]
+    mtitles=[y for (x,y) in sorted(zip(mel,mtitles), key=lambda pair: pair[0], reverse=False)]
+    return melan,mtitles
+
+# rel_int_flag for every element (if element doesn't have wavelength range,
+# rel_int_flag 'range' is changed to 'all' for that element and for all next elements)
+def element_ri_flags(liOfEl,rel_int_flag):
+    ri_flags=[]
+    ri_flag=rel_int_flag
+    for el in liOfEl:
+        ri_flags.append(ri_flag)
+        if el[1][3]==0.0 and el[1][4]==0.0 and ri_flag=='range':
+            ri_flag='all'
+    return ri_flags
+
+# title of selected table of element (num is the number of lines, ind is indication of the table)
+def element_title(elName,elPar,rel_int_flag,ind,num):
+    if elPar[3]==0.0 and elPar[4]==0.0 and rel_int_flag=='range':
+        rel_int_flag='all'
+    if rel_int_flag=='all':
+        max_ri_msg="\nFor maximum rel. intensity of the element, "\
+                   "the maximum rel. intensity for all element "\
+                   "lines was taken."
+    else:
+        max_ri_msg="\nFor maximum rel. intensity of the element, "\
+                   "the maximum rel. intensity for specified range of "\
+                   "element lines was taken."
+    if ind!='all' and ind!='all_within_range':
+        if ind in par:
+            Index=par.index(ind)
+            if Index!=2:
+                title='Element : '+elName+max_ri_msg+'\nLines that are taken from NIST represent '\
+                      +str(elPar[Index])+par1[Index]+' ('+str(num)+' lines from NIST).'
+            else:
+                title='Element : '+elName+max_ri_msg+'\nLines that are taken from NIST represent values '\
+                      'above '+str(elPar[Index])+par1[Index]+' ('+str(num)+' lines from NIST).'
+        else:
+            Index=parr.index(ind)
+            if Index!=2:
+                title='Element : '+elName+max_ri_msg+'\nLines that are taken from NIST represent '\
+                      +str(elPar[Index])+parr1[Index]+' between '+str(elPar[3])+' - '\
+                      +str(elPar[4])+' Ang ('+str(num)+' lines from NIST).'
+            else:
+                title='Element : '+elName+max_ri_msg+'\nLines that are taken from NIST represent values '\
+                      'above '+str(elPar[Index])+parr1[Index]+' between '+str(elPar[3])+' - '\
+                      +str(elPar[4])+' Ang ('+str(num)+' lines from NIST).'
+    else:
+        if ind=='all':
+            title='Element : '+elName+max_ri_msg+'\nLines that are taken from NIST represent 100% of data '\
+                  'from NIST ('+str(num)+' lines from NIST).'
+        else:
+            title='Element : '+elName+max_ri_msg+'\nLines that are taken from NIST represent 100% of data '\
+                  'from NIST within specified range between '+str(elPar[3])+' - '\
+                  +str(elPar[4])+' Ang ('+str(num)+' lines from NIST).'
+    return title
+
+# list of lines (merged table, see LineLibrary.merge_manual) sorted by atomic_num.ion_num
+# with titles of elements (elan, titles) and titles of elements that have only manually
+# added lines (melan, mtitles) ---> (list of lines, number of lines of every element)
+def list_of_lines(rearrangedData,elan,titles,melan,mtitles):
+    # sort elements of tables by atomic_num.ion_num
+    elan_float=[float(elan[i]) for i in range(len(elan))]
+    elan=[y for (x,y) in sorted(zip(elan_float,elan), key=lambda pair: pair[0], reverse=False)]
+    titles=[y for (x,y) in sorted(zip(elan_float,titles), key=lambda pair: pair[0], reverse=False)]
+    # now sort rearranged data by atomic_number.ion_number
+    values=[float(rearrangedData[0][i]) for i in range(len(rearrangedData[0]))]
+    sortedData=[rearrangedData[0][i]+'\t'+rearrangedData[1][i]+'\t'+rearrangedData[2][i]+'\t'+
+          str(rearrangedData[3][i])+'\t'+str(rearrangedData[4][i])+'\t'+str(rearrangedData[5][i])+'\t'
+          +rearrangedData[6][i]+'\t'+rearrangedData[7][i] for i in range(len(rearrangedData[0]))]
+    nistTable=[y for (x,y) in sorted(zip(values,sortedData), key=lambda pair: pair[0], reverse=False)]
+    justAN=[nistTable[i][0:5] for i in range(len(nistTable))]
+    # position of the first line of every element
+    first_line={}
+    for i,x in enumerate(justAN):
+        first_line.setdefault(x,i)
+    indices=[first_line[y] for y in elan]
+    mindices_out=[melan[i] for i in range(len(melan)) if melan[i] not in elan]
+    mtitles_out=['Element : '+mtitles[i]+'\nOnly manually added lines for this element.'
+                for i in range(len(melan)) if melan[i] not in elan]
+    mindices_out=[first_line[x] for x in mindices_out]
+    indices=indices+mindices_out
+    titles=titles+mtitles_out
+    titles=[y for (x,y) in sorted(zip(indices,titles), key=lambda pair: pair[0], reverse=False)]
+    indices=sorted(indices)
+    elnum=[justAN.count(justAN[a]) for a in indices]
+    titles=[titles[i]+'\nTotal number of lines : '+str(elnum[i]) for i in range(len(elnum))]
+    titles=['\n'+a+'\n' for a in titles]
+    for i in range(len(indices)):
+        nistTable.insert(indices[i]+i,titles[i])
+    return nistTable,elnum
+
+# content of list of lines file
+def list_file_lines(nistTable,elnum):
+    return [list_header,'']+nistTable+['','TOTAL NUMBER OF ALL LINES : '+str(sum(elnum)),'']
+
+# content of MATLAB file (wavelengths of every element as MATLAB array with title as comment)
+def matlab_file_content(nistTable,elnum):
+    # headers
+    headers=[]
+    indices=[]
+    # matlab arrays
+    arrays=[]
+    for i in range(len(nistTable)):
+        if 'Element' in nistTable[i]:
+            hed=nistTable[i].split('\n')[1:len(nistTable[i].split('\n'))-1]
+            hed=['% '+h+'\n' for h in hed]
+            headers.append(''.join(hed))
+            indices.append(i)
+    for i in range(len(indices)):
+        if i!=len(indices)-1:
+            el_wavelengths=nistTable[indices[i]+1:indices[i+1]]
+        else:
+            el_wavelengths=nistTable[indices[i]+1:]
+        wavelen=[e.split('\t')[3] for e in el_wavelengths]
+        EL=el_wavelengths[0].split('\t')[1].lower()+el_wavelengths[0].split('\t')[2].lower()+'lines'
+        arrays.append(EL+'=['+' '.join(wavelen)+'];')
+    content=''
+    for i in range(len(headers)):
+        content=content+headers[i]+'\n'+arrays[i]+'\n\n'
+    content=content+'\n% TOTAL NUMBER OF ALL LINES : '+str(sum(elnum))+'\n\n'
+    return content
+
+########################################################################################################
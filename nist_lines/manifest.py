@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import sys
+import json
+from .store import STORE_FILENAME,LineStore,exact_values,library_columns,load_store,species_code
+from .elements import NIST_FILENAME,read_element_lists,species_atomic_num_ion_num
+
+
+############################################# PARAMETERS ###############################################
+
+# name of the species manifest file, placed next to /NIST_ELEMENTS/ folder
+MANIFEST_FILENAME='NIST_ELEMENTS_manifest.json'
+
+# version of the manifest (version 1 (list of entries) can still be read)
+MANIFEST_VERSION=2
+
+# columns of entries of the manifest (every species is a single row of values in the file)
+MANIFEST_COLUMNS=['species','symbol','ionization','atomic_num','ion_num','code','path','rows',
+                  'wavelength_min','wavelength_max','max_rel_int']
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# species manifest (catalogue) of NIST library ---> one entry for every .dat file of /NIST_ELEMENTS/
+# folder and for every species of NIST (nist_species e.g. ['H I', 'He I', ...], species without .dat
+# file have path=None): species (e.g. 'Fe II'), symbol, ionization, atomic number, ion number,
+# code (e.g. 2601), path (relative to /NIST_ELEMENTS/ folder, e.g. 'Fe/Fe_II.dat'), number of lines,
+# min and max wavelength and max relative intensity (statistics are taken from packed library
+# (store), species without lines have rows=0 and None values), sorted by code
+def species_manifest(elements_folder_path,store,nist_species=None):
+    species={}
+    for el in sorted(os.listdir(elements_folder_path)):
+        el_path=os.path.join(elements_folder_path,el)
+        if not os.path.isdir(el_path):
+            continue
+        for e in sorted(os.listdir(el_path)):
+            if not e.endswith('.dat'):
+                continue
+            nist_element=e[:-len('.dat')].replace('_',' ')
+            species[nist_element]=species_entry(nist_element,el+'/'+e,store)
+    for nist_element in (nist_species or []):
+        if nist_element not in species:
+            species[nist_element]=species_entry(nist_element,None,store)
+    return sorted(species.values(),key=lambda e: (e['code'] is None,e['code'],e['species']))
+
+# entry of species in manifest (see species_manifest)
+def species_entry(nist_element,path,store):
+    entry={'species':nist_element,'symbol':nist_element.split()[0],
+           'ionization':nist_element.split()[-1],'atomic_num':None,'ion_num':None,'code':None,
+           'path':path,'rows':0,'wavelength_min':None,'wavelength_max':None,'max_rel_int':None}
+    if nist_element in store:
+        code,name,ionization,first,last=store.species_map[nist_element]
+        wavelength=exact_values(store.wavelength[first:last])
+        relative_intensity=exact_values(store.relative_intensity[first:last])
+        entry.update({'rows':last-first,'wavelength_min':float(wavelength.min()),
+                      'wavelength_max':float(wavelength.max()),
+                      'max_rel_int':float(relative_intensity.max())})
+    else:
+        # species without lines (atomic number and ion number are taken from static tables)
+        try:
+            code=species_code(species_atomic_num_ion_num(nist_element))
+        except Exception:
+            return entry
+    entry.update({'atomic_num':code//100,'ion_num':code%100,'code':code})
+    return entry
+
+# write species manifest (first to temporary file and then rename it), species are written as rows
+# of values (columns are MANIFEST_COLUMNS), so the file is compact
+def write_manifest(elements_folder_path,store,filename,nist_species=None):
+    species=species_manifest(elements_folder_path,store,nist_species)
+    manifest={'version':MANIFEST_VERSION,
+              'elements_folder':os.path.basename(os.path.normpath(elements_folder_path)),
+              'columns':MANIFEST_COLUMNS,
+              'species':[[e[k] for k in MANIFEST_COLUMNS] for e in species]}
+    with open(filename+'.tmp','w') as f:
+        json.dump(manifest,f,separators=(',',':'))
+    os.replace(filename+'.tmp',filename)
+    return len(species)
+
+# read species manifest ---> species (e.g. 'Fe II') ---> entry
+def read_manifest(filename):
+    with open(filename,'r') as f:
+        manifest=json.load(f)
+    if manifest.get('version')==1:
+        species=manifest['species']
+        for e in species:
+            e['code']=None if e['atomic_num'] is None else e['atomic_num']*100+e['ion_num']
+    elif manifest.get('version')==MANIFEST_VERSION:
+        species=[dict(zip(manifest['columns'],e)) for e in manifest['species']]
+    else:
+        raise ValueError('File '+str(filename)+' has unsupported version '
+                         +str(manifest.get('version'))+'.')
+    return dict((e['species'],e) for e in species)
+
+# species of manifest e.g. 'Fe II' ---> (atomic number, ion stage, code, path, number of lines)
+# e.g. (26, 2, 2601, 'Fe/Fe_II.dat', 2311) or None if species is not in manifest
+def species_info(manifest,nist_element):
+    entry=manifest.get(nist_element)
+    if entry is None:
+        return None
+    return (entry['atomic_num'],None if entry['ion_num'] is None else entry['ion_num']+1,entry['code'],
+            entry['path'],entry['rows'])
+
+########################################################################################################
+
+
+############################################### PROGRAM ################################################
+
+# create manifest of already existing library e.g. python -m nist_lines.manifest NIST_ELEMENTS
+# (statistics are taken from NIST_ELEMENTS_lines.bin if it exists next to the folder, and all NIST
+# species are taken from NIST_all_el_and_their_ion.txt next to the folder or from the file given
+# with argument species=... e.g. species=nist_library/NIST_all_el_and_their_ion.txt)
+if __name__=='__main__':
+    if len(sys.argv)<2:
+        print ('Please specify path to /NIST_ELEMENTS/ folder.\n')
+        sys.exit()
+    elements_folder_path=sys.argv[1]
+    library_folder=os.path.dirname(os.path.abspath(elements_folder_path))
+    nist_file=os.path.join(library_folder,NIST_FILENAME)
+    arguments=[]
+    for e in sys.argv[2:]:
+        if 'species=' in e:
+            nist_file=e.replace('species=','')
+        else:
+            arguments.append(e)
+    if len(arguments)>0:
+        manifest_file=arguments[0]
+    else:
+        manifest_file=os.path.join(library_folder,MANIFEST_FILENAME)
+    store_file=os.path.join(library_folder,STORE_FILENAME)
+    if os.path.isfile(store_file):
+        store=load_store(store_file)
+    else:
+        store=LineStore(None,*library_columns(elements_folder_path))
+    nist_species=None
+    if os.path.isfile(nist_file):
+        nist_species=read_element_lists(nist_file)['elements_all']
+    num=write_manifest(elements_folder_path,store,manifest_file,nist_species)
+    print ('File '+manifest_file+' was successfully created ('+str(num)+' species).\n')
+
+########
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+
+############################################### FUNCTIONS ##############################################
+
+# remove duplicates from downloaded NIST table [[rel. int., wavelength, reference], ...] sorted by
+# relative intensity (descending): if there are same lines with different relative int, then line with
+# the highest relative intensity is taken ---> the first line with given wavelength is kept (single pass)
+def unique_wavelengths(table):
+    seen_wavelengths=set()
+    unique_lines=[]
+    for line in table:
+        if line[1] not in seen_wavelengths:
+            seen_wavelengths.add(line[1])
+            unique_lines.append(line)
+    return unique_lines
+
+# merge values (rel. int. or fraction of max rel. int.) of merged lines ---> max of values
+# ('null' means that value is not known)
+def merge_values(values):
+    if len(values)>1:
+        return max([e for e in values if e!='null'])
+    return values[0]
+
+# merge flags (or references) of merged lines e.g. ['NIST', 'M'] ---> 'NIST;M'
+# if line is also manually added line (manual_row is its row in manual_data) and manually added
+# line has lower rel. int. than merged line, then flags (or references) of manually added line
+# are not taken (if any of rel. int. is not known ('null'), everything is taken)
+def merge_flag_ref(flags,relativeIntensity,manual_data,manual_row,column):
+    # if there are more than one flag in list of flags
+    if len(flags)>1:
+        if manual_row is not None:
+            ri=manual_data[4][manual_row]
+            if str(ri)!='null' and str(relativeIntensity)!='null' and ri < relativeIntensity:
+                # don't take manually added flags and references
+                return ';'.join(e for e in flags if e not in manual_data[column][manual_row] and e!='')
+        # return everything
+        return ';'.join(e for e in flags if e!='')
+    return flags[0]
+
+# merge lines with the same wavelength of the same species (atomic_num.ion_num) e.g. line from NIST
+# and the same manually added line
+# data ---> columns [atomic_num.ion_num, name, ionization, wavelength, relative_intensity,
+#           frac_of_max_rel_int, flags, reference] (rel. int. and fraction can be 'null', flags and
+#           references can have more entries separated by ;)
+# manual_data ---> already merged manually added lines (columns), if they are added to data
+#                  (see merge_flag_ref), or None
+# the first line with given species and wavelength is kept and other lines are merged into it:
+# max rel. int. and max fraction are taken, and flags and references are joined (without repetition)
+# returns merged lines (columns) sorted by wavelength
+# (lines are grouped in a dictionary, so it is O(n log n) because of sorting)
+def merge_lines(data,manual_data=None):
+    anio,name,ionization,wavelength,relativeIntensity,fracOfMaxRelInt,flags,reference=data[:8]
+    # (species, wavelength) ---> position of merged line
+    merged_position={}
+    # rows that are kept and their merged values
+    rows=[]
+    ri=[]
+    frac=[]
+    flag_lists=[]
+    ref_lists=[]
+    for i in range(len(wavelength)):
+        key=(anio[i],wavelength[i])
+        position=merged_position.get(key)
+        if position is None:
+            merged_position[key]=len(rows)
+            rows.append(i)
+            ri.append([relativeIntensity[i]])
+            frac.append([fracOfMaxRelInt[i]])
+            flag_lists.append(flags[i].split(';'))
+            ref_lists.append(reference[i].split(';'))
+            continue
+        # merge line into the first line with the same species and wavelength
+        if relativeIntensity[i] not in ri[position]:
+            ri[position].append(relativeIntensity[i])
+            frac[position].append(fracOfMaxRelInt[i])
+        # flags and references (posible many entries for manually added lines)
+        for merged,new in ((flag_lists[position],flags[i]),(ref_lists[position],reference[i])):
+            existing=set(k.lower() for k in merged)
+            merged.extend([e for e in new.split(';') if e.lower() not in existing])
+    ri=[merge_values(e) for e in ri]
+    frac=[merge_values(e) for e in frac]
+    if manual_data is not None:
+        # wavelength ---> first row of manually added lines with that wavelength
+        manual_rows={}
+        for i,w in enumerate(manual_data[3]):
+            manual_rows.setdefault(w,i)
+        manual=[manual_rows.get(wavelength[i]) for i in rows]
+        flag_column=[merge_flag_ref(e,ri[k],manual_data,manual[k],6) for k,e in enumerate(flag_lists)]
+        ref_column=[merge_flag_ref(e,ri[k],manual_data,manual[k],7) for k,e in enumerate(ref_lists)]
+    else:
+        flag_column=[';'.join(e for e in f if e!='') for f in flag_lists]
+        ref_column=[';'.join(e for e in r if e!='') for r in ref_lists]
+    # sort everyting by wavelengths (stable sort)
+    order=sorted(range(len(rows)),key=lambda k: wavelength[rows[k]])
+    rows=[rows[k] for k in order]
+    return [[anio[i] for i in rows],[name[i] for i in rows],[ionization[i] for i in rows],
+            [wavelength[i] for i in rows],[ri[k] for k in order],[frac[k] for k in order],
+            [flag_column[k] for k in order],[ref_column[k] for k in order]]
+
+########################################################################################################
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import io
+import sys
+import threading
+
+
+############################################### FUNCTIONS ##############################################
+
+# standard output that keeps printed text of every thread separately (while thread is capturing
+# its output), so that messages of parallel tasks can be printed in the same order as tasks
+class ThreadOutput(object):
+
+    def __init__(self,stream):
+        self.stream=stream
+        self.local=threading.local()
+
+    def write(self,text):
+        buffer=getattr(self.local,'buffer',None)
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self,name):
+        return getattr(self.stream,name)
+
+# lock for replacing standard output
+output_lock=threading.Lock()
+
+# call function and return (result, text printed by the function)
+# (works in threads and in worker processes)
+def call_captured(function,*args):
+    with output_lock:
+        if not isinstance(sys.stdout,ThreadOutput):
+            sys.stdout=ThreadOutput(sys.stdout)
+        output=sys.stdout
+    output.local.buffer=io.StringIO()
+    try:
+        result=function(*args)
+    except Exception:
+        # print messages before the error
+        text=output.local.buffer.getvalue()
+        output.local.buffer=None
+        output.stream.write(text)
+        raise
+    text=output.local.buffer.getvalue()
+    output.local.buffer=None
+    return result,text
+
+########################################################################################################
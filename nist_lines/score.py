@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import numpy as np
+from .store import exact_values,load_store
+from .shift import light_speed,shift_wavelengths
+
+
+############################################# PARAMETERS ###############################################
+
+# max number of values (lines x velocities) that are evaluated at once
+CHUNK_VALUES=4000000
+
+# header of ranked table of species
+score_header='rank\tspecies\tvelocity(km/s)\tscore\tnumber_of_lines'
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# signal of spectrum (rest wavelength, normalized flux) ---> (sorted wavelengths, signal) where signal
+# is running mean of flux within +/- window/2 Ang (continuum) minus flux, in units of its standard
+# deviation (absorption features are positive)
+def spectrum_signal(wavelength,flux,window=100.0):
+    order=np.argsort(wavelength,kind='stable')
+    wavelength=np.asarray(wavelength,dtype=np.float64)[order]
+    flux=np.asarray(flux,dtype=np.float64)[order]
+    # running mean from cumulative integral of flux (trapezoidal rule)
+    integral=np.concatenate(([0.0],np.cumsum(np.diff(wavelength)*(flux[1:]+flux[:-1])/2)))
+    lower=np.clip(wavelength-window/2.0,wavelength[0],wavelength[-1])
+    upper=np.clip(wavelength+window/2.0,wavelength[0],wavelength[-1])
+    width=upper-lower
+    continuum=flux.copy()
+    wide=width>0
+    continuum[wide]=(np.interp(upper[wide],wavelength,integral)
+                     -np.interp(lower[wide],wavelength,integral))/width[wide]
+    signal=continuum-flux
+    std=signal.std()
+    if std>0:
+        signal=signal/std
+    return wavelength,signal
+
+# the strongest lines (at most max_lines by relative intensity) of every given species of the store
+# within [lower, upper] Ang ---> (rows of the store grouped by species, weights (fractions of max
+# rel. int.), first position of every group, species of every group)
+# (taken from precomputed ranking of the store, for all species at once)
+def strongest_lines(store,species_names,lower,upper,max_lines):
+    species_names=[e for e in species_names if e in store]
+    if species_names==[]:
+        return np.zeros(0,dtype=np.int64),np.zeros(0),np.zeros(0,dtype=np.int64),[]
+    first=np.array([store.species_map[e][3] for e in species_names],dtype=np.int64)
+    last=np.array([store.species_map[e][4] for e in species_names],dtype=np.int64)
+    lengths=last-first
+    ranking=store.ranking
+    # positions of species in ranking columns (the same as positions in the store)
+    ends=np.cumsum(lengths)
+    pos=np.repeat(first-(ends-lengths),lengths)+np.arange(ends[-1])
+    rows=np.repeat(first,lengths)+ranking['rank_row'][pos]
+    wavelength=store.wavelength[rows]
+    inside=(wavelength>=lower)&(wavelength<=upper)
+    # number of lines within range up to every line (within species)
+    count=np.cumsum(inside)
+    before=np.concatenate(([0],count[ends[:-1]-1]))
+    keep=inside&(count-np.repeat(before,lengths)<=max_lines)
+    group=np.repeat(np.arange(len(species_names)),lengths)[keep]
+    rows=rows[keep]
+    weights=exact_values(ranking['rank_frac_of_max_rel_int'][pos[keep]])
+    # groups that have lines
+    starts=np.flatnonzero(np.concatenate(([True],group[1:]!=group[:-1])))[:len(group)]
+    return rows,weights,starts,[species_names[i] for i in group[starts].tolist()]
+
+# scores of combs of lines (rest wavelengths with weights, grouped by species: groups start at
+# positions starts) against spectrum signal for every velocity ---> (scores, number of lines) as
+# arrays (groups x velocities)
+# score is cross-correlation of comb and signal: sum(w*signal(shifted line))/sqrt(sum(w^2)) over lines
+# that are within spectrum after the shift (score of comb at random positions is ~ N(0,1))
+def comb_scores(wavelength,weights,starts,spectrum_wavelength,signal,velocities,c=light_speed,
+                relativistic=False):
+    # all velocities at once (velocities x lines)
+    shifted=shift_wavelengths(wavelength,velocities,c,relativistic)
+    inside=(shifted>=spectrum_wavelength[0])&(shifted<=spectrum_wavelength[-1])
+    w=inside*weights
+    values=np.interp(shifted,spectrum_wavelength,signal)*w
+    correlation=np.add.reduceat(values,starts,axis=1)
+    norm=np.sqrt(np.add.reduceat(w*w,starts,axis=1))
+    lines=np.add.reduceat(inside.astype(np.int64),starts,axis=1)
+    scores=np.full(correlation.shape,np.nan)
+    np.divide(correlation,norm,out=scores,where=norm>0)
+    return scores.T,lines.T
+
+# score species of the store against spectrum signal (see spectrum_signal) for every velocity of a
+# grid ---> (species, scores, number of lines), scores are arrays (species x velocities)
+# (only species with lines within spectrum range are scored, species are evaluated in chunks
+# of at most CHUNK_VALUES values)
+def score_species(store,species_names,spectrum_wavelength,signal,velocities,max_lines=50,
+                  c=light_speed,relativistic=False):
+    velocities=np.atleast_1d(np.asarray(velocities,dtype=np.float64))
+    # range of rest wavelengths of lines that can be shifted into spectrum
+    factors=shift_wavelengths(1.0,velocities,c,relativistic)
+    lower=spectrum_wavelength[0]/factors.max()
+    upper=spectrum_wavelength[-1]/factors.min()
+    rows,weights,starts,species=strongest_lines(store,species_names,lower,upper,max_lines)
+    wavelength=store.wavelength[rows]
+    ends=np.append(starts[1:],len(rows))
+    scores=[]
+    lines=[]
+    first=0
+    while first<len(starts):
+        # species of the chunk
+        last=first+1
+        while last<len(starts) and (ends[last]-starts[first])*len(velocities)<=CHUNK_VALUES:
+            last=last+1
+        ind=slice(starts[first],ends[last-1])
+        s,n=comb_scores(wavelength[ind],weights[ind],starts[first:last]-starts[first],
+                        spectrum_wavelength,signal,velocities,c,relativistic)
+        scores.append(s)
+        lines.append(n)
+        first=last
+    if scores==[]:
+        return [],np.zeros((0,len(velocities))),np.zeros((0,len(velocities)),dtype=np.int64)
+    return species,np.concatenate(scores),np.concatenate(lines)
+
+# ranked table of species ---> [[species, best velocity, score, number of lines], ...] sorted by
+# score (the best velocity of every species is the velocity with the highest score, and only
+# velocities with at least min_lines lines within spectrum are taken)
+def ranked_species(species,velocities,scores,lines,min_lines=1):
+    if len(species)==0:
+        return []
+    scores=np.where(np.isnan(scores)|(lines<min_lines),-np.inf,scores)
+    best=scores.argmax(axis=1)
+    best_scores=scores[np.arange(len(species)),best]
+    order=np.argsort(-best_scores,kind='stable')
+    return [[species[i],float(velocities[best[i]]),float(best_scores[i]),int(lines[i,best[i]])]
+            for i in order.tolist() if np.isfinite(best_scores[i])]
+
+# lines of ranked table (with header)
+def ranked_table_lines(table):
+    return [score_header]+[str(i+1)+'\t'+e[0]+'\t'+str(e[1])+'\t'+'%.3f' % e[2]+'\t'+str(e[3])
+                           for i,e in enumerate(table)]
+
+# packed library of worker process (for parallel scoring of species)
+worker_store=None
+
+# open packed library in worker process (initializer of process pool)
+def open_worker_store(store_path):
+    global worker_store
+    worker_store=load_store(store_path)
+
+# score species in worker process (see score_species)
+def worker_score(species_names,spectrum_wavelength,signal,velocities,max_lines=50,c=light_speed,
+                 relativistic=False):
+    return score_species(worker_store,species_names,spectrum_wavelength,signal,velocities,max_lines,
+                         c,relativistic)
+
+########################################################################################################
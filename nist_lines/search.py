@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import numpy as np
+from itertools import groupby
+from .index import index_columns,load_index
+
+
+############################################# PARAMETERS ###############################################
+
+# result of batch search (one row per searched line)
+# lines inside index that are within range are index.row[start:stop]
+batch_dtype=np.dtype([('wavelength','<f8'),('delta','<f8'),('start','<i8'),('stop','<i8')])
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# index of a line list (e.g. file with lines) ---> wavelengths[i] are (sorted) wavelengths
+# of i-th element, and rows of the index are positions in the flattened list of lines
+# (so sorted rows are again grouped by element and sorted by wavelength within element)
+def line_list_index(wavelengths):
+    wl=np.array([w for l in wavelengths for w in l],dtype=np.float64)
+    el=np.repeat(np.arange(len(wavelengths)),[len(l) for l in wavelengths])
+    return load_index(index_columns(wl,el))
+
+# search index for many lines at once e.g. [[4500,50],[7000,20],...] ---> [lambda, delta]
+# both edges of ranges of all lines are found by bisection of sorted wavelengths of the
+# index in one vectorised np.searchsorted call (edges are sorted first, so consecutive
+# lookups touch nearby parts of the index), so it is O(m log m + m log n) and not O(n*m)
+def batch_search(index,lines):
+    lines=np.asarray(lines,dtype=np.float64).reshape(-1,2)
+    lower=lines[:,0]-lines[:,1]
+    upper=lines[:,0]+lines[:,1]
+    result=np.zeros(len(lines),dtype=batch_dtype)
+    result['wavelength']=lines[:,0]
+    result['delta']=lines[:,1]
+    order=np.argsort(lower,kind='stable')
+    result['start'][order]=np.searchsorted(index.wavelength,lower[order],side='left')
+    order=np.argsort(upper,kind='stable')
+    result['stop'][order]=np.searchsorted(index.wavelength,upper[order],side='right')
+    # if range is negative (e.g. negative delta) there are no lines
+    result['stop']=np.maximum(result['stop'],result['start'])
+    return result
+
+# rows of the index for every searched line (sorted, i.e. grouped the same way as the
+# rows of the searched list)
+def batch_rows(index,result):
+    return [np.sort(index.row[r['start']:r['stop']]) for r in result]
+
+# group (sorted) rows by element ---> [[element, [rows of element]], ...]
+def group_rows(ind,elements):
+    return [[element,list(ind_el)] for element,ind_el in groupby(ind,key=lambda i: elements[i])]
+
+# index of many line lists (files) at once ---> wavelengths[k] are wavelengths of all lines of k-th
+# file (in the order of lines of the file), rows of the index are positions in concatenated lines of
+# all files and species column of the index is number of the file (provenance of the line)
+def merged_index(wavelengths):
+    wl=np.concatenate([np.zeros(0)]+[np.asarray(w,dtype=np.float64) for w in wavelengths])
+    provenance=np.repeat(np.arange(len(wavelengths)),[len(w) for w in wavelengths])
+    return load_index(index_columns(wl,provenance))
+
+# search merged index (see merged_index) for many lines at once (all files in one pass)
+# ---> for every line, for every file sorted positions (within file) of lines within range
+def merged_rows(index,lines,sizes):
+    offsets=np.concatenate(([0],np.cumsum(sizes))).astype(np.int64)
+    result=[]
+    for ind in batch_rows(index,batch_search(index,lines)):
+        # rows are sorted, so lines of every file are together
+        bounds=np.searchsorted(ind,offsets)
+        result.append([ind[bounds[k]:bounds[k+1]]-offsets[k] for k in range(len(sizes))])
+    return result
+
+# search packed NIST library (see store.py) for many lines at once using global wavelength index
+# ---> for every line [[element, [wavelengths], [rows]], ...] (rows are in the same format as
+# in NIST library (.dat) files, grouped by species and sorted by wavelength within species)
+def search_store(store,lines):
+    return [store_lines(store,ind) for ind in batch_rows(store.index,batch_search(store.index,lines))]
+
+# sorted rows of packed NIST library ---> [[element, [wavelengths], [rows]], ...]
+def store_lines(store,ind):
+    rows_around_lines=store.rows(ind)
+    elements=[r[1]+' '+r[2] for r in rows_around_lines]
+    return [[element,[float(rows_around_lines[i][3]) for i in ind_el],[rows_around_lines[i] for i in ind_el]] 
+            for element,ind_el in group_rows(range(len(elements)),elements)]
+
+########################################################################################################
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import numpy as np
+
+
+############################################# PARAMETERS ###############################################
+
+# indications of selected table (for percent of data, fraction of max rel. int. and min rel. int.)
+indications=['percent_of_data','fraction_of_max_rel_int','min_rel_int']
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# number of lines for given percent of data (at least 1 line)
+def percent_count(num_of_elements,percent_of_data):
+    num_of_data_after_percent=int(round((num_of_elements*percent_of_data)/100.0+0.5))
+    if num_of_data_after_percent==0:
+        num_of_data_after_percent=1
+    return num_of_data_after_percent
+
+# select lines of one species by parameters [% of data, fraction of max rel int, min rel int,
+# lower wavelength, upper wavelength] (0 means that parameter is not used)
+# wavelength, relative_intensity, frac_of_max_rel_int ---> float64 arrays of all lines of the species
+#                                                          in the same order as in NIST library (.dat) file
+# ri_flag ---> max relative intensity is taken from all lines ('all') or from lines within wavelength range ('range')
+# returns (rows, frac_of_max_rel_int, indication):
+# - rows ---> positions of selected lines sorted by relative intensity (descending, lines with the same
+#             rel. int. stay in the file order) or empty array if nothing is selected (indication=='null')
+# - frac_of_max_rel_int ---> fraction of max rel. int. of every line (recalculated within wavelength range
+#                            if ri_flag=='range')
+# - indication ---> 'all', 'all_within_range', one of indications (+'_within_range') or 'null'
+# if more than one parameter is given, the largest of the tables is taken
+def select_lines(wavelength,relative_intensity,frac_of_max_rel_int,parameters,ri_flag='all'):
+    percent_of_data,fraction_of_max_rel_int,min_rel_int_value,lower,upper=parameters[:5]
+    num_of_lines=len(wavelength)
+    empty=np.zeros(0,dtype=np.int64)
+    # flags
+    low_range=lower!=0.0
+    upp_range=upper!=0.0
+    # change flag (if necessary)
+    if low_range==False and upp_range==False and ri_flag=='range':
+        ri_flag='all'
+    # lines that belong to the WL range
+    keep=np.ones(num_of_lines,dtype=bool)
+    if low_range==True:
+        keep&=wavelength>=lower
+    if upp_range==True:
+        keep&=wavelength<=upper
+    window=np.flatnonzero(keep)
+    if len(window)==0:
+        return empty,frac_of_max_rel_int,'null'
+    # sort by relative intensity (stable, so lines with the same rel. int. are sorted by wavelength)
+    window=window[np.argsort(-relative_intensity[window],kind='stable')]
+    # if some lines are removed and ri_flag=='range' max. rel. int. is recalculated within range
+    # (rounding is the same as in NIST library)
+    if len(window)!=num_of_lines and ri_flag=='range':
+        ri_max_val=float(relative_intensity[window].max())
+        frac_of_max_rel_int=frac_of_max_rel_int.copy()
+        frac_of_max_rel_int[window]=[round(((100.0*e)/ri_max_val)/100.0,4)
+                                     for e in relative_intensity[window].tolist()]
+    # percent of data
+    if percent_of_data > 0.0:
+        if ri_flag=='range':
+            percent_rows=window[:percent_count(len(window),percent_of_data)]
+        else:
+            # percent of all lines of the species, but only lines within range are taken
+            # NOTE: the first line of the file is not counted (as in the original list of all lines)
+            order_all=1+np.argsort(-relative_intensity[1:],kind='stable')
+            top=np.zeros(num_of_lines,dtype=bool)
+            top[order_all[:percent_count(num_of_lines-1,percent_of_data)]]=True
+            percent_rows=window[top[window]]
+    else:
+        percent_rows=empty
+    # fraction of max relative intensity
+    if fraction_of_max_rel_int > 0.0:
+        fraction_rows=window[frac_of_max_rel_int[window]>=fraction_of_max_rel_int]
+    else:
+        fraction_rows=empty
+    # minimum relative intensity value
+    if min_rel_int_value > 0.0:
+        minimum_rows=window[relative_intensity[window]>=min_rel_int_value]
+    else:
+        minimum_rows=empty
+    # if there is a case of all zero parameters then return everything
+    if percent_of_data==0.0 and fraction_of_max_rel_int==0.0 and min_rel_int_value==0.0:
+        if lower==0.0 and upper==0.0:
+            indication='all'
+        else:
+            indication='all_within_range'
+        return window,frac_of_max_rel_int,indication
+    # return table that has the most elements
+    tables=[percent_rows,fraction_rows,minimum_rows]
+    len_tables=[len(t) for t in tables]
+    max_len=max(len_tables)
+    if max_len==0:
+        return empty,frac_of_max_rel_int,'null'
+    ind_of_max_len=len_tables.index(max_len)
+    indication=indications[ind_of_max_len]
+    if not (lower==0.0 and upper==0.0):
+        indication=indication+'_within_range'
+    return tables[ind_of_max_len],frac_of_max_rel_int,indication
+
+# the same selection as select_lines, but with precomputed ranking of lines of the species (see 
+# ranking_columns in store.py), so nothing is sorted: lines within wavelength range are found by 
+# bisection (wavelengths of the species are sorted) and % of data, fraction of max rel. int. and 
+# min rel. int. tables are the first lines of the ranking (their number is found by bisection)
+# wavelength ---> float64 array of all lines of the species (sorted)
+# order, relative_intensity, frac_of_max_rel_int ---> ranking of the species
+# returns (rows, frac_of_max_rel_int, indication) where frac_of_max_rel_int is None if fractions
+# are not changed, or array of fractions of all lines if they are recalculated within range
+def select_ranked(wavelength,order,relative_intensity,frac_of_max_rel_int,parameters,ri_flag='all'):
+    percent_of_data,fraction_of_max_rel_int,min_rel_int_value,lower,upper=parameters[:5]
+    num_of_lines=len(order)
+    empty=np.zeros(0,dtype=np.int64)
+    # flags
+    low_range=lower!=0.0
+    upp_range=upper!=0.0
+    # change flag (if necessary)
+    if low_range==False and upp_range==False and ri_flag=='range':
+        ri_flag='all'
+    # lines that belong to the WL range ---> [first, last)
+    first=int(np.searchsorted(wavelength,lower,side='left')) if low_range==True else 0
+    last=int(np.searchsorted(wavelength,upper,side='right')) if upp_range==True else num_of_lines
+    if last<=first:
+        return empty,None,'null'
+    # ranking of lines within range
+    whole=last-first==num_of_lines
+    if whole:
+        window=order
+        window_ri=relative_intensity
+        window_frac=frac_of_max_rel_int
+    else:
+        keep=(order>=first)&(order<last)
+        window=order[keep]
+        window_ri=relative_intensity[keep]
+        window_frac=frac_of_max_rel_int[keep]
+    changed_frac=None
+    # if some lines are removed and ri_flag=='range' max. rel. int. is recalculated within range
+    # (rounding is the same as in NIST library)
+    if not whole and ri_flag=='range':
+        ri_max_val=float(window_ri[0])
+        window_frac=np.array([round(((100.0*e)/ri_max_val)/100.0,4) for e in window_ri.tolist()])
+        changed_frac=np.zeros(num_of_lines,dtype=np.float64)
+        changed_frac[window]=window_frac
+    # percent of data
+    if percent_of_data > 0.0:
+        if ri_flag=='range':
+            percent_rows=window[:percent_count(len(window),percent_of_data)]
+        else:
+            # percent of all lines of the species, but only lines within range are taken
+            # NOTE: the first line of the file is not counted (as in the original list of all lines)
+            num=percent_count(num_of_lines-1,percent_of_data)
+            top=order[:num+1]
+            top=top[top!=0][:num]
+            percent_rows=top[(top>=first)&(top<last)]
+    else:
+        percent_rows=empty
+    # fraction of max relative intensity (fractions are sorted in descending order)
+    if fraction_of_max_rel_int > 0.0:
+        fraction_rows=window[:int(np.searchsorted(-window_frac,-fraction_of_max_rel_int,side='right'))]
+    else:
+        fraction_rows=empty
+    # minimum relative intensity value
+    if min_rel_int_value > 0.0:
+        minimum_rows=window[:int(np.searchsorted(-window_ri,-min_rel_int_value,side='right'))]
+    else:
+        minimum_rows=empty
+    # if there is a case of all zero parameters then return everything
+    if percent_of_data==0.0 and fraction_of_max_rel_int==0.0 and min_rel_int_value==0.0:
+        if lower==0.0 and upper==0.0:
+            indication='all'
+        else:
+            indication='all_within_range'
+        return window,changed_frac,indication
+    # return table that has the most elements
+    tables=[percent_rows,fraction_rows,minimum_rows]
+    len_tables=[len(t) for t in tables]
+    max_len=max(len_tables)
+    if max_len==0:
+        return empty,None,'null'
+    ind_of_max_len=len_tables.index(max_len)
+    indication=indications[ind_of_max_len]
+    if not (lower==0.0 and upper==0.0):
+        indication=indication+'_within_range'
+    return tables[ind_of_max_len],changed_frac,indication
+
+########################################################################################################
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import sys
+import json
+import time as TIME
+import asyncio
+from collections import deque
+from urllib.parse import urlsplit,parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from .library import load_library
+from .shift import rest_lines
+
+
+############################################# PARAMETERS ###############################################
+
+# default parameters of selection [% of data, fraction of max rel int, min rel int,
+# lower wavelength, upper wavelength] (as in create_line_list.py)
+parameters_default_values=[50,0.2,0,2000,10000]
+
+# number of the last requests that are kept for latency statistics
+LATENCY_WINDOW=10000
+
+# status lines of responses
+status_lines={200:'200 OK',400:'400 Bad Request',404:'404 Not Found',405:'405 Method Not Allowed',
+              500:'500 Internal Server Error'}
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# value of request parameter e.g. '[[4861.3,0.5],[6563,1]]' ---> [[4861.3, 0.5], [6563, 1]]
+# (values of GET requests are strings, values of POST requests (JSON body) are already parsed)
+def parameter_value(value):
+    if isinstance(value,str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+# long-running query service: NIST library is opened once (and kept in memory), and selection and
+# search requests of many clients are answered concurrently (asyncio HTTP server on TCP port and/or
+# Unix socket, library is searched in a pool of threads so the event loop is never blocked)
+# requests (GET with query string or POST with JSON body), responses are JSON:
+# - /select?species=Fe II&parameters=[50,0.2,0,2000,10000]&rel_int_flag=all
+#   ---> lines of species selected by parameters (see LineLibrary.select)
+# - /search?lines=[[4861.3,0.5],[6563,1]]&velocity=-10000&relativistic=false
+#   ---> lines of all species within ranges (see LineLibrary.search)
+# - /species ---> all species of the library
+# - /stats ---> number of requests and latency (ms) of the last requests
+# every response has its latency in "latency_ms" (and in X-Latency-Ms header)
+class LineServer(object):
+
+    def __init__(self,elements_folder_path,store_path=None,manifest_path=None,workers=4,log=False):
+        self.library=load_library(elements_folder_path,store_path,manifest_path)
+        self.executor=ThreadPoolExecutor(max_workers=workers)
+        self.log=log
+        self.requests={}
+        self.errors=0
+        self.latency=deque(maxlen=LATENCY_WINDOW)
+        self.start_time=TIME.time()
+
+    # open library now (packed library, its index and ranking, species manifest), so that
+    # the first requests are not slower than the others
+    def warm_up(self):
+        packed=self.library.packed
+        packed.index
+        if self.library.store is not None:
+            packed.ranking
+        self.library.manifest
+        return len(packed)
+
+    # lines of species selected by parameters
+    def select(self,query):
+        species=query.get('species')
+        if species is None:
+            raise ValueError('Parameter species is not specified.')
+        parameters=[float(e) for e in parameter_value(query.get('parameters',parameters_default_values))]
+        rel_int_flag=query.get('rel_int_flag','all')
+        if rel_int_flag not in ['all','range']:
+            rel_int_flag='all'
+        if species not in self.library:
+            return 404,{'error':'Species '+str(species)+' is not in the library.'}
+        nistTable,indication=self.library.select(species,parameters,rel_int_flag)
+        return 200,{'species':species,'parameters':parameters,'rel_int_flag':rel_int_flag,
+                    'indication':indication,'lines':nistTable}
+
+    # lines of all species within given ranges (lines of the library are shifted by velocity
+    # in km/s, if it is specified)
+    def search(self,query):
+        lines=parameter_value(query.get('lines'))
+        if not lines:
+            raise ValueError('Parameter lines is not specified.')
+        lines=[[float(e[0]),float(e[1])] for e in lines]
+        queries=lines
+        velocity=query.get('velocity')
+        if velocity is not None:
+            relativistic=str(query.get('relativistic','false')).lower()=='true'
+            velocity=float(parameter_value(velocity))
+            queries=rest_lines(lines,velocity,relativistic=relativistic).tolist()
+        results=self.library.search(queries)
+        return 200,{'lines':lines,'velocity':velocity,
+                    'results':[[{'species':e[0],'wavelengths':e[1],'rows':e[2]} for e in result]
+                               for result in results]}
+
+    # all species of the library
+    def species(self,query):
+        return 200,{'species':self.library.species_names()}
+
+    # number of requests and latency of the last requests (ms)
+    def stats(self,query):
+        latency=sorted(self.latency)
+        percentile=lambda p: latency[min(len(latency)-1,int(p*len(latency)))] if latency!=[] else None
+        return 200,{'requests':self.requests,'errors':self.errors,
+                    'uptime_s':TIME.time()-self.start_time,
+                    'latency':{'count':len(latency),
+                               'mean':sum(latency)/len(latency) if latency!=[] else None,
+                               'p50':percentile(0.5),'p90':percentile(0.9),'p99':percentile(0.99),
+                               'max':latency[-1] if latency!=[] else None}}
+
+    # answer request ---> (status, JSON response)
+    async def respond(self,method,target,body):
+        if method not in ['GET','POST']:
+            return 405,{'error':'Method '+method+' is not allowed.'}
+        url=urlsplit(target)
+        query=dict((k,v[-1]) for k,v in parse_qs(url.query).items())
+        if method=='POST' and body!=b'':
+            # body must be JSON object
+            try:
+                body=json.loads(body.decode('utf-8'))
+            except ValueError as e:
+                return 400,{'error':'Body is not valid JSON ('+str(e)+').'}
+            if not isinstance(body,dict):
+                return 400,{'error':'Body must be JSON object.'}
+            query.update(body)
+        handler={'/select':self.select,'/search':self.search,'/species':self.species,
+                 '/stats':self.stats}.get(url.path.rstrip('/') or '/')
+        if handler is None:
+            return 404,{'error':'Unknown request '+url.path+'.'}
+        self.requests[url.path]=self.requests.get(url.path,0)+1
+        try:
+            # library is searched in a separate thread
+            return await asyncio.get_running_loop().run_in_executor(self.executor,handler,query)
+        except (ValueError,TypeError,IndexError,KeyError) as e:
+            return 400,{'error':str(e)}
+
+    # HTTP/1.1 connection (many requests can be sent through the same connection)
+    async def handle(self,reader,writer):
+        try:
+            while True:
+                request_line=await reader.readline()
+                if not request_line:
+                    break
+                method,target,version=request_line.decode('latin-1').split()
+                headers={}
+                while True:
+                    line=await reader.readline()
+                    if line in [b'\r\n',b'\n',b'']:
+                        break
+                    name,_,value=line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()]=value.strip()
+                body=b''
+                if int(headers.get('content-length',0))>0:
+                    body=await reader.readexactly(int(headers['content-length']))
+                start=TIME.perf_counter()
+                try:
+                    status,response=await self.respond(method,target,body)
+                except Exception as e:
+                    status,response=500,{'error':str(e)}
+                latency=(TIME.perf_counter()-start)*1000
+                if status!=200:
+                    self.errors=self.errors+1
+                self.latency.append(latency)
+                response['latency_ms']=latency
+                data=json.dumps(response).encode('utf-8')
+                keep_alive=headers.get('connection','').lower()!='close' if version=='HTTP/1.1' \
+                           else headers.get('connection','').lower()=='keep-alive'
+                writer.write(('HTTP/1.1 '+status_lines[status]+'\r\n'
+                              'Content-Type: application/json\r\n'
+                              'Content-Length: '+str(len(data))+'\r\n'
+                              'X-Latency-Ms: '+'%.3f' % latency+'\r\n'
+                              'Connection: '+('keep-alive' if keep_alive else 'close')+'\r\n\r\n').encode('latin-1')
+                             +data)
+                await writer.drain()
+                if self.log:
+                    print (method+' '+target+' '+str(status)+' '+'%.3f' % latency+' ms')
+                if not keep_alive:
+                    break
+        except (ConnectionError,asyncio.IncompleteReadError,ValueError):
+            pass
+        finally:
+            writer.close()
+
+    # start server on TCP port and/or Unix socket and serve requests until it is stopped
+    async def serve(self,host='127.0.0.1',port=8765,socket_path=None):
+        servers=[]
+        if port is not None:
+            servers.append(await asyncio.start_server(self.handle,host,port))
+            print ('Serving NIST library on http://'+host+':'+str(port)+'/')
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            servers.append(await asyncio.start_unix_server(self.handle,socket_path))
+            print ('Serving NIST library on Unix socket '+socket_path)
+        try:
+            await asyncio.gather(*[s.serve_forever() for s in servers])
+        finally:
+            for s in servers:
+                s.close()
+            self.executor.shutdown()
+
+# open NIST library and serve requests (see LineServer)
+def run_server(elements_folder_path,host='127.0.0.1',port=8765,socket_path=None,workers=4,log=False):
+    server=LineServer(elements_folder_path,workers=workers,log=log)
+    print ('Opening NIST library '+elements_folder_path+'...')
+    num=server.warm_up()
+    print ('...OK ('+str(num)+' lines)\n')
+    asyncio.run(server.serve(host,port,socket_path))
+
+########################################################################################################
+
+
+############################################### PROGRAM ################################################
+
+# serve library e.g. python -m nist_lines.server create_line_list/NIST_ELEMENTS port=8765 workers=4
+# (optional arguments: host=127.0.0.1, port=8765 (port=none means only Unix socket), socket=path of
+# Unix socket, workers=4 (threads that search library), log=True (every request is printed))
+if __name__=='__main__':
+    if len(sys.argv)<2:
+        print ('Please specify path to /NIST_ELEMENTS/ folder.\n')
+        sys.exit()
+    param=dict(e.split('=',1) for e in sys.argv[2:] if '=' in e)
+    port=param.get('port','8765')
+    try:
+        run_server(sys.argv[1],host=param.get('host','127.0.0.1'),
+                   port=None if port.lower()=='none' else int(port),socket_path=param.get('socket'),
+                   workers=max(1,int(param.get('workers','4'))),log=param.get('log','').lower()=='true')
+    except OSError as e:
+        print ('Unable to start server ('+str(e)+').\n')
+    except KeyboardInterrupt:
+        print ('\nServer was stopped.\n')
+
+########################################################################################################
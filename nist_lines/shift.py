@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import numpy as np
+
+
+############################################# PARAMETERS ###############################################
+
+# speed of light (km/s)
+light_speed=299792.458
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# velocities (km/s) ---> v/c, with one axis added for every axis of wavelengths if velocities are
+# a grid (so the whole grid is evaluated in one broadcast, one row per velocity)
+def velocity_beta(velocities,wavelengths,c):
+    beta=np.asarray(velocities,dtype=np.float64)/c
+    if beta.ndim>0:
+        beta=beta.reshape(beta.shape+(1,)*np.ndim(wavelengths))
+    return beta
+
+# rest wavelengths of lines ---> observed wavelengths of lines of source with velocity v (km/s,
+# positive velocity means redshift): classical l/(1-v/c) or relativistic l*sqrt((1+v/c)/(1-v/c))
+# velocities can be a single value (result has the same shape as wavelengths, and it is
+# computed in place if out=wavelengths) or a grid of velocities (result has shape
+# (number of velocities, ...) with one row for every velocity)
+def shift_wavelengths(wavelengths,velocities,c=light_speed,relativistic=False,out=None):
+    wavelengths=np.asarray(wavelengths,dtype=np.float64)
+    beta=velocity_beta(velocities,wavelengths,c)
+    if relativistic:
+        return np.multiply(wavelengths,np.sqrt((1+beta)/(1-beta)),out=out)
+    return np.divide(wavelengths,1-beta,out=out)
+
+# observed wavelengths ---> rest wavelengths of source with velocity v (inverse of shift_wavelengths)
+def unshift_wavelengths(wavelengths,velocities,c=light_speed,relativistic=False,out=None):
+    wavelengths=np.asarray(wavelengths,dtype=np.float64)
+    beta=velocity_beta(velocities,wavelengths,c)
+    if relativistic:
+        return np.multiply(wavelengths,np.sqrt((1-beta)/(1+beta)),out=out)
+    return np.multiply(wavelengths,1-beta,out=out)
+
+# observed wavelengths of spectrum ---> rest wavelengths (wl/(1+z)) for redshift z
+# (in place if out=wavelengths, z can also be a grid, see shift_wavelengths)
+def rest_wavelengths(wavelengths,z,out=None):
+    wavelengths=np.asarray(wavelengths,dtype=np.float64)
+    z=np.asarray(z,dtype=np.float64)
+    if z.ndim>0:
+        z=z.reshape(z.shape+(1,)*wavelengths.ndim)
+    return np.divide(wavelengths,1+z,out=out)
+
+# searched lines [[lambda, delta], ...] (observed) ---> the same lines in rest frame of source with
+# velocity v, so that rest wavelengths within lambda +/- delta are the lines which are within the
+# range after the shift (both lambda and delta are scaled, and for a grid of velocities result has
+# shape (number of velocities, number of lines, 2))
+def rest_lines(lines,velocities,c=light_speed,relativistic=False):
+    lines=np.asarray(lines,dtype=np.float64).reshape(-1,2)
+    return unshift_wavelengths(lines,velocities,c,relativistic)
+
+# lines of every element (list of lists of rest wavelengths) ---> lists of shifted wavelengths within
+# [min_wl, max_wl] (all lines are shifted at once)
+def shift_element_lines(wavelengths,velocity,min_wl,max_wl,c=light_speed,relativistic=False):
+    wl=np.array([w for l in wavelengths for w in l],dtype=np.float64)
+    shift_wavelengths(wl,velocity,c,relativistic,out=wl)
+    inside=(wl>=min_wl)&(wl<=max_wl)
+    counts=[len(l) for l in wavelengths]
+    ends=np.cumsum(counts).tolist()
+    return [wl[end-num:end][inside[end-num:end]].tolist() for num,end in zip(counts,ends)]
+
+########################################################################################################
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import re
+import warnings
+import numpy as np
+
+
+############################################# PARAMETERS ###############################################
+
+# delimiters that mean "any whitespace" (spectrum files with these delimiters are parsed by NumPy)
+whitespace_delimiters=[None,'\\s+','\\s+|\\t+','\\t+|\\s+']
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# rows of spectrum file have different number of columns
+class ColumnsError(ValueError):
+    pass
+
+# read columns of spectrum file (one row per pixel e.g. '3600.  1.468526') ---> float64 array
+# (rows x usecols), empty array if file has no rows
+# all rows must have the same number of columns (otherwise ColumnsError is raised)
+# whitespace delimited files are parsed by C reader of NumPy directly into contiguous array
+# (np.loadtxt also checks number of columns of every row), other delimiters (regular expression)
+# and files that NumPy can't parse (e.g. text columns) are read row by row
+def read_spectrum_columns(filename,usecols=(0,1),delimiters=None):
+    if delimiters in whitespace_delimiters:
+        values=None
+        with warnings.catch_warnings():
+            # empty file
+            warnings.simplefilter('ignore')
+            try:
+                values=np.loadtxt(filename,dtype=np.float64,comments=None,ndmin=2)
+            except ValueError:
+                pass
+        if values is not None and len(values)==0:
+            return np.empty((0,len(usecols)),dtype=np.float64)
+        if values is not None and values.shape[1]>max(usecols):
+            return np.ascontiguousarray(values[:,list(usecols)])
+        delimiters='\\s+|\\t+'
+    # row by row
+    with open(filename,'r') as f:
+        rows=f.read().splitlines()
+    rows=[re.split(delimiters,d) for d in rows]
+    rows=[[e for e in d if e!=''] for d in rows]
+    rows=[d for d in rows if d!=[]]
+    if not all(len(d)==len(rows[0]) for d in rows):
+        raise ColumnsError('Some rows in spectrum have different number of columns.')
+    values=np.empty((len(rows),len(usecols)),dtype=np.float64)
+    for k,i in enumerate(usecols):
+        values[:,k]=[float(d[i]) for d in rows]
+    return values
+
+########################################################################################################
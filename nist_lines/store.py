@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import sys
+import json
+import numpy as np
+from .index import index_columns,load_index
+
+
+############################################# PARAMETERS ###############################################
+
+# name of the packed (columnar) library file, placed next to /NIST_ELEMENTS/ folder
+STORE_FILENAME='NIST_ELEMENTS_lines.bin'
+
+# first bytes of every packed file (and format version)
+MAGIC=b'NISTCOL\x00'
+VERSION=1
+
+# every column starts at a multiple of this number of bytes
+# (so that columns can be viewed directly from the memory map)
+ALIGN=64
+
+# header of NIST library files
+header=['atomic_num.ion_num','name','ionization','wavelength(Ang)',
+        'relative_intensity','frac_of_max_rel_int','flags',
+        'reference']
+
+# columns of the library store and their types
+store_columns=[('wavelength','<f8'),('relative_intensity','<f4'),
+               ('frac_of_max_rel_int','<f4'),('species','<i2'),
+               ('flag','<i4'),('reference','<i4')]
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# species code from atomic_num.ion_num (e.g. '26.01' ---> 2601)
+def species_code(atomic_num_ion_num):
+    an,ion=atomic_num_ion_num.split('.')
+    return int(an)*100+int(ion)
+
+# atomic_num.ion_num from species code (e.g. 2601 ---> '26.01')
+def species_anio(code):
+    return '%02d.%02d' % (code//100,code%100)
+
+# write columns (dict of numpy arrays) and metadata (dict) into a single packed file
+def write_columns(filename,columns,meta):
+    names=list(columns.keys())
+    arrays=[np.ascontiguousarray(columns[k]) for k in names]
+    # header describes every column (name, type, number of values, offset in file)
+    header_meta={'version':VERSION,'columns':[],'meta':meta}
+    offset=0
+    for k,a in zip(names,arrays):
+        header_meta['columns'].append({'name':k,'dtype':a.dtype.str,'length':int(a.size),
+                                       'offset':offset})
+        offset=offset+a.nbytes
+        offset=offset+(-offset)%ALIGN
+    header_bytes=json.dumps(header_meta).encode('utf-8')
+    start=len(MAGIC)+8+len(header_bytes)
+    start=start+(-start)%ALIGN
+    # write to temporary file first and then rename it, so readers never see half of a file
+    tmp_filename=filename+'.tmp'
+    with open(tmp_filename,'wb') as f:
+        f.write(MAGIC)
+        f.write(np.array([start,len(header_bytes)],dtype='<u4').tobytes())
+        f.write(header_bytes)
+        for c,a in zip(header_meta['columns'],arrays):
+            f.write(b'\x00'*(start+c['offset']-f.tell()))
+            f.write(a.tobytes())
+    os.replace(tmp_filename,filename)
+
+# read packed file (columns are memory-mapped, nothing is parsed)
+def read_columns(filename):
+    buf=np.memmap(filename,dtype=np.uint8,mode='r')
+    if bytes(buf[:len(MAGIC)])!=MAGIC:
+        raise ValueError('File '+str(filename)+' is not a packed NIST file.')
+    start,header_len=buf[len(MAGIC):len(MAGIC)+8].view('<u4')
+    header_meta=json.loads(bytes(buf[len(MAGIC)+8:len(MAGIC)+8+header_len]).decode('utf-8'))
+    if header_meta['version']!=VERSION:
+        raise ValueError('File '+str(filename)+' has unsupported version '
+                         +str(header_meta['version'])+'.')
+    columns={}
+    for c in header_meta['columns']:
+        dtype=np.dtype(c['dtype'])
+        begin=int(start)+c['offset']
+        columns[c['name']]=buf[begin:begin+c['length']*dtype.itemsize].view(dtype)
+    return columns,header_meta['meta']
+
+# check if given file is packed NIST file
+def is_packed_file(filename):
+    with open(filename,'rb') as f:
+        return f.read(len(MAGIC))==MAGIC
+
+# read single NIST library (.dat) file
+def read_dat_file(filename):
+    with open(filename,'r') as f:
+        list_data=f.read().splitlines()
+    list_data=[e.split('\t') for e in list_data if e!='']
+    ind=[list_data[0].index(h) for h in header]
+    return [[e[i] for i in ind] for e in list_data[1:]]
+
+# ranking columns of the store ---> for every species, positions of its lines (within species) 
+# sorted by relative intensity (descending, lines with the same rel. int. stay in the file order) 
+# and relative intensities and fractions of max rel. int. (exact values) in that order
+# (number of lines with rel. int. (or fraction) above any threshold is then found by bisection)
+def ranking_columns(relative_intensity,frac_of_max_rel_int,starts):
+    lengths=np.diff(starts)
+    group=np.repeat(np.arange(len(lengths)),lengths)
+    order=np.lexsort((-relative_intensity,group))
+    return {
+            'rank_row':(order-np.repeat(starts[:-1],lengths)).astype('<i4'),
+            'rank_relative_intensity':np.asarray(relative_intensity,dtype='<f8')[order],
+            'rank_frac_of_max_rel_int':np.asarray(frac_of_max_rel_int,dtype='<f8')[order]
+           }
+
+# columns and metadata of packed library from all NIST library files (.dat) in elements folder
+def library_columns(elements_folder_path):
+    # read every species e.g. [2601, 'Fe', 'II', rows]
+    species=[]
+    for el in sorted(os.listdir(elements_folder_path)):
+        el_path=os.path.join(elements_folder_path,el)
+        if not os.path.isdir(el_path):
+            continue
+        for e in sorted(os.listdir(el_path)):
+            if e.endswith('.dat'):
+                rows=read_dat_file(os.path.join(el_path,e))
+                if rows!=[]:
+                    species.append([species_code(rows[0][0]),rows[0][1],rows[0][2],rows])
+    return species_columns(species)
+
+# value of rel. int. or fraction of max rel. int. (NaN for 'null' e.g. manually added lines)
+def table_value(value):
+    if value=='null':
+        return np.nan
+    return float(value)
+
+# columns and metadata of packed file from rows of species (as in .dat files, sorted by wavelength
+# within species) e.g. [[2601, 'Fe', 'II', rows], ...]
+def species_columns(species):
+    # rows of the store are grouped by species code (and sorted by wavelength within species,
+    # as they are in .dat files)
+    species=sorted(species,key=lambda s: s[0])
+    rows=[r for s in species for r in s[3]]
+    starts=np.cumsum([0]+[len(s[3]) for s in species])
+    # dictionary encoding of flags and references
+    flags_unique=sorted(set(r[6] for r in rows))
+    reference_unique=sorted(set(r[7] for r in rows))
+    flags_codes=dict(zip(flags_unique,range(len(flags_unique))))
+    reference_codes=dict(zip(reference_unique,range(len(reference_unique))))
+    relative_intensity=np.array([table_value(r[4]) for r in rows],dtype=np.float64)
+    frac_of_max_rel_int=np.array([table_value(r[5]) for r in rows],dtype=np.float64)
+    columns={
+             'wavelength':np.array([float(r[3]) for r in rows],dtype='<f8'),
+             'relative_intensity':relative_intensity.astype('<f4'),
+             'frac_of_max_rel_int':frac_of_max_rel_int.astype('<f4'),
+             'species':np.repeat(np.array([s[0] for s in species],dtype='<i2'),
+                                 [len(s[3]) for s in species]),
+             'flag':np.array([flags_codes[r[6]] for r in rows],dtype='<i4'),
+             'reference':np.array([reference_codes[r[7]] for r in rows],dtype='<i4')
+            }
+    # global index (all lines sorted by wavelength) is kept in the same file
+    columns.update(index_columns(columns['wavelength'],columns['species']))
+    # ranking of lines of every species by relative intensity (with exact values from .dat files)
+    columns.update(ranking_columns(relative_intensity,frac_of_max_rel_int,starts))
+    meta={
+          # [code, name, ionization, first row, last row + 1]
+          'species':[[s[0],s[1],s[2],int(starts[i]),int(starts[i+1])]
+                     for i,s in enumerate(species)],
+          'flags':flags_unique,
+          'references':reference_unique
+         }
+    return columns,meta
+
+# pack all NIST library files (.dat) from elements folder into a single columnar file
+def write_store(elements_folder_path,filename):
+    columns,meta=library_columns(elements_folder_path)
+    write_columns(filename,columns,meta)
+    return len(columns['wavelength'])
+
+# exact values of float32 column ---> values in .dat files have at most 7 significant digits, 
+# so the shortest string of float32 value is the original value (e.g. 0.3 and not 0.30000001)
+def exact_values(column):
+    if column.dtype==np.float64:
+        return column
+    return column.astype(str).astype(np.float64)
+
+# columnar (memory-mapped) NIST library
+# (columns and metadata can also be given directly e.g. library packed in memory, then filename is None)
+class LineStore(object):
+
+    def __init__(self,filename,columns=None,meta=None):
+        if columns is None:
+            columns,meta=read_columns(filename)
+        self.filename=filename
+        self.columns=columns
+        for name,dtype in store_columns:
+            setattr(self,name,columns[name])
+        self.species_table=meta['species']
+        self.flags=meta['flags']
+        self.references=meta['references']
+        # e.g. 'Fe II' ---> [2601, 'Fe', 'II', first row, last row + 1]
+        self.species_map=dict((s[1]+' '+s[2],s) for s in self.species_table)
+        # e.g. 2601 ---> [2601, 'Fe', 'II', first row, last row + 1]
+        self.code_map=dict((s[0],s) for s in self.species_table)
+        self._index=None
+        self._ranking=None
+
+    def __len__(self):
+        return len(self.wavelength)
+
+    def __contains__(self,nist_element):
+        return nist_element in self.species_map
+
+    # all library lines sorted by wavelength (see index.py)
+    @property
+    def index(self):
+        if self._index is None:
+            self._index=load_index(self.columns)
+        return self._index
+
+    # ranking columns (see ranking_columns), if they were not saved in store, they are built now
+    @property
+    def ranking(self):
+        if self._ranking is None:
+            if 'rank_row' in self.columns:
+                self._ranking=self.columns
+            else:
+                starts=np.array([0]+[s[4] for s in self.species_table])
+                self._ranking=ranking_columns(exact_values(self.relative_intensity),
+                                              exact_values(self.frac_of_max_rel_int),starts)
+        return self._ranking
+
+    # all species in the store e.g. ['H I', 'He I', 'He II', ...]
+    def species_names(self):
+        return [s[1]+' '+s[2] for s in self.species_table]
+
+    # rows of given species (e.g. 'Fe II') as a slice of the store
+    def species_slice(self,nist_element):
+        s=self.species_map[nist_element]
+        return slice(s[3],s[4])
+
+    # given rows (slice or array of row numbers) in the same format as they are
+    # in NIST library (.dat) files
+    def rows(self,ind):
+        codes=self.species[ind].tolist()
+        wavelength=[str(e) for e in self.wavelength[ind].tolist()]
+        # (NaN is 'null' e.g. manually added lines of exported list of lines)
+        relativeIntensity=[str(float(e)) if e!='nan' else 'null'
+                           for e in self.relative_intensity[ind].astype(str)]
+        fracOfMaxRelInt=[str(float(e)) if e!='nan' else 'null'
+                         for e in self.frac_of_max_rel_int[ind].astype(str)]
+        flags=[self.flags[e] for e in self.flag[ind].tolist()]
+        reference=[self.references[e] for e in self.reference[ind].tolist()]
+        species=[self.code_map[e] for e in codes]
+        return [[species_anio(codes[i]),species[i][1],species[i][2],wavelength[i],
+                 relativeIntensity[i],fracOfMaxRelInt[i],flags[i],reference[i]]
+                for i in range(len(codes))]
+
+    # rows of given species in the same format as they are in NIST library (.dat) file
+    def species_rows(self,nist_element):
+        return self.rows(self.species_slice(nist_element))
+
+    # wavelengths, relative intensities and fractions of max rel. int. of given species 
+    # (as float64 arrays, with the same values as in .dat file)
+    def species_values(self,nist_element):
+        ind=self.species_slice(nist_element)
+        return (exact_values(self.wavelength[ind]),exact_values(self.relative_intensity[ind]),
+                exact_values(self.frac_of_max_rel_int[ind]))
+
+    # precomputed ranking of lines of given species ---> (positions of lines sorted by relative 
+    # intensity, rel. int. and fractions of max rel. int. in that order), nothing is copied
+    def species_ranking(self,nist_element):
+        ind=self.species_slice(nist_element)
+        ranking=self.ranking
+        return (ranking['rank_row'][ind],ranking['rank_relative_intensity'][ind],
+                ranking['rank_frac_of_max_rel_int'][ind])
+
+    # summary of given species ---> (number of lines, max relative intensity)
+    def species_summary(self,nist_element):
+        ind=self.species_slice(nist_element)
+        return ind.stop-ind.start,float(self.ranking['rank_relative_intensity'][ind.start])
+
+# open packed NIST library
+def load_store(filename):
+    return LineStore(filename)
+
+########################################################################################################
+
+
+############################################### PROGRAM ################################################
+
+# pack already existing library e.g. python -m nist_lines.store NIST_ELEMENTS NIST_ELEMENTS_lines.bin
+if __name__=='__main__':
+    if len(sys.argv)<2:
+        print ('Please specify path to /NIST_ELEMENTS/ folder.\n')
+        sys.exit()
+    elements_folder_path=sys.argv[1]
+    if len(sys.argv)>2:
+        store_file=sys.argv[2]
+    else:
+        store_file=os.path.join(os.path.dirname(os.path.abspath(elements_folder_path)),
+                                STORE_FILENAME)
+    num=write_store(elements_folder_path,store_file)
+    print ('File '+store_file+' was successfully created ('+str(num)+' lines).\n')
+
+########################################################################################################
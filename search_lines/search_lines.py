@@ -16,6 +16,14 @@ import datetime
 from collections import OrderedDict
 import re
 import sys
+# package shared by all scripts (/nist_lines/ folder)
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nist_lines import load_store,load_library
+from nist_lines.store import is_packed_file
+from nist_lines.search import line_list_index,batch_search,batch_rows,group_rows,search_store,\
+store_lines,merged_index,merged_rows
+from nist_lines.cache import FileCache
+from nist_lines.shift import rest_lines
 
 
 #################################### PARAMETERS ##############################################
@@ -23,58 +31,6 @@ import sys
 # sleep time (in sec)
 TIME_SLEEP=2
 
-# ARGUMENTS 
-arguments=sys.argv[1:]
-# check num of arguments
-if len(arguments)!=2:
-    print ("Incorrect arguments. Please enter the correct arguments.\n")
-    TIME.sleep(TIME_SLEEP)
-    sys.exit()
-# arguments
-arg1=arguments[0]
-arg2=arguments[1]
-# check keynames in arguments
-if ('files=' not in arg1) and ('files=' not in arg2):
-    print ("Incorrect arguments. Please enter the correct arguments.\n")
-    TIME.sleep(TIME_SLEEP)
-    sys.exit()
-if ('lines=' not in arg1) and ('lines=' not in arg2):
-    print ("Incorrect arguments. Please enter the correct arguments.\n")
-    TIME.sleep(TIME_SLEEP)
-    sys.exit()
-# take values of arguments
-if 'files=' in arg1:
-    arg1_data=re.sub('files=','',arg1)
-    arg2_data=re.sub('lines=','',arg2)
-else:
-    arg1_data=re.sub('lines=','',arg1)
-    arg2_data=re.sub('files=','',arg2)
-    pom=arg1_data
-    arg1_data=arg2_data
-    arg2_data=pom
-# list of files
-arg1_data=arg1_data.split(',')
-arg1_data[0]=re.sub('\[','',arg1_data[0])
-arg1_data[-1]=re.sub('\]','',arg1_data[-1])
-list_of_files=arg1_data
-# list of lines for searching
-arg2_data=arg2_data.split(',')
-arg2_data=[re.sub('\[|\]','',x) for x in arg2_data]
-arg2_data=[[float(arg2_data[i*2]),float(arg2_data[(i*2)+1])] 
-           for i in range(int(len(arg2_data)/2))]
-list_of_lines=arg2_data
-
-# FOLDERS
-# get current working directory
-cwd=os.getcwd()
-# directory of files
-files_folder=os.path.join(cwd,'files_for_search')
-# output directory
-output_directory=os.path.join(cwd,'results')
-
-# current datetime
-current_date_time=(datetime.datetime.now()).strftime('_%Y%m%d_%H%M%S')
-
 # header of a file
 header=['atomic_num.ion_num','name','ionization','wavelength(Ang)',
         'relative_intensity','frac_of_max_rel_int','flags',
@@ -83,15 +39,16 @@ header=['atomic_num.ion_num','name','ionization','wavelength(Ang)',
 # number of tabs
 num_of_tabs=len(header)-1
 
+# packed NIST libraries (e.g. NIST_ELEMENTS_lines.bin) opened so far
+library_cache=FileCache()
+
 ##############################################################################################
 
 
 ###################################### FUNCTIONS #############################################
 
-# function that opens given file and retrieves data from it
-def retrieve_file_data(filename):
-    # file path
-    file_path=os.path.join(files_folder,filename)
+# function that parses given file
+def parse_file_data(file_path):
     # open and read file
     f=open(file_path,'r')
     data=f.read().splitlines()
@@ -128,100 +85,338 @@ def retrieve_file_data(filename):
     # return data
     return elements_unique,wavelengths,rows
 
-# function that looks inside given file and seeks 
-# for a given line (within some range)
-def serach_line_in_file(LINE,FILE):
+# function that looks inside given file and seeks for all
+# given lines (within some range) at once
+# (data is taken from cache if file was already parsed)
+def serach_lines_in_file(LINES,file_path,file_cache):
     try:
-        line=LINE
-        lr=[line[0]-line[1],line[0]+line[1]]
-        elements_unique,wavelengths,rows=retrieve_file_data(FILE)
-        result=[]        
-        for i in range(len(elements_unique)):
-            element=elements_unique[i] # element
-            WLS=wavelengths[i] # list
-            ROWS=rows[i] # list of lists
-            wavelen_around_line=[w for w in WLS if lr[0]<=w<=lr[1]]
-            rows_around_line=[ROWS[j] for j in range(len(ROWS)) 
-                              if lr[0]<=WLS[j]<=lr[1]]
-            result.append([element,wavelen_around_line,rows_around_line])
+        elements_unique,wavelengths,rows=file_cache.get(file_path,parse_file_data)
+        # all lines of the file sorted by wavelength
+        index=line_list_index(wavelengths)
+        ELEMENTS=[elements_unique[i] for i in range(len(rows)) for r in rows[i]]
+        WLS=[w for l in wavelengths for w in l]
+        ROWS=[r for l in rows for r in l]
+        # search index for all lines in one pass
+        result=[]
+        for ind in batch_rows(index,batch_search(index,LINES)):
+            result.append([[element,[WLS[i] for i in ind_el],[ROWS[i] for i in ind_el]] 
+                           for element,ind_el in group_rows(ind.tolist(),ELEMENTS)])
         return result
     except Exception as e:
         print ("Something went wrong.\nError message:\n"
                +str(e)+"\nPlease check.\n")       
         TIME.sleep(TIME_SLEEP)
-        return []
+        return [[] for line in LINES]
 
-# main search function
-def search(LINE,FILE):   
-    line=LINE
-    print ("* Looking for a line "+str(line[0])+" Ang ( +/- "+str(line[1])+" Ang ) inside "\
-           +FILE+" file.\n")
-    TIME.sleep(TIME_SLEEP)
-    result=serach_line_in_file(line,FILE) 
+# function that looks inside packed NIST library and seeks for all
+# given lines (within some range) at once using global wavelength index
+# (library is opened again only if it was changed)
+def serach_lines_in_library(LINES,file_path):
+    try:
+        return search_store(library_cache.get(file_path,load_store),LINES)
+    except Exception as e:
+        print ("Something went wrong.\nError message:\n"
+               +str(e)+"\nPlease check.\n")       
+        TIME.sleep(TIME_SLEEP)
+        return [[] for line in LINES]
+
+# function that creates output for a given line from the result of a search
+# (velocity of lines in km/s, if it was specified, and only lines of given species if SPECIES 
+# are specified)
+def line_output(line,FILE,result,velocity=None,SPECIES=None):
     output=[]
     total_num=0
-    if result!=[]:        
-        for i in range(len(result)):           
-            if result[i][1]!=[]:               
-                num=len(result[i][1])                
-                total_num=total_num+num                
-                element=["Element: "+result[i][0]+"\n"]                
-                element.append("Line: "+str(line[0])+" Ang ( +/- "+str(line[1])+" Ang )\n")
-                element.append("Number of lines: "+str(num)+"\n\n")
-                rows=result[i][2]
-                rows=["\t".join(r)+"\n" for r in rows]
-                rows.append("\n\n")
-                output=output+element+rows
+    for i in range(len(result)):           
+        if result[i][1]!=[] and (SPECIES is None or result[i][0] in SPECIES):
+            num=len(result[i][1])                
+            total_num=total_num+num                
+            output.append("Element: "+result[i][0]+"\n")
+            output.append("Line: "+str(line[0])+" Ang ( +/- "+str(line[1])+" Ang )\n")
+            output.append("Number of lines: "+str(num)+"\n\n")
+            output.extend(["\t".join(r)+"\n" for r in result[i][2]])
+            output.append("\n\n")
     if output!=[]:               
-        msg="************ line "+str(line[0])+" Ang ( +/- "+str(line[1])+" Ang ) "\
-            "inside "+FILE+" file ************"       
+        if velocity is None:
+            msg="************ line "+str(line[0])+" Ang ( +/- "+str(line[1])+" Ang ) "\
+                "inside "+FILE+" file ************"       
+        else:
+            msg="************ line "+str(line[0])+" Ang ( +/- "+str(line[1])+" Ang ) "\
+                "inside "+FILE+" file shifted by velocity "+str(velocity)+" km/s ************"
         output.insert(0,msg+"\n\n")
-        output.insert(len(output),"TOTAL NUM OF LINES: "+str(total_num)+"\n")
+        output.append("TOTAL NUM OF LINES: "+str(total_num)+"\n")
         stars_len=len(msg)                 
         stars="*"*stars_len
-        output.insert(len(output),stars+"\n\n\n")
+        output.append(stars+"\n\n\n")
     return output
 
+# main search function (all lines are searched inside a file at once)
+# if VELOCITIES (km/s) are specified, lines of the file are shifted by every velocity
+# (searched lines are taken to rest frame for all velocities at once, and all of them
+# are searched in one pass)
+def search(LINES,FILE,file_path,file_cache,VELOCITIES=None,relativistic=False,SPECIES=None):
+    for line in LINES:
+        print ("* Looking for a line "+str(line[0])+" Ang ( +/- "+str(line[1])+" Ang ) inside "\
+               +FILE+" file.\n")
+    if VELOCITIES is None:
+        queries=LINES
+    else:
+        print ("* Lines of "+FILE+" file are shifted by velocities (km/s): "
+               +', '.join(str(v) for v in VELOCITIES)+"\n")
+        queries=rest_lines(LINES,VELOCITIES,relativistic=relativistic).reshape(-1,2).tolist()
+    TIME.sleep(TIME_SLEEP)
+    if is_packed_file(file_path):
+        results=serach_lines_in_library(queries,file_path)
+    else:
+        results=serach_lines_in_file(queries,file_path,file_cache)
+    output=[]
+    if VELOCITIES is None:
+        for line,result in zip(LINES,results):
+            output.extend(line_output(line,FILE,result,None,SPECIES))
+        return output
+    for i in range(len(VELOCITIES)):
+        for j in range(len(LINES)):
+            output.extend(line_output(LINES[j],FILE,results[i*len(LINES)+j],VELOCITIES[i],SPECIES))
+    return output
 
+# lines of a file (or of packed NIST library) for merged search ---> (wavelengths of all lines,
+# function that returns [[element, [wavelengths], [rows]], ...] for sorted positions of lines)
+def file_lines(file_path,file_cache):
+    if is_packed_file(file_path):
+        store=library_cache.get(file_path,load_store)
+        return store.wavelength,lambda ind: store_lines(store,ind)
+    elements_unique,wavelengths,rows=file_cache.get(file_path,parse_file_data)
+    ELEMENTS=[elements_unique[i] for i in range(len(rows)) for r in rows[i]]
+    WLS=[w for l in wavelengths for w in l]
+    ROWS=[r for l in rows for r in l]
+    return WLS,lambda ind: [[element,[WLS[i] for i in ind_el],[ROWS[i] for i in ind_el]] 
+                            for element,ind_el in group_rows(ind.tolist(),ELEMENTS)]
 
+# search function for many files at once: lines of all files are kept in one merged index 
+# (with number of the file alongside every line), so every line is searched only once for all
+# files (results are grouped by line and then by file)
+def search_merged(LINES,FILES,file_paths,file_cache,VELOCITIES=None,relativistic=False,SPECIES=None):
+    for line in LINES:
+        print ("* Looking for a line "+str(line[0])+" Ang ( +/- "+str(line[1])+" Ang ) inside "\
+               +', '.join(FILES)+" files.\n")
+    if VELOCITIES is None:
+        queries=LINES
+    else:
+        print ("* Lines of files are shifted by velocities (km/s): "
+               +', '.join(str(v) for v in VELOCITIES)+"\n")
+        queries=rest_lines(LINES,VELOCITIES,relativistic=relativistic).reshape(-1,2).tolist()
+    TIME.sleep(TIME_SLEEP)
+    # lines of all files
+    files=[]
+    wavelengths=[]
+    results=[]
+    for FILE,file_path in zip(FILES,file_paths):
+        try:
+            wl,result=file_lines(file_path,file_cache)
+        except Exception as e:
+            print ("Something went wrong.\nError message:\n"
+                   +str(e)+"\nPlease check.\n")       
+            TIME.sleep(TIME_SLEEP)
+            continue
+        files.append(FILE)
+        wavelengths.append(wl)
+        results.append(result)
+    # search all files in one pass
+    found=merged_rows(merged_index(wavelengths),queries,[len(w) for w in wavelengths])
+    if VELOCITIES is None:
+        VELOCITIES=[None]
+    output=[]
+    for i in range(len(VELOCITIES)):
+        for j in range(len(LINES)):
+            for k in range(len(files)):
+                output.extend(line_output(LINES[j],files[k],results[k](found[i*len(LINES)+j][k]),
+                                          VELOCITIES[i],SPECIES))
+    return output
+
+# check species e.g. ['Fe II', 'Ca II'] in species manifest of NIST library (see nist_lines/manifest.py)
+# ---> species that are NIST species (species that are not NIST species are reported and skipped)
+# if library doesn't have manifest or packed library, species are checked in /NIST_ELEMENTS/ folder
+# (species without .dat file are skipped), and all species are taken if folder doesn't exist
+def valid_species(SPECIES,library_folder):
+    library=load_library(library_folder)
+    # species manifest or packed library exists
+    catalogue=library.manifest!={} or library.store is not None
+    if not catalogue and not os.path.isdir(library_folder):
+        print ("* NIST library "+library_folder+" doesn't exist, so species are not checked.\n")
+        return SPECIES
+    valid=[]
+    for nist_element in SPECIES:
+        if not catalogue:
+            if nist_element not in library:
+                print ("* "+nist_element+" is not in NIST library (it is skipped).\n")
+                continue
+            valid.append(nist_element)
+            continue
+        info=library.species_info(nist_element)
+        if info is None:
+            print ("* "+nist_element+" is not NIST species (it is skipped).\n")
+            continue
+        if info[4]==0:
+            print ("* "+nist_element+" doesn't have lines in NIST library.\n")
+        valid.append(nist_element)
+    return valid
 
 ##############################################################################################
 
 
 ######################################## PROGRAM #############################################
 
-# result of a search
-result=[]
-
-# go trough list of files
-for i in range(len(list_of_files)):
-    # for every file
-    filename=list_of_files[i]
-    # go trough list of lines
-    for j in range(len(list_of_lines)):
-        # search for all lines in that file
-        line=list_of_lines[j]
-        output=search(line,filename)
-        if output!=[]:
-            result=result+output
-
-# write everything to file
-out_file="search_lines"+current_date_time+".txt"
-if result!=[]:
-    out_file_path=os.path.join(output_directory,out_file)
-    f=open(out_file_path,'w')
-    for i in range(len(result)):
-        f.write(result[i])
-    f.close()
-    print ("FILE: "+out_file+" was successfully created.\n")
-    TIME.sleep(TIME_SLEEP)
-else:    
-    print ("NO RESULTS AFTER SEARCH!\n")
-    print ("FILE: "+out_file+" was not created.\n")
-    TIME.sleep(TIME_SLEEP)
+# search files for given lines e.g. ['search_lines.py', 'files=[file1.txt,file2.txt]', 
+# 'lines=[[4200,40],[5750,25]]']
+def main(param):
+    # ARGUMENTS 
+    arguments=param[1:]
+    # OPTIONAL ARGUMENTS
+    # flag for keeping parsed files in cache folder, so that next runs of the script
+    # don't parse them again [True, False] (if not specified cache==False)
+    cache=False
+    # max size (in MB) of parsed files kept in memory (if not specified cache_size==256)
+    cache_size=256
+    # velocity (km/s) or list of velocities e.g. velocity=[0,5000,10000] by which lines of files
+    # are shifted (positive velocity means redshift) before searching (if not specified lines 
+    # are not shifted)
+    velocities=None
+    # flag for relativistic Doppler formula [True, False] (if not specified relativistic==False)
+    relativistic=False
+    # flag for searching all files at once in one merged index [True, False] (if not specified
+    # merge==False), results are then grouped by line and then by file
+    merge=False
+    # species whose lines are written to results e.g. species=[Fe_II,Ca_II] (if not specified
+    # lines of all species are written), species are checked in species manifest of NIST library
+    species=None
+    # NIST library (if not specified /create_line_list/NIST_ELEMENTS/)
+    library_folder=os.path.join(os.path.dirname(os.getcwd()),'create_line_list','NIST_ELEMENTS')
+    optional_arguments=[]
+    for i in range(len(arguments)):
+        if 'cache=' in arguments[i]:
+            cache=arguments[i].replace('cache=','').lower()=='true'
+            optional_arguments.append(arguments[i])
+        if 'cache_size=' in arguments[i]:
+            cache_size=float(arguments[i].replace('cache_size=',''))
+            optional_arguments.append(arguments[i])
+        if 'velocity=' in arguments[i]:
+            velocities=re.sub('\[|\]','',arguments[i].replace('velocity=','')).split(',')
+            velocities=[float(v) for v in velocities]
+            optional_arguments.append(arguments[i])
+        if 'relativistic=' in arguments[i]:
+            relativistic=arguments[i].replace('relativistic=','').lower()=='true'
+            optional_arguments.append(arguments[i])
+        if 'merge=' in arguments[i]:
+            merge=arguments[i].replace('merge=','').lower()=='true'
+            optional_arguments.append(arguments[i])
+        if 'species=' in arguments[i]:
+            species=re.sub('\[|\]','',arguments[i].replace('species=','')).split(',')
+            species=[e.replace('_',' ').strip() for e in species if e.strip()!='']
+            optional_arguments.append(arguments[i])
+        if 'library=' in arguments[i]:
+            library_folder=arguments[i].replace('library=','')
+            optional_arguments.append(arguments[i])
+    arguments=[a for a in arguments if a not in optional_arguments]
+    # check num of arguments
+    if len(arguments)!=2:
+        print ("Incorrect arguments. Please enter the correct arguments.\n")
+        TIME.sleep(TIME_SLEEP)
+        return
+    # arguments
+    arg1=arguments[0]
+    arg2=arguments[1]
+    # check keynames in arguments
+    if ('files=' not in arg1) and ('files=' not in arg2):
+        print ("Incorrect arguments. Please enter the correct arguments.\n")
+        TIME.sleep(TIME_SLEEP)
+        return
+    if ('lines=' not in arg1) and ('lines=' not in arg2):
+        print ("Incorrect arguments. Please enter the correct arguments.\n")
+        TIME.sleep(TIME_SLEEP)
+        return
+    # take values of arguments
+    if 'files=' in arg1:
+        arg1_data=re.sub('files=','',arg1)
+        arg2_data=re.sub('lines=','',arg2)
+    else:
+        arg1_data=re.sub('lines=','',arg1)
+        arg2_data=re.sub('files=','',arg2)
+        pom=arg1_data
+        arg1_data=arg2_data
+        arg2_data=pom
+    # list of files
+    arg1_data=arg1_data.split(',')
+    arg1_data[0]=re.sub('\[','',arg1_data[0])
+    arg1_data[-1]=re.sub('\]','',arg1_data[-1])
+    list_of_files=arg1_data
+    # list of lines for searching
+    arg2_data=arg2_data.split(',')
+    arg2_data=[re.sub('\[|\]','',x) for x in arg2_data]
+    arg2_data=[[float(arg2_data[i*2]),float(arg2_data[(i*2)+1])] 
+               for i in range(int(len(arg2_data)/2))]
+    list_of_lines=arg2_data
 
-##############################################################################################
+    # FOLDERS
+    # get current working directory
+    cwd=os.getcwd()
+    # directory of files
+    files_folder=os.path.join(cwd,'files_for_search')
+    # output directory
+    output_directory=os.path.join(cwd,'results')
+    # cache directory (parsed files)
+    cache_directory=os.path.join(cwd,'cache')
+
+    # current datetime
+    current_date_time=(datetime.datetime.now()).strftime('_%Y%m%d_%H%M%S')
+
+    # parsed files (file is parsed again only if it was changed)
+    if cache==True:
+        file_cache=FileCache(max_bytes=cache_size*1024**2,sidecar_folder=cache_directory)
+    else:
+        file_cache=FileCache(max_bytes=cache_size*1024**2)
+
+    # species whose lines are written to results
+    if species is not None:
+        species=valid_species(species,library_folder)
+        if species==[]:
+            print ("NO VALID SPECIES FOR SEARCH!\n")
+            TIME.sleep(TIME_SLEEP)
+            return
+        species=set(species)
 
+    # result of a search
+    result=[]
 
+    if merge==True:
+        # search all files at once
+        result=search_merged(list_of_lines,list_of_files,
+                             [os.path.join(files_folder,filename) for filename in list_of_files],
+                             file_cache,velocities,relativistic,species)
+    else:
+        # go trough list of files
+        for i in range(len(list_of_files)):
+            # for every file
+            filename=list_of_files[i]
+            # search for all lines in that file
+            output=search(list_of_lines,filename,os.path.join(files_folder,filename),file_cache,
+                          velocities,relativistic,species)
+            result.extend(output)
 
+    # write everything to file
+    out_file="search_lines"+current_date_time+".txt"
+    if result!=[]:
+        out_file_path=os.path.join(output_directory,out_file)
+        f=open(out_file_path,'w')
+        for i in range(len(result)):
+            f.write(result[i])
+        f.close()
+        print ("FILE: "+out_file+" was successfully created.\n")
+        TIME.sleep(TIME_SLEEP)
+    else:    
+        print ("NO RESULTS AFTER SEARCH!\n")
+        print ("FILE: "+out_file+" was not created.\n")
+        TIME.sleep(TIME_SLEEP)
 
+if __name__=='__main__':
+    main(sys.argv)
+
+##############################################################################################
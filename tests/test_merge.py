@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Developed and tested on:
+
+- Linux 18.04 LTS
+- Windows 10
+- Python 3.7 (Spyder)
+
+@author: Nikola Knezevic
+"""
+
+import os
+import sys
+import random
+import pytest
+# package shared by all scripts (/nist_lines/ folder) and the library builder (/nist_library/ folder)
+ROOT=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0,ROOT)
+sys.path.insert(0,os.path.join(ROOT,'nist_library'))
+from nist_lines.merge import unique_wavelengths,merge_lines
+import creating_nist_lib
+
+
+############################################# PARAMETERS ###############################################
+
+# shipped NIST library (.dat files are the baseline of the library builder)
+LIBRARY=os.path.join(ROOT,'create_line_list','NIST_ELEMENTS')
+
+# species whose .dat files are rebuilt (small and the largest tables, with and without references)
+fixture_species=['H I','He I','C IV','O I','S I','Fe I','Fe II']
+
+# header of <pre> table of NIST response (positions of columns are taken from it)
+pre_header=['<pre>','-'*120,
+            '  Observed  |     Ritz    |  Rel.   |   Aki    | Acc. |    Ei        Ek     | Lower level | '
+            'Upper level |Type|  TP  | Line  |',
+            ' Wavelength |  Wavelength |  Int.   |  s^-1    |      |   (cm-1)    (cm-1)  |  Conf. Term J | '
+            'Conf. Term J |    | Ref. | Ref.  |',
+            '  Air (&Aring;)    |   Air (&Aring;)   |  (?)    |          |      |                     |'
+            '             |             |    |      |       |',
+            '-'*120]
+
+########################################################################################################
+
+
+############################################### FUNCTIONS ##############################################
+
+# path of .dat file of species e.g. 'Fe II' ---> .../Fe/Fe_II.dat
+def dat_path(species):
+    return os.path.join(LIBRARY,species.split()[0],species.replace(' ','_')+'.dat')
+
+# rows of .dat file (without header)
+def dat_rows(species):
+    with open(dat_path(species),'r') as f:
+        return [e.split('\t') for e in f.read().splitlines()[1:]]
+
+# columns of .dat file as they are read by create_line_list.py (wavelengths and rel. int. as floats)
+def dat_columns(species):
+    rows=dat_rows(species)
+    columns=[[row[k] for row in rows] for k in range(8)]
+    for k in [3,4,5]:
+        columns[k]=[float(e) if e!='null' else 'null' for e in columns[k]]
+    return columns
+
+# NIST response (HTML page with <pre> table) that contains lines of .dat file of species, with the
+# same lines with lower rel. int., exact duplicates, lines without wavelength or with zero rel. int.
+# and separators between rows (everything that is removed by the builder)
+def nist_page(species):
+    rnd=random.Random(species)
+    lines=list(pre_header)
+    for row in dat_rows(species):
+        wl,ri,ref=row[3],str(int(float(row[4]))),row[7]
+        refcell='<a class="bib" href="javascript:showRefLines(\''+ref+'\')">'+ref+'</a>' if ref!='' else ''
+        line='  '+wl+rnd.choice(['','?','+',' c'])+' |  '+wl+'  |  '+ri+rnd.choice(['','w','bl','*'])\
+             +'  | 1.0e+07 | B | 0.0 - 1.0 | 2s | 2p |    | T123 | '+refcell+' |'
+        lines.append(line)
+        k=rnd.random()
+        if k<0.1 and int(ri)>1:
+            # the same line with lower relative intensity (and other reference)
+            lines.append('  '+wl+' |  '+wl+'  |  '+str(int(ri)//2)+'  | | | | | | | | L0 |')
+        elif k<0.2:
+            # exact duplicate
+            lines.append(line)
+        elif k<0.25:
+            # no observed wavelength
+            lines.append('             |  '+wl+'  |  '+ri+'  | | | | | | | | |')
+        elif k<0.3:
+            # zero relative intensity
+            lines.append('  '+wl+'1 |  '+wl+'  |  0  | | | | | | | | |')
+        elif k<0.35:
+            lines.append('-'*120)
+            lines.append('')
+    lines.append('</pre>')
+    return '<html><body>\n'+'\n'.join(lines)+'\n</body></html>'
+
+# response of NIST (only what read_nist_response uses)
+class Response(object):
+
+    def __init__(self,text):
+        self.status_code=200
+        self.text=text
+        self.headers={}
+
+    def raise_for_status(self):
+        pass
+
+# fetcher that answers every request with the same page
+class PageFetcher(object):
+
+    def __init__(self,text):
+        self.text=text
+
+    def get(self,url,parse,headers=None,description=''):
+        return parse(Response(self.text))
+
+# content of .dat file written by the library builder for species (as in creating_nist_lib.main)
+def built_content(species,atomic_num_ion_num):
+    elTable=creating_nist_lib.create_table(PageFetcher(nist_page(species)),'',species,
+                                           atomic_num_ion_num,{})
+    elTable_transpose=list(map(list,zip(*elTable)))
+    elTable_transpose.insert(0,['atomic_num.ion_num\tname\tionization\twavelength(Ang)\t'
+                                'relative_intensity\tfrac_of_max_rel_int\tflags\treference'])
+    return creating_nist_lib.file_content(elTable_transpose)
+
+# NIST line and manually added line of the same species (columns)
+def line_columns(rows):
+    return [[row[k] for row in rows] for k in range(8)]
+
+########################################################################################################
+
+
+################################################ TESTS #################################################
+
+# downloaded tables (with duplicates and noise) give the same .dat files as shipped ones, line for line
+@pytest.mark.parametrize('species',fixture_species)
+def test_builder_matches_shipped_dat(species):
+    with open(dat_path(species),'r') as f:
+        expected=f.read().splitlines()
+    atomic_num_ion_num=expected[1].split('\t')[0]
+    assert built_content(species,atomic_num_ion_num).splitlines()==expected
+
+# the line with the highest relative intensity is kept, and lines stay in the same order
+def test_unique_wavelengths_keeps_highest_rel_int():
+    table=[[900.0,5000.1,'L1'],[800.0,4000.2,'L2'],[500.0,5000.1,'L3'],[500.0,3000.3,'L4'],
+           [100.0,4000.2,'L5'],[100.0,4000.2,'L5']]
+    assert unique_wavelengths(table)==[[900.0,5000.1,'L1'],[800.0,4000.2,'L2'],[500.0,3000.3,'L4']]
+    assert unique_wavelengths([])==[]
+
+# merged shipped table without duplicates is the same table, and table merged with itself too
+@pytest.mark.parametrize('species',['He I','Fe II'])
+def test_merge_lines_shipped_dat(species):
+    columns=dat_columns(species)
+    assert merge_lines(columns)==columns
+    doubled=[columns[k]+columns[k] for k in range(8)]
+    assert merge_lines(doubled)==columns
+
+# the same wavelength of different species isn't merged, result is sorted by wavelength
+def test_merge_lines_different_species():
+    data=line_columns([['02.00','He','I',4471.5,100.0,1.0,'NIST','L1'],
+                       ['26.01','Fe','II',4471.5,50.0,0.5,'NIST','L2'],
+                       ['02.00','He','I',3888.6,500.0,1.0,'NIST','L3']])
+    assert merge_lines(data)==line_columns([['02.00','He','I',3888.6,500.0,1.0,'NIST','L3'],
+                                            ['02.00','He','I',4471.5,100.0,1.0,'NIST','L1'],
+                                            ['26.01','Fe','II',4471.5,50.0,0.5,'NIST','L2']])
+
+# unknown rel. int. ('null') of manually added line: NIST values are taken, and all flags and
+# references (flags are not repeated, regardless of case)
+def test_merge_lines_null_rel_int():
+    manual=line_columns([['02.00','He','I',4471.5,'null','null','M;nist;WR','wiserep']])
+    manual_data=merge_lines(manual)
+    data=line_columns([['02.00','He','I',4471.5,1000.0,0.5,'NIST','L1']])
+    data=[data[k]+manual_data[k] for k in range(8)]
+    assert merge_lines(data,manual_data)==line_columns([['02.00','He','I',4471.5,1000.0,0.5,
+                                                         'NIST;M;WR','L1;wiserep']])
+
+# all rel. int. unknown: 'null' stays, flags and references are merged
+def test_merge_lines_all_null():
+    manual=line_columns([['02.00','He','I',3886.0,'null','null','M','wiserep'],
+                         ['02.00','He','I',3886.0,'null','null','m;WR_WC/O','null']])
+    assert merge_lines(manual)==line_columns([['02.00','He','I',3886.0,'null','null',
+                                               'M;WR_WC/O','wiserep;null']])
+
+# manually added line with lower rel. int. than NIST line: its flags and references are not taken
+# ('null' reference is a value as any other, empty values are skipped)
+def test_merge_lines_weaker_manual_line():
+    manual=line_columns([['02.00','He','I',4471.5,10.0,0.01,'M','null']])
+    manual_data=merge_lines(manual)
+    data=line_columns([['02.00','He','I',4471.5,1000.0,0.5,'NIST','']])
+    data=[data[k]+manual_data[k] for k in range(8)]
+    assert merge_lines(data,manual_data)==line_columns([['02.00','He','I',4471.5,1000.0,0.5,'NIST','']])
+    # manually added line with higher rel. int.
+    manual=line_columns([['02.00','He','I',4471.5,5000.0,'null','M','null']])
+    manual_data=merge_lines(manual)
+    data=line_columns([['02.00','He','I',4471.5,1000.0,0.5,'NIST','']])
+    data=[data[k]+manual_data[k] for k in range(8)]
+    assert merge_lines(data,manual_data)==line_columns([['02.00','He','I',4471.5,5000.0,0.5,
+                                                         'NIST;M','null']])
+
+########################################################################################################